@@ -112,7 +112,29 @@ else
     exit 1
 fi
 
+# Step 7b: Compile translations (the committed .mo is used without gettext)
+if command -v msgfmt > /dev/null 2>&1; then
+    print_step "Compiling translations..."
+    python manage.py compilemessages --settings=hawladar_agro.settings_prod --locale bn
+else
+    print_warning "msgfmt not found; using the committed locale/*.mo files"
+fi
+
 # Step 8: Collect static files
+print_step "Optimizing shipped static images..."
+python manage.py optimize_static_images --settings=hawladar_agro.settings_prod
+if [ $? -ne 0 ]; then
+    print_error "Static image optimization failed!"
+    exit 1
+fi
+
+print_step "Building CSS/JS bundles..."
+python manage.py build_assets --settings=hawladar_agro.settings_prod
+if [ $? -ne 0 ]; then
+    print_error "Asset bundling failed!"
+    exit 1
+fi
+
 print_step "Collecting static files..."
 python manage.py collectstatic --settings=hawladar_agro.settings_prod --noinput --clear
 if [ $? -eq 0 ]; then
@@ -122,6 +144,67 @@ else
     exit 1
 fi
 
+# Apache serves public_html/static directly, bypassing WhiteNoise, so give it
+# the same precompressed variants and immutable caching for hashed names
+print_step "Writing static .htaccess..."
+cat > public_html/static/.htaccess <<'HTACCESS'
+<IfModule mod_mime.c>
+    AddEncoding br .br
+    AddEncoding gzip .gz
+</IfModule>
+
+<IfModule mod_rewrite.c>
+    RewriteEngine On
+    RewriteCond %{HTTP:Accept-Encoding} \bbr\b
+    RewriteCond %{REQUEST_FILENAME}.br -f
+    RewriteRule ^(.+)$ $1.br [L]
+    RewriteCond %{HTTP:Accept-Encoding} \bgzip\b
+    RewriteCond %{REQUEST_FILENAME}.gz -f
+    RewriteRule ^(.+)$ $1.gz [L]
+</IfModule>
+
+<FilesMatch "\.css\.(br|gz)$">
+    ForceType text/css
+</FilesMatch>
+<FilesMatch "\.js\.(br|gz)$">
+    ForceType application/javascript
+</FilesMatch>
+
+<IfModule mod_headers.c>
+    <FilesMatch "\.(br|gz)$">
+        Header append Vary Accept-Encoding
+    </FilesMatch>
+    # collectstatic names hashed files name.<12 hex digits>.ext
+    <FilesMatch "\.[0-9a-f]{12}\.[A-Za-z0-9]+(\.br|\.gz)?$">
+        Header set Cache-Control "public, max-age=31536000, immutable"
+    </FilesMatch>
+</IfModule>
+HTACCESS
+
+# Step 8b: Backfill responsive image derivatives for uploaded media,
+# so the cached and exported pages below are built with their srcsets
+print_step "Generating responsive image derivatives..."
+python manage.py generate_image_derivatives --settings=hawladar_agro.settings_prod
+if [ $? -eq 0 ]; then
+    print_info "Image derivatives up to date"
+else
+    print_warning "Image derivative generation failed; originals will be served"
+fi
+
+# Cached pages link the previous build's hashed asset names
+print_step "Clearing cached pages..."
+python manage.py shell --settings=hawladar_agro.settings_prod -c "from django.core.cache import cache; cache.clear()"
+
+# Anonymous GETs are answered by Apache from the exported pages
+print_step "Exporting public pages..."
+python manage.py prerender_site --settings=hawladar_agro.settings_prod --clear --htaccess public_html/.htaccess
+if [ $? -ne 0 ]; then
+    print_warning "Page export failed; every page will be served by Django"
+fi
+
+print_step "Verifying static assets..."
+python manage.py verify_static --settings=hawladar_agro.settings_prod --min-size 50000
+
 # Step 9: Create necessary directories
 print_step "Creating necessary directories..."
 mkdir -p logs
@@ -175,6 +258,12 @@ echo "  1. Verify domain configuration in cPanel"
 echo "  2. Configure SSL certificate"
 echo "  3. Test the site at https://$DOMAIN"
 echo "  4. Check logs: tail -f $PROJECT_DIR/logs/django.log"
+echo "  5. Add a cPanel cron job releasing expired share reservations and publishing availability every 5 minutes:"
+echo "     */5 * * * * cd $PROJECT_DIR && venv/bin/python manage.py expire_reservations --settings=hawladar_agro.settings_prod"
+echo "  6. Add a cPanel cron job delivering queued contact-form emails every minute:"
+echo "     * * * * * cd $PROJECT_DIR && venv/bin/python manage.py send_outbox --settings=hawladar_agro.settings_prod"
+echo "  7. Add a cPanel cron job exporting the pages changed by content edits every minute:"
+echo "     * * * * * cd $PROJECT_DIR && venv/bin/python manage.py prerender_site --pending --settings=hawladar_agro.settings_prod"
 echo ""
 print_info "Useful commands:"
 echo "  - Restart Passenger: touch $PROJECT_DIR/tmp/restart.txt"
@@ -2,6 +2,9 @@
 ASGI config for hawladar_agro project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Served this way, the homepage, about and investment pages use the async
+views of ``portfolio.async_views``. Run it with any ASGI server, e.g.
+``uvicorn hawladar_agro.asgi:application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
@@ -12,5 +15,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hawladar_agro.settings')
+os.environ.setdefault('PORTFOLIO_ASYNC_VIEWS', 'true')
 
 application = get_asgi_application()
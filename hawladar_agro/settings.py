@@ -52,19 +52,37 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'portfolio.middleware.AccessLogMiddleware',
+    'portfolio.middleware.ServerTimingMiddleware',
+    'portfolio.middleware.LocaleMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'portfolio.middleware.StatefulMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+# Run by StatefulMiddleware, in this order, for every request except GETs
+# for the public portfolio pages, which need no session (see
+# portfolio/stateless.py).
+STATEFUL_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
+# The admin and CSRF checks look for these in MIDDLEWARE. StatefulMiddleware
+# runs them for the admin, the API, every POST and the @stateful views such
+# as contact; portfolio.checks makes sure of it instead.
+SILENCED_SYSTEM_CHECKS = ['admin.E408', 'admin.E409', 'admin.E410', 'security.W003']
 
-ROOT_URLCONF = 'hawladar_agro.urls'
+# Set by asgi.py: serve the async versions of the homepage, about and
+# investment views.
+PORTFOLIO_ASYNC_VIEWS = env.bool('PORTFOLIO_ASYNC_VIEWS', default=False)
+ROOT_URLCONF = 'hawladar_agro.urls_asgi' if PORTFOLIO_ASYNC_VIEWS else 'hawladar_agro.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates, timing renders for the Server-Timing header
+        'BACKEND': 'portfolio.instrumentation.TimedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -95,6 +113,63 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+# Lifetime of cached public pages. Entries are invalidated by content version
+# as soon as a portfolio model is saved, so this only bounds memory use.
+PORTFOLIO_CACHE_TIMEOUT = env.int('PORTFOLIO_CACHE_TIMEOUT', default=60 * 60 * 24)
+
+# Directory the public pages are exported to as static HTML (see
+# portfolio.prerender); unset disables the export and its refresh on save.
+PRERENDER_ROOT = env('PRERENDER_ROOT', default=None)
+
+# Reverse proxy or CDN in front of the site (see portfolio.edge): where the
+# surrogate keys of changed content are purged, how long it keeps public
+# pages (briefly when nothing purges them) and how long browsers keep them
+# before revalidating.
+EDGE_PURGE_URL = env('EDGE_PURGE_URL', default=None)
+EDGE_CACHE_MAX_AGE = env.int('EDGE_CACHE_MAX_AGE', default=60 * 60 * 24 * 30 if EDGE_PURGE_URL else 300)
+EDGE_BROWSER_MAX_AGE = env.int('EDGE_BROWSER_MAX_AGE', default=0)
+EDGE_PURGER = {
+    'BACKEND': 'portfolio.edge.HttpPurger',
+    'OPTIONS': {
+        'url': EDGE_PURGE_URL,
+        'method': env('EDGE_PURGE_METHOD', default='POST'),
+        'header': env('EDGE_PURGE_HEADER', default='Surrogate-Key'),
+    },
+} if EDGE_PURGE_URL else None
+
+# How long reserved investment shares are held before they are released
+# (run `manage.py expire_reservations` from cron).
+RESERVATION_HOLD_MINUTES = env.int('RESERVATION_HOLD_MINUTES', default=30)
+
+# The reservation endpoint is anonymous: the most shares one reservation
+# may hold, the most holds one email may have at a time, and how often one
+# client may call it.
+RESERVATION_MAX_SHARES = env.int('RESERVATION_MAX_SHARES', default=20)
+RESERVATION_MAX_HOLDS_PER_EMAIL = env.int('RESERVATION_MAX_HOLDS_PER_EMAIL', default=2)
+REST_FRAMEWORK = {
+    'DEFAULT_THROTTLE_RATES': {
+        'reservations': env('RESERVATION_THROTTLE_RATE', default='10/hour'),
+    },
+}
+
+# Warm up each Passenger worker at start-up (see portfolio.warmup)
+PORTFOLIO_WARMUP = env.bool('PORTFOLIO_WARMUP', default=False)
+
+# Contact form messages are queued in the outbox and delivered by
+# `manage.py send_outbox` (run from cron).
+CONTACT_RECIPIENTS = env.list('CONTACT_RECIPIENTS', default=['info@hawladaragro.com'])
+
+# Share of requests timed by ServerTimingMiddleware, from 0 (off) to 1
+SERVER_TIMING_SAMPLE_RATE = env.float('SERVER_TIMING_SAMPLE_RATE', default=1.0)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -119,6 +194,16 @@ AUTH_PASSWORD_VALIDATORS = [
 
 LANGUAGE_CODE = 'bn-bd'
 
+# Bengali is served at the unprefixed URLs and English under /en/
+LANGUAGES = [
+    ('bn-bd', 'বাংলা'),
+    ('en', 'English'),
+]
+
+LOCALE_PATHS = [
+    BASE_DIR / 'locale',
+]
+
 TIME_ZONE = 'Asia/Dhaka'
 
 USE_I18N = True
@@ -135,6 +220,10 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
 
+# Serve the bundles written by `manage.py build_assets` instead of the
+# individual source stylesheets and scripts
+USE_ASSET_BUNDLES = env.bool('USE_ASSET_BUNDLES', default=False)
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
@@ -8,21 +8,66 @@ DEBUG = False
 
 ALLOWED_HOSTS = env.list('ALLOWED_HOSTS', default=['hawladaragro.farm', 'www.hawladaragro.farm'])
 
-# PostgreSQL database for production
+# PostgreSQL database for production. The portfolio.db backend is Django's
+# PostgreSQL backend timing connection checkouts (see Server-Timing).
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'portfolio.db',
         'NAME': env('DB_NAME', default='hawladaragro_db'),
         'USER': env('DB_USER', default='hawladaragro_user'),
         'PASSWORD': env('DB_PASSWORD'),
         'HOST': env('DB_HOST', default='localhost'),
         'PORT': env('DB_PORT', default='5432'),
+        # Keep each worker's connection between requests, checking that it
+        # still works before the first query of a request
+        'CONN_MAX_AGE': env.int('DB_CONN_MAX_AGE', default=300),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Or share a capped pool among the threads of each worker, for servers that
+# run many threads against a small connection limit: connections go back
+# to the pool at the end of every request instead of staying with a thread.
+if env.bool('DB_POOL', default=False):
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': 0,
+        'POOL': {
+            'MAX_SIZE': env.int('DB_POOL_MAX_SIZE', default=4),
+            'TIMEOUT': env.int('DB_POOL_TIMEOUT', default=10),
+        },
+    })
+
+# Cache shared by every Passenger worker, so a content version bumped by the
+# admin process invalidates pages cached by all the others
+CACHES = {
+    'default': env.cache('CACHE_URL', default=f"filecache://{BASE_DIR / 'cache'}"),
+}
+
 # Static files configuration for production
 STATIC_ROOT = BASE_DIR / 'public_html' / 'static'
 
+# Hashed, precompressed static files served with far-future immutable caching
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    *MIDDLEWARE[1:],
+]
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'portfolio.storage.HashedCompressedStaticStorage',
+    },
+}
+
+# Serve the minified, purged bundles built during deployment
+USE_ASSET_BUNDLES = env.bool('USE_ASSET_BUNDLES', default=True)
+
+# Public pages exported as static HTML, served by Apache without Passenger
+PRERENDER_ROOT = env('PRERENDER_ROOT', default=str(BASE_DIR / 'public_html' / 'prerendered'))
+PRERENDER_HOST = ALLOWED_HOSTS[0]
+
 # Media files configuration for production
 MEDIA_ROOT = BASE_DIR / 'public_html' / 'media'
 
@@ -47,7 +92,17 @@ EMAIL_HOST_USER = env('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = env('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = env('DEFAULT_FROM_EMAIL', default='noreply@hawladaragro.farm')
 
-# Logging
+# Time one request in ten; each timed request adds a line to
+# logs/performance.log
+SERVER_TIMING_SAMPLE_RATE = env.float('SERVER_TIMING_SAMPLE_RATE', default=0.1)
+
+# Logging: request threads only queue records; a listener thread per queue
+# writes them to rotated files (see portfolio.log). Every worker process
+# rotates the shared files on its own, so sizes are approximate.
+LOGGING_CONFIG = 'portfolio.log.configure_logging'
+LOG_MAX_BYTES = env.int('LOG_MAX_BYTES', default=10 * 1024 * 1024)
+LOG_BACKUP_COUNT = env.int('LOG_BACKUP_COUNT', default=5)
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -56,12 +111,17 @@ LOGGING = {
             'format': '{levelname} {asctime} {module} {message}',
             'style': '{',
         },
+        'json': {
+            '()': 'portfolio.log.JsonFormatter',
+        },
     },
     'handlers': {
         'file': {
             'level': 'WARNING',
-            'class': 'logging.FileHandler',
+            'class': 'logging.handlers.RotatingFileHandler',
             'filename': BASE_DIR / 'logs' / 'django.log',
+            'maxBytes': LOG_MAX_BYTES,
+            'backupCount': LOG_BACKUP_COUNT,
             'formatter': 'verbose',
         },
         'console': {
@@ -69,18 +129,56 @@ LOGGING = {
             'class': 'logging.StreamHandler',
             'formatter': 'verbose',
         },
+        # One JSON line per request (see AccessLogMiddleware), a file a day
+        'access_file': {
+            'class': 'logging.handlers.TimedRotatingFileHandler',
+            'filename': BASE_DIR / 'logs' / 'access.log',
+            'when': 'midnight',
+            'backupCount': 14,
+            'formatter': 'json',
+        },
+        # One JSON line per timed request (see ServerTimingMiddleware)
+        'performance_file': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': BASE_DIR / 'logs' / 'performance.log',
+            'maxBytes': LOG_MAX_BYTES,
+            'backupCount': LOG_BACKUP_COUNT,
+            'formatter': 'json',
+        },
+        'queue': {
+            '()': 'portfolio.log.QueueHandler',
+            'handlers': ['file', 'console'],
+        },
+        'queue_access': {
+            '()': 'portfolio.log.QueueHandler',
+            'handlers': ['access_file'],
+        },
+        'queue_performance': {
+            '()': 'portfolio.log.QueueHandler',
+            'handlers': ['performance_file'],
+        },
     },
     'loggers': {
         'django': {
-            'handlers': ['file', 'console'],
+            'handlers': ['queue'],
             'level': 'WARNING',
             'propagate': True,
         },
         'portfolio': {
-            'handlers': ['file', 'console'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': True,
         },
+        'portfolio.access': {
+            'handlers': ['queue_access'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'portfolio.performance': {
+            'handlers': ['queue_performance'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 
@@ -17,17 +17,30 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
+from django.conf.urls.i18n import i18n_patterns
 from django.conf.urls.static import static
 from django.views.generic import RedirectView
 
-urlpatterns = [
-    path('admin/', admin.site.urls),
-    path('', include('portfolio.urls')),
-]
 
-# Add static and media file serving in development
-if settings.DEBUG:
-    # Serve static files from STATICFILES_DIRS during development
-    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATICFILES_DIRS[0])
-    # Serve media files from MEDIA_ROOT during development
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+def build_urlpatterns(portfolio_urls='portfolio.urls'):
+    urlpatterns = [
+        path('admin/', admin.site.urls),
+        path('api/', include('portfolio.api_urls')),
+    ]
+
+    # Portfolio pages in Bengali at /..., in English at /en/...
+    urlpatterns += i18n_patterns(
+        path('', include(portfolio_urls)),
+        prefix_default_language=False,
+    )
+
+    # Add static and media file serving in development
+    if settings.DEBUG:
+        # Serve static files from STATICFILES_DIRS during development
+        urlpatterns += static(settings.STATIC_URL, document_root=settings.STATICFILES_DIRS[0])
+        # Serve media files from MEDIA_ROOT during development
+        urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    return urlpatterns
+
+
+urlpatterns = build_urlpatterns()
@@ -0,0 +1,7 @@
+"""
+URL configuration of the ASGI deployment (see ``asgi.py``): the same
+routes as ``hawladar_agro.urls``, with the async portfolio views.
+"""
+from .urls import build_urlpatterns
+
+urlpatterns = build_urlpatterns('portfolio.asgi_urls')
@@ -16,12 +16,16 @@ if project_path not in sys.path:
 # Set Django settings module to production settings
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hawladar_agro.settings_prod')
 
-# Import Django and get the WSGI application
-import django
+# Get the WSGI application; this runs django.setup() itself
 from django.core.wsgi import get_wsgi_application
 
-# Setup Django
-django.setup()
-
-# Get the WSGI application
 application = get_wsgi_application()
+
+# Optionally build URL resolvers, compile templates and fill the page cache
+# now, rather than on the first request after Passenger started the worker
+from django.conf import settings
+
+if settings.PORTFOLIO_WARMUP:
+    from portfolio.warmup import warm_up
+
+    warm_up()
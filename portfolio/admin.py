@@ -1,14 +1,65 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.utils import timezone
 from .models import (
     Project, BlogPost, TeamMember, MediaAppearance,
-    InvestmentOpportunity, GalleryImage
+    InvestmentOpportunity, GalleryImage, ShareReservation,
+    ContactSubmission, OutboxEmail
 )
+from .funding import FUNDING_LEVELS, filter_funding_level
+from .reservations import confirm_reservations, release_reservations
+from .search import get_backend, search
+
+
+class FullTextSearchMixin:
+    """
+    Answer the changelist search box from the full-text index instead of
+    ``icontains`` over ``search_fields``, which scans every row. The
+    changelist keeps its own ordering. ``search_fields`` must still be set
+    for the search box to be shown, and is used on databases without a
+    full-text backend.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip() or get_backend(queryset.db) is None:
+            return super().get_search_results(request, queryset, search_term)
+        return search(queryset, search_term), False
+
+
+class FundingLevelFilter(admin.SimpleListFilter):
+    """
+    Filter the changelist by funding level, in SQL, on the funded
+    percentage ``field``.
+    """
+    title = 'funding level'
+    parameter_name = 'funding'
+    field = None
+
+    def lookups(self, request, model_admin):
+        return [(level, label) for level, (label, _) in FUNDING_LEVELS.items()]
+
+    def queryset(self, request, queryset):
+        if self.value() in FUNDING_LEVELS:
+            return filter_funding_level(queryset, self.field, self.value())
+        return queryset
+
+
+class ProjectFundingLevelFilter(FundingLevelFilter):
+    field = 'funding__funded_percent'
+
+
+class OpportunityFundingLevelFilter(FundingLevelFilter):
+    field = 'funded_percent'
 
 
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
-    list_display = ['name', 'location', 'acreage', 'status', 'is_featured', 'order', 'created_at']
-    list_filter = ['status', 'is_featured', 'created_at']
+class ProjectAdmin(FullTextSearchMixin, admin.ModelAdmin):
+    list_display = [
+        'name', 'location', 'acreage', 'status', 'funded_percent', 'capital_raised',
+        'is_featured', 'order', 'created_at',
+    ]
+    list_filter = ['status', ProjectFundingLevelFilter, 'is_featured', 'created_at']
+    # The funding summary comes in the changelist query itself.
+    list_select_related = ['funding']
     search_fields = ['name', 'location', 'description']
     prepopulated_fields = {'slug': ('name',)}
     list_editable = ['is_featured', 'order']
@@ -33,9 +84,17 @@ class ProjectAdmin(admin.ModelAdmin):
         }),
     )
 
+    @admin.display(description='Funded %', ordering='funding__funded_percent')
+    def funded_percent(self, obj):
+        return getattr(getattr(obj, 'funding', None), 'funded_percent', None)
+
+    @admin.display(description='Capital raised', ordering='funding__capital_raised')
+    def capital_raised(self, obj):
+        return getattr(getattr(obj, 'funding', None), 'capital_raised', None)
+
 
 @admin.register(BlogPost)
-class BlogPostAdmin(admin.ModelAdmin):
+class BlogPostAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ['title', 'status', 'order', 'published_at', 'created_at']
     list_filter = ['status', 'published_at', 'created_at']
     search_fields = ['title', 'excerpt', 'content']
@@ -104,8 +163,12 @@ class MediaAppearanceAdmin(admin.ModelAdmin):
 
 @admin.register(InvestmentOpportunity)
 class InvestmentOpportunityAdmin(admin.ModelAdmin):
-    list_display = ['title', 'project', 'total_shares', 'available_shares', 'price_per_share', 'is_active', 'featured', 'order']
-    list_filter = ['is_active', 'featured', 'created_at']
+    list_display = [
+        'title', 'project', 'total_shares', 'available_shares', 'price_per_share',
+        'funded_percent', 'capital_raised', 'is_active', 'featured', 'order',
+    ]
+    list_filter = ['is_active', OpportunityFundingLevelFilter, 'featured', 'created_at']
+    list_select_related = ['project']
     search_fields = ['title', 'description']
     prepopulated_fields = {'slug': ('title',)}
     list_editable = ['is_active', 'featured', 'order']
@@ -131,9 +194,63 @@ class InvestmentOpportunityAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_funding()
+
+    def get_readonly_fields(self, request, obj=None):
+        # Reservations change available_shares with conditional UPDATEs
+        # while the form is open; an edit must not write an old count back.
+        if obj is not None:
+            return [*self.readonly_fields, 'available_shares']
+        return self.readonly_fields
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            return super().save_model(request, obj, form, change)
+        obj.save(update_fields=[
+            field.name for field in obj._meta.concrete_fields
+            if not field.primary_key and field.name != 'available_shares'
+        ])
+
+    @admin.display(description='Funded %', ordering='funded_percent')
+    def funded_percent(self, obj):
+        return f'{obj.funded_percent:.0f}'
+
+    @admin.display(description='Capital raised', ordering='capital_raised')
+    def capital_raised(self, obj):
+        return obj.capital_raised
+
+
+@admin.register(ShareReservation)
+class ShareReservationAdmin(admin.ModelAdmin):
+    list_display = ['reference', 'opportunity', 'name', 'email', 'shares', 'status', 'expires_at', 'created_at']
+    list_filter = ['status', 'opportunity', 'created_at']
+    search_fields = ['name', 'email', 'phone', 'reference']
+    list_select_related = ['opportunity']
+    # Shares move only through the actions, which keep availability in step.
+    readonly_fields = ['reference', 'opportunity', 'shares', 'status', 'expires_at', 'created_at', 'updated_at']
+    fields = ['reference', 'opportunity', 'shares', 'name', 'email', 'phone', 'status', 'expires_at', 'created_at', 'updated_at']
+    actions = ['confirm', 'cancel']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    @admin.action(description='Confirm selected held reservations')
+    def confirm(self, request, queryset):
+        confirmed = confirm_reservations(queryset)
+        self.message_user(request, f'{confirmed} reservation(s) confirmed.', messages.SUCCESS)
+
+    @admin.action(description='Cancel selected held reservations and release their shares')
+    def cancel(self, request, queryset):
+        cancelled = release_reservations(queryset, 'cancelled')
+        self.message_user(request, f'{cancelled} reservation(s) cancelled.', messages.SUCCESS)
+
 
 @admin.register(GalleryImage)
-class GalleryImageAdmin(admin.ModelAdmin):
+class GalleryImageAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ['title', 'category', 'is_featured', 'order', 'created_at']
     list_filter = ['category', 'is_featured', 'created_at']
     search_fields = ['title', 'description']
@@ -149,3 +266,37 @@ class GalleryImageAdmin(admin.ModelAdmin):
             'fields': ('is_featured', 'order')
         }),
     )
+
+
+@admin.register(ContactSubmission)
+class ContactSubmissionAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'name', 'email', 'phone', 'is_read', 'created_at']
+    list_filter = ['is_read', 'created_at']
+    search_fields = ['name', 'email', 'subject', 'message']
+    list_editable = ['is_read']
+    readonly_fields = ['name', 'email', 'phone', 'subject', 'message', 'created_at']
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'to', 'status', 'attempts', 'next_attempt_at', 'sent_at', 'created_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['subject', 'to']
+    readonly_fields = [
+        'subject', 'body', 'from_email', 'to', 'reply_to', 'status', 'attempts',
+        'next_attempt_at', 'last_error', 'sent_at', 'created_at',
+    ]
+    actions = ['retry']
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description='Retry selected failed emails now')
+    def retry(self, request, queryset):
+        retried = queryset.filter(status='failed').update(
+            status='pending', attempts=0, next_attempt_at=timezone.now(), updated_at=timezone.now(),
+        )
+        self.message_user(request, f'{retried} email(s) queued again.', messages.SUCCESS)
@@ -0,0 +1,195 @@
+"""
+Read-only JSON API for projects, blog posts, investment opportunities and
+gallery images, and the endpoint reserving shares of an opportunity.
+
+Clients are expected to poll, so every response carries an ``ETag`` and
+``Last-Modified`` derived from the ``updated_at`` high-water mark and row
+count of the rows it lists: a single aggregate query answers a conditional
+request with ``304 Not Modified``. On a changed validator the serialized
+payload is looked up in the cache under the new ETag, and is only built
+from the database when that misses too.
+"""
+import hashlib
+from functools import partial
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status, viewsets
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.throttling import AnonRateThrottle
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
+
+from .cache import get_cache
+from .models import Project, BlogPost, InvestmentOpportunity, GalleryImage
+from .pagination import InvalidCursor, KeysetPaginator
+from .reservations import SharesUnavailable, reserve_shares
+from .serializers import (
+    ProjectSerializer, BlogPostSerializer, InvestmentOpportunitySerializer,
+    GalleryImageSerializer, ShareReservationSerializer,
+)
+
+API_KEY_PREFIX = 'portfolio:api'
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    Cursor pagination over the model ordering, backed by ``KeysetPaginator``.
+    """
+    page_size = 20
+    cursor_query_param = 'cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        paginator = KeysetPaginator(queryset, self.page_size)
+        try:
+            self.page = paginator.page(request.query_params.get(self.cursor_query_param))
+        except InvalidCursor:
+            raise NotFound('Invalid cursor.')
+        return list(self.page)
+
+    def _link(self, token):
+        if token is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, token)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self._link(self.page.next_token),
+            'previous': self._link(self.page.previous_token),
+            'results': data,
+        })
+
+
+class ConditionalReadOnlyViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    A read-only viewset answering conditional requests and serving cached
+    payloads, keyed on the validator of the rows in the response.
+    """
+    # Public data: skip session and CSRF handling entirely.
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    pagination_class = KeysetCursorPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # Load only the columns the selected fields and the ordering need.
+        ordering = {name.lstrip('-') for name in queryset.model._meta.ordering}
+        return queryset.only(*self.get_serializer().model_fields() | ordering)
+
+    def validator(self, queryset):
+        """
+        Return ``(digest, last_modified)`` for the rows of ``queryset`` from
+        one aggregate query. ``digest`` changes whenever a row is saved,
+        added or removed.
+        """
+        state = queryset.order_by().aggregate(last_modified=Max('updated_at'), count=Count('pk'))
+        last_modified = state['last_modified']
+        identity = ':'.join([
+            queryset.model._meta.label_lower,
+            last_modified.isoformat() if last_modified else '',
+            str(state['count']),
+            self.request.build_absolute_uri(),
+            self.request.accepted_media_type,
+        ])
+        return hashlib.md5(identity.encode()).hexdigest(), last_modified
+
+    def conditional_response(self, queryset, build):
+        """
+        Answer from the validator of ``queryset`` alone if the client's copy
+        is current, else from the payload cache, else from ``build()``.
+        """
+        digest, last_modified = self.validator(queryset)
+        if last_modified is None and self.action == 'retrieve':
+            raise NotFound()
+        etag = quote_etag(digest)
+        # A list's high-water mark survives the deletion of a row, so
+        # If-Modified-Since is only trusted for single objects.
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(
+            self.request._request, etag=etag,
+            last_modified=timestamp if self.action == 'retrieve' else None,
+        )
+        if response is None:
+            cache = get_cache()
+            key = f'{API_KEY_PREFIX}:{digest}'
+            data = cache.get(key)
+            if data is None:
+                data = build().data
+                cache.set(key, data, getattr(settings, 'PORTFOLIO_CACHE_TIMEOUT', 60 * 60 * 24))
+            response = Response(data)
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        # Clients may keep a copy but must revalidate it on every use.
+        response['Cache-Control'] = 'public, no-cache'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional_response(queryset, partial(super().list, request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        queryset = self.filter_queryset(self.get_queryset()).filter(**{self.lookup_field: lookup})
+        return self.conditional_response(queryset, partial(super().retrieve, request, *args, **kwargs))
+
+
+class ProjectViewSet(ConditionalReadOnlyViewSet):
+    queryset = Project.objects.all()
+    serializer_class = ProjectSerializer
+    lookup_field = 'slug'
+
+
+class BlogPostViewSet(ConditionalReadOnlyViewSet):
+    queryset = BlogPost.objects.filter(status='published')
+    serializer_class = BlogPostSerializer
+    lookup_field = 'slug'
+
+
+class InvestmentOpportunityViewSet(ConditionalReadOnlyViewSet):
+    queryset = InvestmentOpportunity.objects.filter(is_active=True)
+    serializer_class = InvestmentOpportunitySerializer
+    lookup_field = 'slug'
+
+
+class GalleryImageViewSet(ConditionalReadOnlyViewSet):
+    queryset = GalleryImage.objects.all()
+    serializer_class = GalleryImageSerializer
+
+
+class ReservationRateThrottle(AnonRateThrottle):
+    scope = 'reservations'
+
+
+class ShareReservationView(APIView):
+    """
+    Hold shares of an active opportunity. Responds ``201`` with the
+    reservation, or ``409`` if not enough shares are left.
+
+    Anyone may reserve, so each client is throttled and each reservation
+    is capped (see ``ShareReservationSerializer``): a script cannot keep a
+    whole offering on hold.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    throttle_classes = [ReservationRateThrottle]
+
+    def post(self, request, slug):
+        opportunity = get_object_or_404(
+            InvestmentOpportunity.objects.only('pk', 'slug', 'title', 'project_id', 'price_per_share'),
+            slug=slug, is_active=True,
+        )
+        serializer = ShareReservationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            reservation = reserve_shares(opportunity, **serializer.validated_data)
+        except SharesUnavailable:
+            return Response({'detail': 'Not enough shares are available.'}, status=status.HTTP_409_CONFLICT)
+        return Response(ShareReservationSerializer(reservation).data, status=status.HTTP_201_CREATED)
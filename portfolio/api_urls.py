@@ -0,0 +1,20 @@
+from django.urls import path
+from rest_framework import routers
+
+from . import api
+
+app_name = 'api'
+
+router = routers.DefaultRouter()
+router.register('projects', api.ProjectViewSet, basename='project')
+router.register('posts', api.BlogPostViewSet, basename='post')
+router.register('opportunities', api.InvestmentOpportunityViewSet, basename='opportunity')
+router.register('gallery', api.GalleryImageViewSet, basename='gallery-image')
+
+urlpatterns = [
+    path(
+        'opportunities/<slug:slug>/reservations/', api.ShareReservationView.as_view(),
+        name='opportunity-reservations',
+    ),
+    *router.urls,
+]
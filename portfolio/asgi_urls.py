@@ -0,0 +1,16 @@
+from django.urls import path
+
+from . import async_views
+from .urls import app_name, urlpatterns as sync_urlpatterns  # noqa: F401 (app_name is read by include())
+
+ASYNC_VIEWS = {
+    'home': async_views.home,
+    'about': async_views.about,
+    'investment': async_views.investment,
+}
+
+urlpatterns = [
+    path(str(pattern.pattern), ASYNC_VIEWS[pattern.name], name=pattern.name)
+    if pattern.name in ASYNC_VIEWS else pattern
+    for pattern in sync_urlpatterns
+]
@@ -0,0 +1,512 @@
+"""
+CSS/JS asset pipeline for the public site.
+
+``build_assets`` bundles the site stylesheets into one minified,
+content-hashed file per page template, dropping rules whose classes and ids
+never appear in that page's templates or in ``script.js``. Pages that mark
+the end of their above-the-fold markup with ``{# critical:end #}`` also get
+a critical subset that ``{% page_styles %}`` inlines into the head while the
+full bundle loads asynchronously. ``script.js`` is minified into its own
+hashed bundle.
+
+The purge is deliberately conservative: a class or id is considered used if
+its name appears anywhere in the template text or the script, so only
+selectors that cannot possibly match are removed.
+"""
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.template.loader import get_template
+
+CSS_SOURCES = (
+    'css/styles.css',
+    'css/custom-sections.css',
+    'css/trust-test.css',
+    'css/facilities-test.css',
+    'css/crowdfunding-test.css',
+)
+
+JS_SOURCES = (
+    'js/script.js',
+)
+
+CRITICAL_MARKER = '{# critical:end #}'
+
+# Grouping at-rules whose children are themselves rules that can be purged.
+GROUPING_AT_RULES = ('@media', '@supports', '@layer', '@document')
+
+STATIC_URL_PLACEHOLDER = '__static__/'
+
+_STRING = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')''')
+_SELECTOR_TOKEN = re.compile(r'([.#])(-?[_a-zA-Z][\w-]*)')
+_WORD = re.compile(r'[A-Za-z_][\w-]*')
+_DYNAMIC_PREFIX = re.compile(r'([A-Za-z_][\w-]*-)(?:\{\{|\{%|\$\{)')
+_TEMPLATE_REFERENCE = re.compile(r'''\{%\s*(?:extends|include)\s+["']([^"']+)["']''')
+_KEYFRAMES_NAME = re.compile(r'@(?:-webkit-)?keyframes\s+([\w-]+)')
+_RELATIVE_URL = re.compile(r'''url\((['"]?)(?!data:|https?:|/)([^'")]+)\1\)''')
+
+
+def static_root():
+    return Path(getattr(settings, 'ASSET_SOURCE_ROOT', settings.BASE_DIR / 'static'))
+
+
+def output_dir():
+    return static_root() / 'bundles'
+
+
+def manifest_path():
+    return output_dir() / 'manifest.json'
+
+
+def page_templates():
+    """
+    Return the names of the portfolio page templates, e.g. ``portfolio/home.html``.
+    """
+    template_dir = Path(apps.get_app_config('portfolio').path) / 'templates'
+    return sorted(
+        path.relative_to(template_dir).as_posix()
+        for path in (template_dir / 'portfolio').glob('*.html')
+    )
+
+
+# Minification ---------------------------------------------------------------
+
+def _map_code(text, func):
+    """
+    Apply ``func`` to every part of ``text`` outside string literals.
+    """
+    parts = _STRING.split(text)
+    return ''.join(part if i % 2 else func(part) for i, part in enumerate(parts))
+
+
+def _strip_css_comments(css):
+    out = []
+    i = 0
+    while i < len(css):
+        match = _STRING.match(css, i)
+        if match:
+            out.append(match.group())
+            i = match.end()
+        elif css.startswith('/*', i):
+            end = css.find('*/', i + 2)
+            i = len(css) if end < 0 else end + 2
+            out.append(' ')
+        else:
+            out.append(css[i])
+            i += 1
+    return ''.join(out)
+
+
+def _minify_selector(selector):
+    return _map_code(
+        selector,
+        lambda code: re.sub(r'\s*([,>])\s*', r'\1', re.sub(r'\s+', ' ', code)),
+    ).strip()
+
+
+def _minify_body(body):
+    body = _map_code(
+        body,
+        lambda code: re.sub(r'\s*([{}:;,])\s*', r'\1', re.sub(r'\s+', ' ', code)),
+    ).strip()
+    return re.sub(r';(?=})', '', body).rstrip(';')
+
+
+def _minify_prelude(prelude):
+    return _map_code(prelude, lambda code: re.sub(r'\s+', ' ', code)).strip()
+
+
+def minify_js(js):
+    """
+    Strip comments and indentation from JavaScript.
+
+    Newlines are kept so automatic semicolon insertion behaves exactly as
+    in the source; strings, template literals and regex literals are
+    copied verbatim.
+    """
+    out = []
+    i = 0
+    n = len(js)
+
+    def previous_char():
+        return out[-1][-1] if out else ''
+
+    def last_significant():
+        for chunk in reversed(out):
+            stripped = chunk.rstrip()
+            if stripped:
+                return stripped
+        return ''
+
+    def whitespace(text, following):
+        previous = previous_char()
+        if '\n' in text:
+            if previous and previous != '\n':
+                out.append('\n')
+        elif previous and following and _needs_space(previous, following):
+            out.append(' ')
+
+    while i < n:
+        char = js[i]
+        if char in '"\'`':
+            j = i + 1
+            while j < n and js[j] != char:
+                j += 2 if js[j] == '\\' else 1
+            out.append(js[i:j + 1])
+            i = j + 1
+        elif js.startswith('//', i):
+            end = js.find('\n', i)
+            i = n if end < 0 else end
+        elif js.startswith('/*', i):
+            end = js.find('*/', i + 2)
+            end = n if end < 0 else end + 2
+            whitespace(js[i:end] if '\n' in js[i:end] else ' ', js[end:end + 1])
+            i = end
+        elif char == '/' and _starts_regex(last_significant()):
+            j = i + 1
+            in_class = False
+            while j < n and (in_class or js[j] != '/') and js[j] != '\n':
+                if js[j] == '\\':
+                    j += 1
+                elif js[j] == '[':
+                    in_class = True
+                elif js[j] == ']':
+                    in_class = False
+                j += 1
+            j += 1
+            while j < n and (js[j].isalnum() or js[j] == '_'):
+                j += 1
+            out.append(js[i:j])
+            i = j
+        elif char in ' \t\r\n':
+            j = i
+            while j < n and js[j] in ' \t\r\n':
+                j += 1
+            whitespace(js[i:j], js[j:j + 1])
+            i = j
+        else:
+            out.append(char)
+            i += 1
+    return ''.join(out).strip() + '\n'
+
+
+def _is_word_char(char):
+    return char.isalnum() or char in '_$'
+
+
+def _needs_space(previous, following):
+    return (
+        (_is_word_char(previous) and _is_word_char(following))
+        or (previous in '+-' and following in '+-')
+        or (previous == '/' and following == '/')
+    )
+
+
+def _starts_regex(previous):
+    if not previous:
+        return True
+    if previous[-1] in '(,=:[!&|?{};+-*%<>~^':
+        return True
+    words = _WORD.findall(previous[-10:])
+    return bool(words) and previous.endswith(words[-1]) and words[-1] in (
+        'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'void', 'throw',
+    )
+
+
+# Parsing --------------------------------------------------------------------
+
+def _scan(css, i, stops):
+    """
+    Return the index of the next character in ``stops`` outside strings
+    and parentheses, or ``len(css)``.
+    """
+    depth = 0
+    while i < len(css):
+        match = _STRING.match(css, i)
+        if match:
+            i = match.end()
+            continue
+        char = css[i]
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth = max(depth - 1, 0)
+        elif depth == 0 and char in stops:
+            return i
+        i += 1
+    return i
+
+
+def _matching_brace(css, i):
+    depth = 0
+    while i < len(css):
+        i = _scan(css, i, '{}')
+        if i >= len(css):
+            return i
+        depth += 1 if css[i] == '{' else -1
+        if depth == 0:
+            return i
+        i += 1
+    return i
+
+
+def parse_css(css):
+    """
+    Parse a stylesheet into nodes.
+
+    Nodes are ``('rule', selector, body)``, ``('group', prelude, children)``
+    for grouping at-rules, ``('block', prelude, body)`` for other at-rules
+    with a body (``@keyframes``, ``@font-face``), and
+    ``('statement', text, None)`` for ``@import``/``@charset``.
+    """
+    nodes, _ = _parse_block(_strip_css_comments(css), 0)
+    return nodes
+
+
+def _parse_block(css, i):
+    nodes = []
+    while True:
+        while i < len(css) and css[i].isspace():
+            i += 1
+        if i >= len(css):
+            return nodes, i
+        if css[i] == '}':
+            return nodes, i + 1
+        j = _scan(css, i, '{;}')
+        prelude = css[i:j].strip()
+        if j >= len(css):
+            return nodes, j
+        if css[j] == ';':
+            nodes.append(('statement', prelude, None))
+            i = j + 1
+        elif css[j] == '}':
+            return nodes, j + 1
+        elif prelude.lower().startswith(GROUPING_AT_RULES):
+            children, i = _parse_block(css, j + 1)
+            nodes.append(('group', prelude, children))
+        else:
+            end = _matching_brace(css, j)
+            kind = 'block' if prelude.startswith('@') else 'rule'
+            nodes.append((kind, prelude, css[j + 1:end]))
+            i = end + 1
+
+
+def serialize_css(nodes):
+    """
+    Serialize parsed nodes back into minified CSS.
+    """
+    out = []
+    for kind, prelude, content in nodes:
+        if kind == 'statement':
+            out.append(_minify_prelude(prelude) + ';')
+        elif kind == 'group':
+            if content:
+                out.append(f'{_minify_prelude(prelude)}{{{serialize_css(content)}}}')
+        elif kind == 'block':
+            out.append(f'{_minify_prelude(prelude)}{{{_minify_body(content)}}}')
+        else:
+            out.append(f'{_minify_selector(prelude)}{{{_minify_body(content)}}}')
+    return ''.join(out)
+
+
+def minify_css(css):
+    return serialize_css(parse_css(css))
+
+
+# Purging --------------------------------------------------------------------
+
+def _split_selectors(selector):
+    parts = []
+    i = 0
+    while i <= len(selector):
+        j = _scan(selector, i, ',')
+        parts.append(selector[i:j])
+        i = j + 1
+    return [part for part in parts if part.strip()]
+
+
+def _selector_tokens(selector):
+    # Tokens inside :not() and attribute selectors never stop a match.
+    selector = re.sub(r':not\([^)]*\)', '', selector)
+    selector = re.sub(r'\[[^\]]*\]', '', selector)
+    return [name for _, name in _SELECTOR_TOKEN.findall(selector)]
+
+
+class UsedNames:
+    """
+    The class/id names that may appear in a page's markup.
+    """
+
+    def __init__(self, texts):
+        self.words = set()
+        prefixes = set()
+        for text in texts:
+            self.words.update(_WORD.findall(text))
+            prefixes.update(_DYNAMIC_PREFIX.findall(text))
+        self.prefixes = tuple(sorted(prefixes))
+
+    def __contains__(self, name):
+        return name in self.words or (bool(self.prefixes) and name.startswith(self.prefixes))
+
+    def matches(self, selector):
+        return all(name in self for name in _selector_tokens(selector))
+
+
+def purge_css(nodes, used):
+    """
+    Drop selectors that reference a class or id not in ``used``.
+    """
+    kept = []
+    for kind, prelude, content in nodes:
+        if kind == 'rule':
+            selectors = [s for s in _split_selectors(prelude) if used.matches(s)]
+            if selectors:
+                kept.append((kind, ','.join(selectors), content))
+        elif kind == 'group':
+            children = purge_css(content, used)
+            if children:
+                kept.append((kind, prelude, children))
+        else:
+            kept.append((kind, prelude, content))
+    return kept
+
+
+def _prune_keyframes(nodes, css):
+    """
+    Drop ``@keyframes`` blocks whose animation name ``css`` never uses.
+    """
+    used = set(_WORD.findall(_KEYFRAMES_NAME.sub('', css)))
+    pruned = []
+    for kind, prelude, content in nodes:
+        if kind == 'block':
+            match = _KEYFRAMES_NAME.match(prelude)
+            if match and match.group(1) not in used:
+                continue
+        elif kind == 'group':
+            content = _prune_keyframes(content, css)
+        pruned.append((kind, prelude, content))
+    return pruned
+
+
+# Templates ------------------------------------------------------------------
+
+def template_sources(name, seen=None):
+    """
+    Return the source of ``name`` and of every template it extends or includes.
+    """
+    seen = set() if seen is None else seen
+    if name in seen:
+        return []
+    seen.add(name)
+    source = get_template(name).template.source
+    sources = [source]
+    for reference in _TEMPLATE_REFERENCE.findall(source):
+        sources.extend(template_sources(reference, seen))
+    return sources
+
+
+def above_the_fold(name):
+    """
+    Return the markup rendered above the fold of page ``name``, or None if
+    the page has no ``{# critical:end #}`` marker.
+    """
+    page = get_template(name).template.source
+    if CRITICAL_MARKER not in page:
+        return None
+    texts = [page.split(CRITICAL_MARKER, 1)[0]]
+    for parent in _TEMPLATE_REFERENCE.findall(page):
+        texts.append(get_template(parent).template.source.split('{% block content %}', 1)[0])
+    return texts
+
+
+def _absolute_urls(css, source_path):
+    """
+    Rewrite relative ``url()`` references as static-root paths, so they still
+    resolve once the CSS is inlined into a page.
+    """
+    base = Path(source_path).parent
+
+    def replace(match):
+        quote, url = match.groups()
+        path = os.path.normpath(base / url).replace(os.sep, '/')
+        return f'url({quote}{STATIC_URL_PLACEHOLDER}{path}{quote})'
+
+    return _RELATIVE_URL.sub(replace, css)
+
+
+# Build ----------------------------------------------------------------------
+
+def _write_hashed(name, extension, content):
+    digest = hashlib.md5(content.encode()).hexdigest()[:12]
+    path = output_dir() / f'{name}.{digest}.{extension}'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if not path.exists():
+        path.write_text(content)
+    return path.relative_to(static_root()).as_posix()
+
+
+def build():
+    """
+    Build every bundle and write the manifest. Returns the manifest.
+    """
+    root = static_root()
+    js_source = ''.join((root / source).read_text() for source in JS_SOURCES)
+
+    css_nodes = []
+    for source in CSS_SOURCES:
+        css_nodes.extend(parse_css(_absolute_urls((root / source).read_text(), source)))
+
+    manifest = {
+        'js': _write_hashed('site', 'js', minify_js(js_source)),
+        'pages': {},
+        'sizes': {},
+    }
+    for name in page_templates():
+        used = UsedNames(template_sources(name) + [js_source])
+        page_nodes = purge_css(css_nodes, used)
+        page_css = serialize_css(page_nodes)
+        page_nodes = _prune_keyframes(page_nodes, page_css)
+        page_css = serialize_css(page_nodes)
+        entry = {
+            'css': _write_hashed(Path(name).stem, 'css', page_css.replace(STATIC_URL_PLACEHOLDER, '../')),
+            'critical': None,
+        }
+        fold = above_the_fold(name)
+        if fold is not None:
+            critical_nodes = purge_css(page_nodes, UsedNames(fold))
+            critical_css = serialize_css(critical_nodes)
+            entry['critical'] = serialize_css(_prune_keyframes(critical_nodes, critical_css))
+        manifest['pages'][name] = entry
+        manifest['sizes'][entry['css']] = len(page_css.encode())
+
+    output_dir().mkdir(parents=True, exist_ok=True)
+    tmp = manifest_path().with_suffix('.tmp')
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(tmp, manifest_path())
+    _load_manifest.cache_clear()
+
+    current = {manifest['js']} | {entry['css'] for entry in manifest['pages'].values()}
+    for path in output_dir().glob('*.*.*'):
+        if path.relative_to(root).as_posix() not in current:
+            path.unlink()
+    return manifest
+
+
+def read_manifest():
+    try:
+        mtime = manifest_path().stat().st_mtime
+    except FileNotFoundError:
+        return {}
+    return _load_manifest(str(manifest_path()), mtime)
+
+
+@lru_cache(maxsize=1)
+def _load_manifest(path, mtime):
+    with open(path) as handle:
+        return json.load(handle)
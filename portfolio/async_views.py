@@ -0,0 +1,72 @@
+"""
+Async versions of the homepage, about and investment views, routed by
+``hawladar_agro.urls_asgi`` when the site is served over ASGI.
+
+The homepage's six queries are independent, so they are awaited together
+with ``asyncio.gather()``. Django 5.0 still runs each async ORM call on the
+request's thread-sensitive executor, one after another on one connection,
+so the queries do not overlap inside a request; what the event loop gains
+is that a request waiting on the database or the cache never holds up the
+others. Every queryset is evaluated before rendering, as templates must
+not query from an async context.
+
+The page cache, conditional GET and query budgets are shared with the
+sync views in ``portfolio.views``.
+"""
+import asyncio
+
+from django.shortcuts import render
+
+from .budgets import query_budget
+from .cache import versioned_cache_page
+from .conditional import conditional_page
+from .models import (
+    Project, BlogPost, TeamMember, MediaAppearance,
+    InvestmentOpportunity, GalleryImage
+)
+from .views import home_content, home_querysets, investment_content, investment_queryset
+
+
+async def evaluate(queryset):
+    return [obj async for obj in queryset]
+
+
+@versioned_cache_page(
+    Project, BlogPost, TeamMember, MediaAppearance,
+    InvestmentOpportunity, GalleryImage,
+)
+@conditional_page(home_content)
+@query_budget(7)
+async def home(request):
+    """
+    Homepage view displaying featured content.
+    """
+    querysets = home_querysets()
+    results = await asyncio.gather(*(evaluate(queryset) for queryset in querysets.values()))
+    return render(request, 'portfolio/home.html', dict(zip(querysets, results)))
+
+
+@versioned_cache_page(TeamMember)
+@conditional_page(lambda request: [TeamMember.objects.all()])
+@query_budget(2)
+async def about(request):
+    """
+    About page view.
+    """
+    context = {
+        'team_members': await evaluate(TeamMember.objects.all()),
+    }
+    return render(request, 'portfolio/about.html', context)
+
+
+@versioned_cache_page(InvestmentOpportunity, Project)
+@conditional_page(investment_content)
+@query_budget(2)
+async def investment(request):
+    """
+    Investment opportunities page.
+    """
+    context = {
+        'opportunities': await evaluate(investment_queryset()),
+    }
+    return render(request, 'portfolio/investment.html', context)
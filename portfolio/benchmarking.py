@@ -0,0 +1,34 @@
+"""
+Helpers shared by the benchmark management commands.
+"""
+import statistics
+import sys
+from io import BytesIO
+
+
+def wsgi_environ(host, path):
+    """
+    Return the WSGI environ of a GET for ``path`` over HTTPS.
+    """
+    return {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '', 'SCRIPT_NAME': '',
+        'SERVER_NAME': host, 'SERVER_PORT': '443', 'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': host, 'REMOTE_ADDR': '127.0.0.1',
+        'wsgi.url_scheme': 'https', 'wsgi.input': BytesIO(), 'wsgi.errors': sys.stderr,
+    }
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def summarize(latencies, elapsed, errors):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput': len(latencies) / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+    }
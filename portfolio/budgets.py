@@ -0,0 +1,30 @@
+"""
+Per-view SQL query budgets.
+
+Each public view declares the most queries it may issue on a cold cache.
+The budgets are enforced by ``QueryBudgetTests`` in ``portfolio/tests.py``
+against a seeded dataset, so an N+1 regression fails the test suite instead
+of reaching production.
+"""
+
+
+def query_budget(limit):
+    """
+    Declare the query budget of a function-based view.
+
+    Class-based views set a ``query_budget`` class attribute instead.
+    """
+    def decorator(view_func):
+        view_func.query_budget = limit
+        return view_func
+    return decorator
+
+
+def get_query_budget(view):
+    """
+    Return the query budget declared by a resolved view callable, or None.
+    """
+    view_class = getattr(view, 'view_class', None)
+    if view_class is not None:
+        return getattr(view_class, 'query_budget', None)
+    return getattr(view, 'query_budget', None)
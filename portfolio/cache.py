@@ -0,0 +1,147 @@
+"""
+Versioned full-response cache for the public portfolio pages.
+
+Every cached page is keyed on its URL, the active language and the content
+version of each model the page depends on. Saving or deleting a model
+instance bumps that model's version (see ``portfolio.signals``), so stale
+entries are never looked up again and simply age out of the cache.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import get_conditional_response
+from django.utils.translation import get_language
+
+from .edge import add_edge_headers
+from .instrumentation import timed_cache
+
+VERSION_KEY_PREFIX = 'portfolio:version'
+PAGE_KEY_PREFIX = 'portfolio:page'
+
+
+def get_cache():
+    return timed_cache(caches[getattr(settings, 'PORTFOLIO_CACHE_ALIAS', 'default')])
+
+
+def _version_key(model):
+    return f'{VERSION_KEY_PREFIX}:{model._meta.label_lower}'
+
+
+def new_version():
+    # Seed versions from the clock rather than 1, so a version key that was
+    # evicted on its own can never line up with an old page entry again.
+    return time.time_ns() // 1000
+
+
+def get_versions(models):
+    """
+    Return the current content version for each model, in order.
+    """
+    cache = get_cache()
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    missing = {key: new_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def bump_version(model):
+    """
+    Invalidate every cached page that depends on ``model``.
+    """
+    cache = get_cache()
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, new_version(), timeout=None)
+
+
+def page_cache_key(request, models):
+    """
+    Build the cache key for ``request`` from its URL, language and the
+    content versions of ``models``.
+    """
+    versions = '.'.join(str(version) for version in get_versions(models))
+    url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    return f'{PAGE_KEY_PREFIX}:{request.method}:{get_language()}:{url}:{versions}'
+
+
+def _is_cacheable(response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+    )
+
+
+def _cache_timeout(timeout):
+    if timeout is None:
+        return getattr(settings, 'PORTFOLIO_CACHE_TIMEOUT', 60 * 60 * 24)
+    return timeout
+
+
+def _cache_response(key, response, models, timeout):
+    if not _is_cacheable(response):
+        return
+    add_edge_headers(response, models)
+    cache = get_cache()
+    if hasattr(response, 'render') and callable(response.render):
+        response.add_post_render_callback(
+            lambda r: cache.set(key, r, timeout)
+        )
+    else:
+        cache.set(key, response, timeout)
+
+
+def _cached_response(request, response):
+    # A cached page is current, and so is the ETag it was stored with.
+    return get_conditional_response(request, etag=response.get('ETag'), response=response)
+
+
+def versioned_cache_page(*models, timeout=None):
+    """
+    Cache the full response of a public GET view until one of ``models``
+    changes.
+
+    Works for function views directly, async ones included, and for
+    class-based views through ``method_decorator(..., name='dispatch')``.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await view_func(request, *args, **kwargs)
+
+                key = await sync_to_async(page_cache_key)(request, models)
+                response = await get_cache().aget(key)
+                if response is not None:
+                    return _cached_response(request, response)
+
+                response = await view_func(request, *args, **kwargs)
+                await sync_to_async(_cache_response)(key, response, models, _cache_timeout(timeout))
+                return response
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+
+            key = page_cache_key(request, models)
+            response = get_cache().get(key)
+            if response is not None:
+                return _cached_response(request, response)
+
+            response = view_func(request, *args, **kwargs)
+            _cache_response(key, response, models, _cache_timeout(timeout))
+            return response
+        return wrapper
+    return decorator
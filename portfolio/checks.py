@@ -0,0 +1,32 @@
+"""
+System checks standing in for the admin and CSRF checks silenced in the
+settings, which only look for their middleware in ``MIDDLEWARE``.
+"""
+from django.conf import settings
+from django.core.checks import Error, register
+
+STATEFUL_MIDDLEWARE_REQUIRED = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+]
+
+
+@register()
+def check_stateful_middleware(app_configs, **kwargs):
+    """
+    Make sure every request other than a public page GET still runs the
+    session, CSRF, authentication and messages middleware.
+    """
+    if 'portfolio.middleware.StatefulMiddleware' not in settings.MIDDLEWARE:
+        return [Error(
+            "'portfolio.middleware.StatefulMiddleware' must be in MIDDLEWARE.",
+            hint='It runs STATEFUL_MIDDLEWARE, including CSRF protection, for the admin, the API and POSTs.',
+            id='portfolio.E001',
+        )]
+    stateful = getattr(settings, 'STATEFUL_MIDDLEWARE', [])
+    return [
+        Error(f"'{path}' must be in STATEFUL_MIDDLEWARE.", id='portfolio.E002')
+        for path in STATEFUL_MIDDLEWARE_REQUIRED if path not in stateful
+    ]
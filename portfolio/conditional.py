@@ -0,0 +1,127 @@
+"""
+Conditional GET for the public portfolio pages.
+
+A page declares the querysets whose rows it renders. Before the view runs,
+the ``updated_at`` high-water mark and row count of each queryset are read
+in a single ``UNION ALL`` of aggregates, and hashed with the URL, the
+active language and the current release into an ``ETag``. A client whose
+``If-None-Match`` carries that ETag gets ``304 Not Modified`` without the
+view running or the template rendering.
+
+Counts make deletions visible to the validator and the release token,
+which is reset whenever the cache is cleared on deploy, covers template
+changes. Neither is visible to ``Last-Modified``, so the header is sent for
+information only and ``If-Modified-Since`` is not honoured on its own.
+
+Pages served from ``versioned_cache_page`` keep the ETag of the response
+they were cached with, so repeat visits are answered without any query.
+"""
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.db.models import Count, IntegerField, Max, Value
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.utils.translation import get_language
+
+from .cache import get_cache, new_version
+
+RELEASE_KEY = 'portfolio:release'
+
+
+def get_release():
+    """
+    Return a token that changes whenever the cache is cleared, as on every
+    deploy.
+    """
+    return get_cache().get_or_set(RELEASE_KEY, new_version, timeout=None)
+
+
+async def aget_release():
+    return await get_cache().aget_or_set(RELEASE_KEY, new_version, timeout=None)
+
+
+def _state_query(querysets):
+    parts = [
+        queryset.order_by()
+        .annotate(_state=Value(index, output_field=IntegerField()))
+        .values('_state')
+        .annotate(last_modified=Max('updated_at'), count=Count('pk'))
+        for index, queryset in enumerate(querysets)
+    ]
+    return parts[0].union(*parts[1:], all=True) if len(parts) > 1 else parts[0]
+
+
+def _state_list(rows, length):
+    state = {row['_state']: (row['last_modified'], row['count']) for row in rows}
+    return [state.get(index, (None, 0)) for index in range(length)]
+
+
+def content_state(querysets):
+    """
+    Return ``(last_modified, count)`` for each of ``querysets``, in order,
+    from one query.
+    """
+    return _state_list(_state_query(querysets), len(querysets))
+
+
+async def acontent_state(querysets):
+    return _state_list([row async for row in _state_query(querysets)], len(querysets))
+
+
+def _validators(request, release, state):
+    identity = repr([release, get_language(), request.get_full_path(), state])
+    etag = quote_etag(hashlib.md5(identity.encode()).hexdigest())
+    last_modified = max((modified for modified, _ in state if modified), default=None)
+    return etag, last_modified
+
+
+def _add_validators(response, etag, last_modified):
+    if response.status_code != 200:
+        return response
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    response['ETag'] = etag
+    return response
+
+
+def conditional_page(querysets):
+    """
+    Answer conditional GETs for a view from the state of the querysets
+    ``querysets(request, *args, **kwargs)`` returns.
+
+    Works for function views directly, async ones included, and for
+    class-based views through ``method_decorator(..., name='dispatch')``,
+    inside ``versioned_cache_page``.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await view_func(request, *args, **kwargs)
+
+                state = await acontent_state(querysets(request, *args, **kwargs))
+                etag, last_modified = _validators(request, await aget_release(), state)
+                response = get_conditional_response(request, etag=etag)
+                if response is None:
+                    return _add_validators(await view_func(request, *args, **kwargs), etag, last_modified)
+                response['ETag'] = etag
+                return response
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+
+            state = content_state(querysets(request, *args, **kwargs))
+            etag, last_modified = _validators(request, get_release(), state)
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                return _add_validators(view_func(request, *args, **kwargs), etag, last_modified)
+            response['ETag'] = etag
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,243 @@
+"""
+Bulk import of projects, investment opportunities, blog posts and gallery
+images from JSON or CSV.
+
+Input is read as a stream: CSV row by row, and JSON one object at a time,
+either from a top-level array or from JSON Lines, so a file of any size is
+imported in constant memory. Rows are validated and collected into chunks;
+each chunk gets its slugs from one ``SlugAllocator`` pass and is inserted
+with one ``bulk_create()`` in its own transaction, together with its search
+documents. A chunk the database rejects is rolled back alone.
+
+An image column names a file in the images directory, which is copied into
+the field's storage; without a directory it names a file already stored.
+Invalid rows are skipped and reported with their row number.
+"""
+import csv
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import DatabaseError, models, transaction
+from django.utils import timezone
+
+from . import edge, prerender, search
+from .cache import bump_version
+from .funding import refresh_all_funding
+from .images import generate_instance_derivatives, image_fields
+from .models import BlogPost, GalleryImage, InvestmentOpportunity, Project
+from .slugs import SlugAllocator
+
+IMPORTABLE = {
+    'projects': Project,
+    'opportunities': InvestmentOpportunity,
+    'posts': BlogPost,
+    'gallery': GalleryImage,
+}
+# Field a slug is made from, for models that have one.
+SLUG_SOURCES = {Project: 'name', InvestmentOpportunity: 'title', BlogPost: 'title'}
+# Set by the database or by the import itself.
+SKIPPED_FIELDS = {'id', 'created_at', 'updated_at'}
+CHUNK_SIZE = 500
+
+
+def iter_json(handle, read_size=1 << 16):
+    """
+    Yield the objects of a JSON array, or of JSON Lines, read from
+    ``handle`` a block at a time.
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = '', 0, False
+    in_array = None
+    while True:
+        # Skip whitespace and, inside an array, the separating commas.
+        while True:
+            while pos < len(buffer) and (buffer[pos].isspace() or (in_array and buffer[pos] == ',')):
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            buffer, pos = handle.read(read_size), 0
+            eof = not buffer
+        if pos == len(buffer):
+            if in_array:
+                raise ValueError('Unterminated JSON array.')
+            return
+        if in_array is None:
+            in_array = buffer[pos] == '['
+            if in_array:
+                pos += 1
+                continue
+        if in_array and buffer[pos] == ']':
+            return
+        try:
+            row, pos = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # The object continues in the next block.
+            block = handle.read(read_size)
+            eof = not block
+            buffer, pos = buffer[pos:] + block, 0
+            continue
+        if not isinstance(row, dict):
+            raise ValueError(f'Expected a JSON object, got {type(row).__name__}.')
+        yield row
+
+
+def read_rows(handle, format):
+    """
+    Yield the rows of ``handle`` as dicts; ``format`` is 'json' or 'csv'.
+    """
+    if format == 'csv':
+        return csv.DictReader(handle)
+    return iter_json(handle)
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    errors: list = field(default_factory=list)
+
+    def error(self, number, message):
+        self.errors.append((number, message))
+
+
+class ContentImporter:
+    """
+    Import rows of ``model``. ``images_dir`` is where image columns are
+    looked up; ``derivatives`` generates the responsive image sizes, as
+    saving through the admin does.
+    """
+
+    def __init__(self, model, images_dir=None, chunk_size=CHUNK_SIZE, derivatives=True, dry_run=False):
+        self.model = model
+        self.images_dir = Path(images_dir) if images_dir else None
+        self.chunk_size = chunk_size
+        self.derivatives = derivatives
+        self.dry_run = dry_run
+        self.fields = {
+            f.name: f for f in model._meta.concrete_fields
+            if f.name not in SKIPPED_FIELDS
+        }
+        self.image_fields = image_fields(model)
+        self.slugs = SlugAllocator(model) if model in SLUG_SOURCES else None
+
+    def run(self, rows):
+        """
+        Import ``rows`` and return an ``ImportResult``.
+        """
+        result = ImportResult()
+        chunk = []
+        for number, row in enumerate(rows, 1):
+            chunk.append((number, row))
+            if len(chunk) == self.chunk_size:
+                self.import_chunk(chunk, result)
+                chunk = []
+        if chunk:
+            self.import_chunk(chunk, result)
+        if result.created and not self.dry_run:
+            if self.model in (Project, InvestmentOpportunity):
+                refresh_all_funding()
+            bump_version(self.model)
+            prerender.schedule_model_refresh(self.model)
+            edge.schedule_model_purge(self.model)
+        return result
+
+    def import_chunk(self, chunk, result):
+        projects = self.related_projects(row for _, row in chunk)
+        numbered = []
+        for number, row in chunk:
+            try:
+                numbered.append((number, self.build(row, projects)))
+            except ValidationError as e:
+                result.error(number, '; '.join(e.messages))
+        if not numbered:
+            return
+        if self.slugs:
+            source = SLUG_SOURCES[self.model]
+            texts = [instance.slug or getattr(instance, source) for _, instance in numbered]
+            for (_, instance), slug in zip(numbered, self.slugs.allocate(texts)):
+                instance.slug = slug
+        if self.dry_run:
+            result.created += len(numbered)
+            return
+
+        instances = []
+        for number, instance in numbered:
+            try:
+                self.store_images(instance)
+            except OSError as e:
+                result.error(number, str(e))
+            else:
+                instances.append(instance)
+        try:
+            with transaction.atomic():
+                self.model.objects.bulk_create(instances)
+                if search.is_searchable(self.model):
+                    for instance in instances:
+                        search.index_instance(instance)
+        except DatabaseError as e:
+            result.error(numbered[0][0], f'Rows {numbered[0][0]}-{numbered[-1][0]} rejected by the database: {e}')
+            return
+        result.created += len(instances)
+        if self.derivatives:
+            for instance in instances:
+                generate_instance_derivatives(instance)
+
+    def related_projects(self, rows):
+        """
+        Return the projects named by slug in the 'project' column of
+        ``rows``, fetched in one query.
+        """
+        if self.model is not InvestmentOpportunity:
+            return {}
+        slugs = {row.get('project') for row in rows} - {None, ''}
+        return Project.objects.in_bulk(slugs, field_name='slug')
+
+    def build(self, row, projects):
+        """
+        Return an unsaved, validated instance for ``row``.
+        """
+        unknown = set(row) - set(self.fields)
+        if unknown:
+            raise ValidationError(f'Unknown columns: {", ".join(sorted(unknown))}')
+        values = {}
+        for name, value in row.items():
+            model_field = self.fields[name]
+            if value == '':
+                # CSV has no null: an empty cell means "not given".
+                if model_field.null:
+                    value = None
+                elif model_field.has_default():
+                    continue
+            if isinstance(model_field, models.ForeignKey):
+                if value not in projects:
+                    raise ValidationError(f'No project with slug {value!r}.')
+                value = projects[value]
+            values[name] = value
+        instance = self.model(**values)
+        instance.full_clean(exclude=['slug'], validate_unique=False, validate_constraints=False)
+        if isinstance(instance, BlogPost) and instance.status == 'published' and not instance.published_at:
+            instance.published_at = timezone.now()
+        return instance
+
+    def store_images(self, instance):
+        """
+        Copy the images named by ``instance`` from the images directory into
+        storage and point the fields at the stored files.
+        """
+        if self.images_dir is None:
+            return
+        for name in self.image_fields:
+            file = getattr(instance, name)
+            if not file:
+                continue
+            path = (self.images_dir / file.name).resolve()
+            if not path.is_relative_to(self.images_dir.resolve()):
+                raise OSError(f'{file.name} is outside the images directory.')
+            with path.open('rb') as handle:
+                model_field = self.fields[name]
+                stored = model_field.storage.save(model_field.generate_filename(instance, path.name), File(handle))
+            setattr(instance, name, stored)
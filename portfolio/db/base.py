@@ -0,0 +1,107 @@
+"""
+The PostgreSQL backend with connection timing and an optional pool.
+
+Set ``'ENGINE': 'portfolio.db'`` to time each connection checkout for
+``ServerTimingMiddleware``. Adding a ``POOL`` entry to the database
+settings also shares one ``ConnectionPool`` among the threads of the
+process::
+
+    'POOL': {'MAX_SIZE': 4, 'TIMEOUT': 10, 'MAX_LIFETIME': 600, 'CHECK_AFTER': 30},
+
+Django then "closes" a connection at the end of each request (keep
+``CONN_MAX_AGE`` at 0) by returning it to the pool, and the next request
+on any thread checks it out again without reconnecting.
+"""
+import threading
+
+from django.db.backends.postgresql import base as postgresql
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+from ..instrumentation import timed
+from .pool import ConnectionPool, PoolTimeout
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, settings):
+    """
+    Return the pool of database ``alias``, creating it from its ``POOL``
+    settings on first use.
+    """
+    with _pools_lock:
+        if alias not in _pools:
+            _pools[alias] = ConnectionPool(
+                max_size=settings.get('MAX_SIZE', 4),
+                timeout=settings.get('TIMEOUT', 10),
+                max_lifetime=settings.get('MAX_LIFETIME', 600),
+                check_after=settings.get('CHECK_AFTER', 30),
+                check=is_usable,
+                reset=reset,
+            )
+        return _pools[alias]
+
+
+def close_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+def is_usable(connection):
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except Exception:
+        return False
+    return True
+
+
+def reset(connection):
+    """
+    End whatever transaction a returned connection was left in.
+    """
+    try:
+        connection.rollback()
+    except Exception:
+        return False
+    return True
+
+
+class PooledConnectionMixin:
+    """
+    Time every checkout of a connection, and take connections from the
+    pool when the database settings have a ``POOL`` entry.
+    """
+
+    def connect(self):
+        with timed('checkout', 'checkouts'):
+            super().connect()
+
+    def get_new_connection(self, conn_params):
+        pool_settings = self.settings_dict.get('POOL')
+        if not pool_settings:
+            return super().get_new_connection(conn_params)
+        try:
+            return get_pool(self.alias, pool_settings).get(lambda: super(PooledConnectionMixin, self).get_new_connection(conn_params))
+        except PoolTimeout as e:
+            raise self.Database.OperationalError(str(e))
+
+    def _close(self):
+        pool_settings = self.settings_dict.get('POOL')
+        if self.connection is None or not pool_settings:
+            return super()._close()
+        with self.wrap_database_errors:
+            get_pool(self.alias, pool_settings).put(self.connection)
+
+
+class DatabaseWrapper(PooledConnectionMixin, postgresql.DatabaseWrapper):
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        # Only a new connection sets it; a pooled one has the same.
+        self.isolation_level = IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', IsolationLevel.READ_COMMITTED)
+        )
+        return connection
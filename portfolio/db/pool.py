@@ -0,0 +1,103 @@
+"""
+A pool of database connections shared by the threads of a process.
+
+At most ``max_size`` connections exist at a time, however many threads
+ask; a thread finding them all in use waits up to ``timeout`` seconds for
+one to be returned, then gets ``PoolTimeout``. Idle connections are handed
+out most recently used first, checked with ``check()`` when they sat idle
+longer than ``check_after`` seconds, and closed once older than
+``max_lifetime`` seconds, so the server can rebalance or restart.
+"""
+import collections
+import threading
+import time
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    def __init__(self, max_size, timeout=10, max_lifetime=600, check_after=30,
+                 check=lambda connection: True, reset=lambda connection: True):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.check_after = check_after
+        self.check = check
+        self.reset = reset
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        # (connection, created, returned) tuples; the newest on the right.
+        self._idle = collections.deque()
+        self._created = {}
+        self.opened = 0
+
+    def get(self, connect):
+        """
+        Return an idle connection, or a new one from ``connect()``.
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(f'No database connection free after {self.timeout}s ({self.max_size} in use).')
+        try:
+            while True:
+                with self._lock:
+                    item = self._idle.pop() if self._idle else None
+                if item is None:
+                    connection = connect()
+                    with self._lock:
+                        self._created[id(connection)] = time.monotonic()
+                        self.opened += 1
+                    return connection
+                connection, created, returned = item
+                now = time.monotonic()
+                if now - created > self.max_lifetime:
+                    self.discard(connection)
+                elif now - returned > self.check_after and not self.check(connection):
+                    self.discard(connection)
+                else:
+                    return connection
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def put(self, connection):
+        """
+        Take back a connection from ``get()``; ``reset()`` readies it for
+        reuse, and one it cannot ready is closed.
+        """
+        try:
+            with self._lock:
+                created = self._created.get(id(connection))
+            if created is not None and self.reset(connection):
+                with self._lock:
+                    self._idle.append((connection, created, time.monotonic()))
+            else:
+                self.discard(connection)
+        finally:
+            self._slots.release()
+
+    def discard(self, connection):
+        with self._lock:
+            self._created.pop(id(connection), None)
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def close(self):
+        """
+        Close the idle connections.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, collections.deque()
+        for connection, _, _ in idle:
+            self.discard(connection)
+
+    @property
+    def idle(self):
+        return len(self._idle)
+
+    @property
+    def size(self):
+        return len(self._created)
@@ -0,0 +1,186 @@
+"""
+Caching by a reverse proxy or CDN in front of the site.
+
+Every page cached by ``versioned_cache_page`` is also sent with headers
+letting a shared cache keep it until it changes:
+
+* ``Surrogate-Control`` and ``CDN-Cache-Control`` keep it at the edge for
+  ``EDGE_CACHE_MAX_AGE`` seconds; ``Cache-Control`` lets browsers keep it
+  for ``EDGE_BROWSER_MAX_AGE``, after which they revalidate its ETag;
+* ``Surrogate-Key`` (Varnish xkey, Fastly) and ``Cache-Tag`` (Cloudflare)
+  name what the page shows. A detail page gets the key of its object,
+  ``project-12``; other pages get the list key of each model they show,
+  ``blog-list``. Every page also gets ``<model>-all`` for each model.
+
+Saving or deleting an instance purges its own key, the list key of its
+model and the keys of the pages it appears on (an opportunity's project),
+once the transaction commits. Changes made in bulk, which bypass the save
+signals, purge ``<model>-all``. Purges go through the purger configured in
+``EDGE_PURGER``, as ``{'BACKEND': ..., 'OPTIONS': {...}}``; without one,
+nothing is purged and the edge relies on ``EDGE_CACHE_MAX_AGE``.
+
+An unprefixed URL is redirected by Django for visitors whose language
+cookie asks for English, so the proxy must pass such requests through, as
+the ``.htaccess`` rules of ``portfolio.prerender`` do.
+"""
+import json
+import logging
+import threading
+import urllib.request
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.cache import patch_cache_control
+from django.utils.module_loading import import_string
+
+from .models import (
+    Project, BlogPost, TeamMember, MediaAppearance,
+    InvestmentOpportunity, GalleryImage
+)
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIXES = {
+    Project: 'project',
+    BlogPost: 'blog',
+    TeamMember: 'team',
+    MediaAppearance: 'media',
+    InvestmentOpportunity: 'opportunity',
+    GalleryImage: 'gallery',
+}
+
+
+def instance_key(model, pk):
+    return f'{KEY_PREFIXES[model]}-{pk}'
+
+
+def list_key(model):
+    return f'{KEY_PREFIXES[model]}-list'
+
+
+def model_key(model):
+    return f'{KEY_PREFIXES[model]}-all'
+
+
+def page_keys(models, response):
+    """
+    Return the surrogate keys of a page showing ``models``: the key of the
+    object of a detail page of ``models[0]``, or else the list key of each
+    model, and the ``-all`` key of each model.
+    """
+    keys = [model_key(model) for model in models]
+    context = getattr(response, 'context_data', None) or {}
+    obj = context.get('object')
+    if isinstance(obj, models[0]):
+        return keys + [instance_key(models[0], obj.pk)]
+    return keys + [list_key(model) for model in models]
+
+
+def purge_keys(model, instance):
+    """
+    Return the surrogate keys to purge when ``instance`` is saved or
+    deleted.
+    """
+    keys = {list_key(model), instance_key(model, instance.pk)}
+    if model is InvestmentOpportunity:
+        # The project page lists its opportunities, before and after a move.
+        for project_id in {instance.project_id, getattr(instance, '_funded_project_id', None)} - {None}:
+            keys.add(instance_key(Project, project_id))
+    return keys
+
+
+def add_edge_headers(response, models):
+    """
+    Let shared caches keep ``response``, a page showing ``models``, until a
+    purge of one of its keys.
+    """
+    max_age = getattr(settings, 'EDGE_CACHE_MAX_AGE', 60 * 60 * 24 * 30)
+    patch_cache_control(response, public=True, max_age=getattr(settings, 'EDGE_BROWSER_MAX_AGE', 0))
+    response['Surrogate-Control'] = response['CDN-Cache-Control'] = f'max-age={max_age}'
+    keys = page_keys(models, response)
+    response['Surrogate-Key'] = ' '.join(keys)
+    response['Cache-Tag'] = ','.join(keys)
+
+
+class HttpPurger:
+    """
+    Purge keys with an HTTP request to ``url``, ``batch_size`` keys at a
+    time: in the ``header`` request header, separated by spaces, or with
+    ``json_field`` as a JSON body such as ``{"tags": [...]}``. ``headers``
+    are sent as well, e.g. an API token.
+
+    Varnish with xkey takes ``method='PURGE', header='xkey'``; Fastly
+    ``url='https://api.fastly.com/service/<id>/purge'`` with its
+    ``Fastly-Key`` header; Cloudflare the zone's ``purge_cache`` URL with
+    ``json_field='tags'``.
+    """
+
+    def __init__(self, url, method='POST', header='Surrogate-Key', json_field=None, headers=None,
+                 batch_size=256, timeout=5):
+        self.url = url
+        self.method = method
+        self.header = header
+        self.json_field = json_field
+        self.headers = headers or {}
+        self.batch_size = batch_size
+        self.timeout = timeout
+
+    def purge(self, keys):
+        keys = sorted(keys)
+        for start in range(0, len(keys), self.batch_size):
+            self.send(keys[start:start + self.batch_size])
+
+    def send(self, keys):
+        headers = dict(self.headers)
+        data = None
+        if self.json_field:
+            headers['Content-Type'] = 'application/json'
+            data = json.dumps({self.json_field: keys}).encode()
+        else:
+            headers[self.header] = ' '.join(keys)
+        request = urllib.request.Request(self.url, data=data, headers=headers, method=self.method)
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+def get_purger():
+    config = getattr(settings, 'EDGE_PURGER', None)
+    if not config:
+        return None
+    return import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+
+
+_pending = threading.local()
+
+
+def schedule_purge(keys):
+    """
+    Purge ``keys`` once the current transaction commits. Keys changed
+    several times in a transaction are purged once.
+    """
+    if not getattr(settings, 'EDGE_PURGER', None):
+        return
+    if not hasattr(_pending, 'keys'):
+        _pending.keys = set()
+    _pending.keys.update(keys)
+    transaction.on_commit(flush)
+
+
+def schedule_instance_purge(model, instance):
+    schedule_purge(purge_keys(model, instance))
+
+
+def schedule_model_purge(model):
+    schedule_purge([model_key(model)])
+
+
+def flush():
+    keys = getattr(_pending, 'keys', None)
+    if not keys:
+        return
+    _pending.keys = set()
+    try:
+        get_purger().purge(keys)
+    except OSError:
+        # The pages stay cached until EDGE_CACHE_MAX_AGE; the save stands.
+        logger.exception('Purging %d surrogate keys failed.', len(keys))
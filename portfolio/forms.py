@@ -0,0 +1,9 @@
+from django import forms
+
+from .models import ContactSubmission
+
+
+class ContactForm(forms.ModelForm):
+    class Meta:
+        model = ContactSubmission
+        fields = ['name', 'email', 'phone', 'subject', 'message']
@@ -0,0 +1,119 @@
+"""
+Funding summaries of projects.
+
+A project's ``ProjectFunding`` row is recomputed from its opportunities
+inside the transaction that changed them. The summary row is locked
+before the opportunities are summed, so concurrent changes to different
+opportunities of one project are summed one after the other and each
+sees the other's committed shares: the row can never be left behind by a
+lost update. A transaction locks every opportunity it changes, in primary
+key order, before any summary, and summaries in project order, so the
+locks cannot deadlock: ``release_reservations()`` returns the shares of
+all its opportunities before it adjusts their projects.
+
+Share reservations only move shares between available and sold, so they
+add the difference to the summary with one UPDATE instead
+(``adjust_project_funding()``), without reading or locking the row first.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, Sum, Value, When
+from django.utils import timezone
+
+from .models import InvestmentOpportunity, Project, ProjectFunding
+
+# Funding levels: name -> (label, lookups on the funded percentage).
+FUNDING_LEVELS = {
+    'none': ('Not funded', {'lte': 0}),
+    'started': ('Under half funded', {'gt': 0, 'lt': 50}),
+    'half': ('Half funded or more', {'gte': 50, 'lt': 100}),
+    'full': ('Fully funded', {'gte': 100}),
+}
+
+
+def filter_funding_level(queryset, field, level):
+    """
+    Restrict ``queryset`` to rows whose funded percentage ``field`` falls
+    in funding ``level``.
+    """
+    _, lookups = FUNDING_LEVELS[level]
+    return queryset.filter(**{f'{field}__{lookup}': value for lookup, value in lookups.items()})
+
+
+SUMMARY_FIELDS = ['opportunities', 'total_shares', 'shares_sold', 'capital_raised', 'funded_percent']
+
+
+def summarize(project_ids=None):
+    """
+    Return unsaved ``ProjectFunding`` rows for ``project_ids`` (every
+    project if None), summed by the database in one grouped query.
+    """
+    opportunities = InvestmentOpportunity.objects.all()
+    if project_ids is not None:
+        opportunities = opportunities.filter(project_id__in=project_ids)
+    totals = (
+        opportunities.with_funding().order_by().values('project_id').annotate(
+            count=Count('pk'), shares=Sum('total_shares'),
+            sold=Sum('shares_sold'), raised=Sum('capital_raised'),
+        )
+    )
+    summaries = {
+        project_id: ProjectFunding(project_id=project_id, capital_raised=Decimal('0'), funded_percent=Decimal('0'))
+        for project_id in (project_ids if project_ids is not None else Project.objects.values_list('pk', flat=True))
+    }
+    for row in totals:
+        summary = summaries[row['project_id']]
+        summary.opportunities = row['count']
+        summary.total_shares = row['shares'] or 0
+        summary.shares_sold = max(row['sold'] or 0, 0)
+        summary.capital_raised = row['raised'] or Decimal('0')
+        if summary.total_shares:
+            summary.funded_percent = (
+                Decimal(summary.shares_sold) * 100 / summary.total_shares
+            ).quantize(Decimal('0.01'))
+    return list(summaries.values())
+
+
+def refresh_project_funding(project_id):
+    """
+    Recompute the funding summary of project ``project_id``.
+    """
+    with transaction.atomic():
+        funding, _ = ProjectFunding.objects.select_for_update().get_or_create(project_id=project_id)
+        summary, = summarize([project_id])
+        for field in SUMMARY_FIELDS:
+            setattr(funding, field, getattr(summary, field))
+        funding.save()
+
+
+def adjust_project_funding(project_id, shares_sold, price_per_share):
+    """
+    Add ``shares_sold`` shares at ``price_per_share`` to the summary of
+    project ``project_id``; negative when shares are returned.
+    """
+    sold = F('shares_sold') + shares_sold
+    ProjectFunding.objects.filter(project_id=project_id).update(
+        shares_sold=sold,
+        capital_raised=F('capital_raised') + shares_sold * price_per_share,
+        funded_percent=Case(
+            When(total_shares__gt=0, then=sold * Value(100.0) / F('total_shares')),
+            default=Value(0),
+            output_field=DecimalField(max_digits=5, decimal_places=2),
+        ),
+        updated_at=timezone.now(),
+    )
+
+
+def refresh_all_funding():
+    """
+    Recompute every project's summary in a few queries, e.g. after
+    opportunities were written with ``bulk_create()`` or ``update()``.
+    Returns the number of projects.
+    """
+    summaries = summarize()
+    ProjectFunding.objects.bulk_create(
+        summaries, batch_size=500,
+        update_conflicts=True, unique_fields=['project'], update_fields=[*SUMMARY_FIELDS, 'updated_at'],
+    )
+    return len(summaries)
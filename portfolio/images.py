@@ -0,0 +1,152 @@
+"""
+Responsive derivatives for uploaded images.
+
+Every ``ImageField`` on the portfolio models gets a set of width-bounded
+WebP and JPEG copies stored next to the original, e.g. ``gallery/cow.jpg``
+gets ``gallery/cow.w640.webp`` and ``gallery/cow.w640.jpg``. Originals
+are never upscaled: an original narrower than a target width gets the
+smaller widths and one copy at its own width instead. The widths written
+are listed in ``gallery/cow.derivatives.json``, which srcsets are built
+from.
+"""
+import json
+import logging
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.db import models
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_WIDTHS = (320, 640, 1024, 1600)
+
+DERIVATIVE_FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 6},
+    'jpg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+}
+
+
+def image_fields(model):
+    """
+    Return the names of the image fields on ``model``.
+    """
+    return [
+        field.name for field in model._meta.get_fields()
+        if isinstance(field, models.ImageField)
+    ]
+
+
+def derivative_name(name, width, extension):
+    root, _ = os.path.splitext(name)
+    return f'{root}.w{width}.{extension}'
+
+
+def manifest_name(name):
+    root, _ = os.path.splitext(name)
+    return f'{root}.derivatives.json'
+
+
+def widths_for(original_width):
+    """
+    Return the derivative widths of an original ``original_width`` wide.
+    """
+    widths = [width for width in DERIVATIVE_WIDTHS if width < original_width]
+    if original_width <= DERIVATIVE_WIDTHS[-1]:
+        widths.append(original_width)
+    return widths
+
+
+def has_derivatives(field_file):
+    """
+    Return True when ``field_file`` has already been processed.
+
+    The manifest is written last, so it marks completion.
+    """
+    return field_file.storage.exists(manifest_name(field_file.name))
+
+
+def derivative_widths(field_file):
+    """
+    Return the widths of the derivatives of ``field_file``, smallest first,
+    or None if they have not been generated.
+    """
+    try:
+        with field_file.storage.open(manifest_name(field_file.name), 'rb') as manifest:
+            return json.load(manifest)['widths']
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _encode(image, extension):
+    options = DERIVATIVE_FORMATS[extension]
+    if options['format'] == 'JPEG' and image.mode != 'RGB':
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        rgba = image.convert('RGBA')
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        image = background
+    buffer = BytesIO()
+    image.save(buffer, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def generate_derivatives(field_file, force=False):
+    """
+    Write every width/format derivative of ``field_file`` to its storage.
+
+    Returns the number of files written.
+    """
+    if not field_file or (not force and has_derivatives(field_file)):
+        return 0
+
+    storage = field_file.storage
+    if not storage.exists(field_file.name):
+        logger.debug('Skipping derivatives for missing image %s', field_file.name)
+        return 0
+    try:
+        with storage.open(field_file.name, 'rb') as source:
+            original = ImageOps.exif_transpose(Image.open(source))
+            original.load()
+    except (UnidentifiedImageError, OSError):
+        logger.warning('Could not read image %s for derivatives', field_file.name)
+        return 0
+
+    if original.mode not in ('RGB', 'RGBA'):
+        has_alpha = original.mode in ('LA', 'PA') or 'transparency' in original.info
+        original = original.convert('RGBA' if has_alpha else 'RGB')
+
+    manifest = manifest_name(field_file.name)
+    if storage.exists(manifest):
+        storage.delete(manifest)
+    widths = widths_for(original.width)
+    written = 0
+    for width in DERIVATIVE_WIDTHS:
+        for extension in ('jpg', 'webp'):
+            name = derivative_name(field_file.name, width, extension)
+            if width not in widths and storage.exists(name):
+                # Left by an earlier run or a replaced, wider original.
+                storage.delete(name)
+    for width in widths:
+        resized = original
+        if original.width > width:
+            height = round(original.height * width / original.width)
+            resized = original.resize((width, height), Image.LANCZOS)
+        for extension in ('jpg', 'webp'):
+            name = derivative_name(field_file.name, width, extension)
+            if storage.exists(name):
+                storage.delete(name)
+            storage.save(name, _encode(resized, extension))
+            written += 1
+    storage.save(manifest, ContentFile(json.dumps({'widths': widths}).encode()))
+    return written
+
+
+def generate_instance_derivatives(instance, force=False):
+    """
+    Generate derivatives for every image field on ``instance``.
+    """
+    written = 0
+    for name in image_fields(type(instance)):
+        written += generate_derivatives(getattr(instance, name), force=force)
+    return written
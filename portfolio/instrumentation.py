@@ -0,0 +1,177 @@
+"""
+Per-request performance timings.
+
+While ``ServerTimingMiddleware`` handles a sampled request it holds a
+``RequestTimings`` record in a context variable, and four cheap hooks add
+to it:
+
+* ``time_query``, installed on every database connection as it opens,
+  times each query and remembers the slowest;
+* ``TimedDjangoTemplates``, the template backend, times each top-level
+  render (queries run lazily by a template count towards both);
+* ``TimedCache``, which ``portfolio.cache.get_cache()`` returns, times each
+  call to the cache;
+* the ``portfolio.db`` database backend times each connection checkout,
+  whether it connects or takes a connection from its pool.
+
+Outside a sampled request the hooks only find no record and step aside.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+
+from django.template.backends.django import DjangoTemplates
+
+_current = ContextVar('portfolio_request_timings', default=None)
+
+# Long statements are cut, so that a record stays one readable log line.
+SQL_MAX_LENGTH = 500
+
+
+@dataclass
+class RequestTimings:
+    db: float = 0.0
+    queries: int = 0
+    slowest_sql: str = ''
+    slowest_sql_time: float = 0.0
+    render: float = 0.0
+    cache: float = 0.0
+    cache_calls: int = 0
+    checkout: float = 0.0
+    checkouts: int = 0
+
+    def server_timing(self, total):
+        """
+        Return the value of the ``Server-Timing`` header.
+        """
+        return ', '.join([
+            f'db;dur={self.db * 1000:.1f};desc="{self.queries} queries"',
+            f'checkout;dur={self.checkout * 1000:.1f};desc="{self.checkouts} connections"',
+            f'render;dur={self.render * 1000:.1f}',
+            f'cache;dur={self.cache * 1000:.1f};desc="{self.cache_calls} calls"',
+            f'total;dur={total * 1000:.1f}',
+        ])
+
+    def as_dict(self):
+        return {
+            key: round(value * 1000, 2) if isinstance(value, float) else value
+            for key, value in asdict(self).items()
+        }
+
+
+@contextmanager
+def recording():
+    """
+    Collect the timings of the code in the block into the yielded record.
+    """
+    record = RequestTimings()
+    token = _current.set(record)
+    try:
+        yield record
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def timed(metric, counter=None):
+    """
+    Add the time spent in the block to ``metric`` of the current record,
+    and one to ``counter`` if given.
+    """
+    record = _current.get()
+    if record is None:
+        yield
+        return
+    if counter:
+        setattr(record, counter, getattr(record, counter) + 1)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(record, metric, getattr(record, metric) + time.perf_counter() - started)
+
+
+def time_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper timing each query of the current record.
+    """
+    record = _current.get()
+    if record is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        record.db += elapsed
+        record.queries += 1
+        if elapsed > record.slowest_sql_time:
+            # The statement without its parameters, which may be personal.
+            record.slowest_sql = sql[:SQL_MAX_LENGTH]
+            record.slowest_sql_time = elapsed
+
+
+class TimedTemplate:
+    def __init__(self, template):
+        self._wrapped = template
+
+    def __getattr__(self, name):
+        return getattr(self._wrapped, name)
+
+    @property
+    def template(self):
+        # The engine template, as on the backend template it wraps.
+        return self._wrapped.template
+
+    def render(self, context=None, request=None):
+        with timed('render'):
+            return self._wrapped.render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    The Django template backend, timing every render.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+CACHE_METHODS = {
+    'get', 'get_many', 'get_or_set', 'set', 'set_many', 'add',
+    'delete', 'delete_many', 'incr', 'decr', 'touch', 'has_key',
+}
+
+
+class TimedCache:
+    """
+    A cache backend proxy timing every call of the current record.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def __getattr__(self, name):
+        attr = getattr(self.cache, name)
+        if name in CACHE_METHODS:
+            def method(*args, **kwargs):
+                with timed('cache', 'cache_calls'):
+                    return attr(*args, **kwargs)
+        elif name.startswith('a') and name[1:] in CACHE_METHODS:
+            async def method(*args, **kwargs):
+                with timed('cache', 'cache_calls'):
+                    return await attr(*args, **kwargs)
+        else:
+            return attr
+        return method
+
+
+def timed_cache(cache):
+    """
+    Return ``cache``, timed when a request is being recorded.
+    """
+    return cache if _current.get() is None else TimedCache(cache)
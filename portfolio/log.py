@@ -0,0 +1,116 @@
+"""
+Logging off the request thread.
+
+``QueueHandler`` only puts records on an in-memory queue; a listener
+thread per handler takes them off and passes them to the handlers that
+write to disk, so a slow disk delays the log, not the response. The
+target handlers are named in the ``LOGGING`` setting::
+
+    'queue': {
+        '()': 'portfolio.log.QueueHandler',
+        'handlers': ['file', 'console'],
+    },
+
+and ``configure_logging()``, set as ``LOGGING_CONFIG``, starts the
+listeners once the configuration is applied. Records still queued when
+the process exits are written by ``logging.shutdown()``; a worker killed
+outright loses them.
+
+``JsonFormatter`` writes a record as one line of JSON, including the dict
+passed as ``extra={'fields': {...}}``; it runs in the listener thread, so
+the request thread never serializes anything.
+"""
+import copy
+import json
+import logging
+import logging.config
+import logging.handlers
+import os
+import queue
+import weakref
+from datetime import datetime, timezone
+
+_running = weakref.WeakSet()
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue records for a listener thread that passes them to the handlers
+    named ``handlers``.
+    """
+
+    def __init__(self, handlers):
+        super().__init__(queue.SimpleQueue())
+        self.handler_names = handlers
+        self.listener = None
+
+    def prepare(self, record):
+        # Merge the message here: once the request moves on, its arguments
+        # may change, or need the database to be turned into text.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def start(self, handlers):
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self.listener.start()
+        _running.add(self)
+
+    def close(self):
+        # Drain the queue into the target handlers before they are closed.
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+            _running.discard(self)
+        super().close()
+
+
+def _restart_listeners():
+    # A forked child inherits the queues but not the listener threads.
+    for handler in list(_running):
+        handler.listener.start()
+
+
+os.register_at_fork(after_in_child=_restart_listeners)
+
+
+def configure_logging(config):
+    """
+    Apply the ``LOGGING`` setting, as Django does, then start the listener
+    of every ``QueueHandler`` in it.
+    """
+    configurator = logging.config.DictConfigurator(config)
+    configurator.configure()
+    # The configurator replaces each handler's configuration with the handler.
+    handlers = configurator.config.get('handlers', {})
+    for handler in handlers.values():
+        if isinstance(handler, QueueHandler):
+            handler.start([handlers[name] for name in handler.handler_names])
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format a record as one line of JSON: its time, level and logger, and
+    either the fields it was logged with or its message.
+    """
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+        }
+        fields = getattr(record, 'fields', None)
+        if fields:
+            entry.update(fields)
+        else:
+            entry['message'] = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
@@ -0,0 +1,184 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import transaction
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+from portfolio.benchmarking import summarize, wsgi_environ
+from portfolio.models import Project, ProjectFunding
+from portfolio.sample_data import generate_sample_data
+from portfolio.signals import CACHED_MODELS
+
+DEFAULT_PAGES = ['portfolio:home', 'portfolio:about', 'portfolio:investment']
+
+
+class Command(BaseCommand):
+    help = (
+        'Serve the same pages through the WSGI and the ASGI handler, in '
+        'process, and compare latency and throughput at several levels of '
+        'concurrency.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests per run.')
+        parser.add_argument(
+            '--concurrency', default='1,8,32',
+            help='Comma-separated numbers of concurrent clients (default: 1,8,32).',
+        )
+        parser.add_argument(
+            '--page', action='append', dest='pages',
+            help='URL name of a page to request, round-robin (default: home, about, investment).',
+        )
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Bypass the page cache, so every request queries and renders.',
+        )
+        parser.add_argument(
+            '--seed', action='store_true',
+            help='Add the synthetic dataset for the run and delete it afterwards.',
+        )
+        parser.add_argument('--json', help='Also write the results to this file.')
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(level) for level in options['concurrency'].split(',')]
+        except ValueError:
+            raise CommandError('--concurrency takes comma-separated integers.')
+        self.host = next((host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')), 'localhost')
+        self.paths = [reverse(name) for name in options['pages'] or DEFAULT_PAGES]
+
+        self.report_sync_middleware()
+        seeded = self.seed() if options['seed'] else None
+        caches = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}} if options['cold'] else settings.CACHES
+        results = []
+        try:
+            with override_settings(CACHES=caches):
+                for mode, urlconf in (('wsgi', 'hawladar_agro.urls'), ('asgi', 'hawladar_agro.urls_asgi')):
+                    with override_settings(ROOT_URLCONF=urlconf):
+                        for level in levels:
+                            result = self.run(mode, options['requests'], level)
+                            results.append(result)
+                            self.write_result(result)
+        finally:
+            if seeded:
+                self.unseed(seeded)
+
+        if options['json']:
+            with open(options['json'], 'w') as handle:
+                json.dump({'paths': self.paths, 'cold': options['cold'], 'results': results}, handle, indent=2)
+
+    def report_sync_middleware(self):
+        sync_only = [
+            path for path in settings.MIDDLEWARE
+            if not getattr(import_string(path), 'async_capable', False)
+        ]
+        if sync_only:
+            self.stdout.write(self.style.WARNING(
+                'Sync-only middleware, adapted with a thread switch per request under ASGI: '
+                + ', '.join(sync_only)
+            ))
+
+    def seed(self):
+        # Rows above these keys are the synthetic ones.
+        marks = {model: model.objects.order_by('-pk').values_list('pk', flat=True).first() or 0 for model in CACHED_MODELS}
+        with transaction.atomic():
+            counts = generate_sample_data()
+        self.stdout.write('Seeded ' + ', '.join(
+            f'{count} {model._meta.verbose_name_plural}' for model, count in counts.items()
+        ))
+        return marks
+
+    def unseed(self, marks):
+        with transaction.atomic():
+            for model, mark in marks.items():
+                model.objects.filter(pk__gt=mark).delete()
+            ProjectFunding.objects.filter(project_id__gt=marks[Project]).delete()
+
+    def run(self, mode, requests, concurrency):
+        paths = [self.paths[i % len(self.paths)] for i in range(requests)]
+        if mode == 'wsgi':
+            application = get_wsgi_application()
+            for path in self.paths:
+                self.wsgi_request(application, path)
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                outcomes = list(executor.map(lambda path: self.wsgi_request(application, path), paths))
+        else:
+            application = get_asgi_application()
+            outcomes, started = asyncio.run(self.asgi_run(application, paths, concurrency))
+        elapsed = time.perf_counter() - started
+        result = summarize([latency for latency, _ in outcomes], elapsed, sum(1 for _, status in outcomes if status != 200))
+        return {'mode': mode, 'concurrency': concurrency, **result}
+
+    def wsgi_request(self, application, path):
+        status = []
+        started = time.perf_counter()
+        response = application(wsgi_environ(self.host, path), lambda line, headers: status.append(int(line.split()[0])))
+        try:
+            for _ in response:
+                pass
+        finally:
+            # Sends request_finished, which closes the thread's connection.
+            response.close()
+        return time.perf_counter() - started, status[0]
+
+    async def asgi_run(self, application, paths, concurrency):
+        for path in self.paths:
+            await self.asgi_request(application, path)
+        queue = asyncio.Queue()
+        for path in paths:
+            queue.put_nowait(path)
+        outcomes = []
+
+        async def client():
+            while not queue.empty():
+                outcomes.append(await self.asgi_request(application, queue.get_nowait()))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        return outcomes, started
+
+    async def asgi_request(self, application, path):
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': 'GET', 'scheme': 'https', 'path': path, 'raw_path': path.encode(),
+            'root_path': '', 'query_string': b'', 'headers': [(b'host', self.host.encode())],
+            'client': ('127.0.0.1', 0), 'server': (self.host, 443),
+        }
+        disconnected = asyncio.Event()
+        body_sent = False
+        status = []
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            # The client stays connected until the response is complete.
+            await disconnected.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status.append(message['status'])
+
+        started = time.perf_counter()
+        await application(scope, receive, send)
+        disconnected.set()
+        return time.perf_counter() - started, status[0]
+
+    def write_result(self, result):
+        self.stdout.write(
+            f'{result["mode"]:>4} x{result["concurrency"]:<3} '
+            f'{result["throughput"]:8.1f} req/s  '
+            f'p50 {result["p50_ms"]:7.2f}ms  p95 {result["p95_ms"]:7.2f}ms  p99 {result["p99_ms"]:7.2f}ms'
+            + (f'  {result["errors"]} errors' if result['errors'] else '')
+        )
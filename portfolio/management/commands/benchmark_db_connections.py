@@ -0,0 +1,147 @@
+import json
+import queue
+import re
+import statistics
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from portfolio.benchmarking import summarize, wsgi_environ
+from portfolio.db.base import PooledConnectionMixin, close_pools
+
+CHECKOUT = re.compile(r'checkout;dur=([\d.]+)')
+
+
+class Command(BaseCommand):
+    help = (
+        'Serve the same page with a new database connection per request, '
+        'with persistent connections and with the connection pool, and '
+        'report latency, connections opened and time spent checking out '
+        'connections. Run it against the production database settings.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests per mode.')
+        parser.add_argument('--threads', type=int, default=1, help='Threads serving requests.')
+        parser.add_argument('--pool-size', type=int, default=2, help='Connections in the pool.')
+        parser.add_argument('--page', default='portfolio:about', help='URL name of the page to request.')
+        parser.add_argument('--json', help='Also write the results to this file.')
+
+    def handle(self, *args, **options):
+        self.host = next((host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')), 'localhost')
+        self.path = reverse(options['page'])
+        modes = {
+            'per-request': {'CONN_MAX_AGE': 0, 'POOL': None},
+            'persistent': {'CONN_MAX_AGE': 600, 'CONN_HEALTH_CHECKS': True, 'POOL': None},
+            'pooled': {'CONN_MAX_AGE': 0, 'POOL': {'MAX_SIZE': options['pool_size']}},
+        }
+        if not isinstance(connections[DEFAULT_DB_ALIAS], PooledConnectionMixin):
+            self.stdout.write(self.style.WARNING(
+                "The database ENGINE is not 'portfolio.db': checkouts are not timed and there is no pool."
+            ))
+            del modes['pooled']
+
+        settings_dict = connections[DEFAULT_DB_ALIAS].settings_dict
+        saved = {key: settings_dict.get(key) for key in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS', 'POOL')}
+        results = []
+        # Every request reaches the database and reports its checkout time.
+        caches = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        try:
+            with override_settings(CACHES=caches, SERVER_TIMING_SAMPLE_RATE=1):
+                for mode, values in modes.items():
+                    connections.close_all()
+                    close_pools()
+                    settings_dict.update(values)
+                    result = self.run(mode, options['requests'], options['threads'])
+                    results.append(result)
+                    self.write_result(result, results[0])
+        finally:
+            connections.close_all()
+            close_pools()
+            settings_dict.update(saved)
+
+        if options['json']:
+            with open(options['json'], 'w') as handle:
+                json.dump({
+                    'path': self.path, 'threads': options['threads'],
+                    'database': connections[DEFAULT_DB_ALIAS].vendor, 'results': results,
+                }, handle, indent=2)
+
+    def run(self, mode, requests, threads):
+        application = get_wsgi_application()
+        pending = queue.SimpleQueue()
+        for _ in range(requests):
+            pending.put(self.path)
+        latencies, checkouts, statuses = [], [], []
+        opened = []
+
+        def count_connection(sender, connection, **kwargs):
+            opened.append(connection.alias)
+
+        def serve():
+            try:
+                while True:
+                    try:
+                        path = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    latency, status, headers = self.request(application, path)
+                    latencies.append(latency)
+                    statuses.append(status)
+                    match = CHECKOUT.search(headers.get('Server-Timing', ''))
+                    checkouts.append(float(match[1]) if match else 0.0)
+            finally:
+                connections.close_all()
+
+        connection_created.connect(count_connection)
+        try:
+            workers = [threading.Thread(target=serve) for _ in range(threads)]
+            started = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - started
+        finally:
+            connection_created.disconnect(count_connection)
+        return {
+            'mode': mode,
+            'connections_opened': len(opened),
+            'checkout_ms': statistics.fmean(checkouts),
+            'mean_ms': statistics.fmean(latencies) * 1000,
+            **summarize(latencies, elapsed, sum(1 for status in statuses if status != 200)),
+        }
+
+    def request(self, application, path):
+        response_headers = {}
+
+        def start_response(line, headers):
+            response_headers['status'] = int(line.split()[0])
+            response_headers.update(headers)
+
+        started = time.perf_counter()
+        response = application(wsgi_environ(self.host, path), start_response)
+        try:
+            for _ in response:
+                pass
+        finally:
+            # Sends request_finished, which closes or keeps the connection.
+            response.close()
+        return time.perf_counter() - started, response_headers.pop('status'), response_headers
+
+    def write_result(self, result, baseline):
+        saved = baseline['mean_ms'] - result['mean_ms']
+        self.stdout.write(
+            f'{result["mode"]:>11}  p50 {result["p50_ms"]:7.2f}ms  p95 {result["p95_ms"]:7.2f}ms  '
+            f'p99 {result["p99_ms"]:7.2f}ms  checkout {result["checkout_ms"]:6.2f}ms  '
+            f'{result["connections_opened"]:4} connections'
+            + (f'  saves {saved:.2f}ms per request' if result is not baseline else '')
+            + (f'  {result["errors"]} errors' if result['errors'] else '')
+        )
@@ -0,0 +1,133 @@
+import json
+import logging
+import logging.handlers
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+from portfolio.benchmarking import summarize
+from portfolio.log import JsonFormatter, QueueHandler
+
+MODES = ('off', 'sync', 'queued')
+LOGGERS = ('portfolio.access', 'portfolio.benchmark')
+
+
+class SlowDiskHandler(logging.handlers.RotatingFileHandler):
+    """
+    A rotating file handler that takes ``latency`` seconds longer per
+    record, as a busy shared disk does.
+    """
+
+    def __init__(self, *args, latency=0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latency = latency
+
+    def emit(self, record):
+        super().emit(record)
+        if self.latency:
+            time.sleep(self.latency)
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure what logging adds to request latency: requests are served '
+        'with logging off, with records written on the request thread, and '
+        'with records queued for a listener thread (portfolio.log).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Requests per mode.')
+        parser.add_argument('--page', default='portfolio:about', help='URL name of the page to request.')
+        parser.add_argument(
+            '--burst', type=int, default=5,
+            help='Warnings logged per request, on top of its access log line.',
+        )
+        parser.add_argument(
+            '--disk-latency', type=float, default=0,
+            help='Milliseconds added to every write, to mimic a slow shared disk.',
+        )
+        parser.add_argument('--json', help='Also write the results to this file.')
+
+    def handle(self, *args, **options):
+        host = next((host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')), 'localhost')
+        self.client = Client(HTTP_HOST=host)
+        self.path = reverse(options['page'])
+        # Fill the page cache, so the requests cost little besides logging.
+        self.client.get(self.path, secure=True)
+
+        saved = {name: self.save_logger(name) for name in LOGGERS}
+        results = []
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                for mode in MODES:
+                    target = SlowDiskHandler(
+                        Path(directory) / f'{mode}.log', maxBytes=1024 * 1024, backupCount=2,
+                        latency=options['disk_latency'] / 1000,
+                    )
+                    target.setFormatter(JsonFormatter())
+                    result = self.run(mode, target, options['requests'], options['burst'])
+                    results.append(result)
+                    self.write_result(result, results[0])
+        finally:
+            for name, state in saved.items():
+                self.restore_logger(name, state)
+
+        if options['json']:
+            with open(options['json'], 'w') as handle:
+                json.dump({
+                    'path': self.path, 'burst': options['burst'],
+                    'disk_latency_ms': options['disk_latency'], 'results': results,
+                }, handle, indent=2)
+
+    def run(self, mode, target, requests, burst):
+        if mode == 'queued':
+            handler = QueueHandler([])
+            handler.start([target])
+        else:
+            handler = target
+        for name in LOGGERS:
+            logger = logging.getLogger(name)
+            logger.handlers = [handler]
+            logger.setLevel(logging.CRITICAL + 1 if mode == 'off' else logging.INFO)
+            logger.propagate = False
+        burst_logger = logging.getLogger('portfolio.benchmark')
+
+        latencies, errors = [], 0
+        started = time.perf_counter()
+        for i in range(requests):
+            request_started = time.perf_counter()
+            response = self.client.get(self.path, secure=True)
+            for n in range(burst):
+                burst_logger.warning('Benchmark warning %d of request %d', n, i)
+            latencies.append(time.perf_counter() - request_started)
+            errors += response.status_code != 200
+        elapsed = time.perf_counter() - started
+
+        # Closing waits for the listener to write what is still queued.
+        draining = time.perf_counter()
+        handler.close()
+        target.close()
+        return {'mode': mode, 'drain_s': time.perf_counter() - draining, **summarize(latencies, elapsed, errors)}
+
+    def save_logger(self, name):
+        logger = logging.getLogger(name)
+        return logger.handlers[:], logger.level, logger.propagate
+
+    def restore_logger(self, name, state):
+        logger = logging.getLogger(name)
+        logger.handlers, level, logger.propagate = state
+        logger.setLevel(level)
+
+    def write_result(self, result, baseline):
+        overhead = result['p50_ms'] - baseline['p50_ms']
+        self.stdout.write(
+            f'{result["mode"]:>6}  p50 {result["p50_ms"]:7.2f}ms  p95 {result["p95_ms"]:7.2f}ms  '
+            f'p99 {result["p99_ms"]:7.2f}ms  {result["throughput"]:8.1f} req/s'
+            + (f'  overhead {overhead:+.2f}ms' if result is not baseline else '')
+            + (f'  drained in {result["drain_s"]:.2f}s' if result['mode'] == 'queued' else '')
+        )
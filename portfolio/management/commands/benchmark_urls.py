@@ -0,0 +1,160 @@
+import json
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from portfolio import urls
+from portfolio.benchmarking import percentile
+from portfolio.signals import CACHED_MODELS
+
+# Query strings for routes that render differently with one.
+QUERY_STRINGS = {'search': 'q=sample'}
+
+
+def routes():
+    """
+    Yield ``(name, path)`` for every route of the portfolio app. Detail
+    routes are given the slug of the first row of their view's model;
+    those without any row are skipped.
+    """
+    for pattern in urls.urlpatterns:
+        name = pattern.name
+        kwargs = {}
+        if 'slug' in pattern.pattern.converters:
+            model = pattern.callback.view_class.model
+            slug = model.objects.order_by('pk').values_list('slug', flat=True).first()
+            if slug is None:
+                continue
+            kwargs['slug'] = slug
+        path = reverse(f'{urls.app_name}:{name}', kwargs=kwargs)
+        if name in QUERY_STRINGS:
+            path = f'{path}?{QUERY_STRINGS[name]}'
+        yield name, path
+
+
+def measure(client, path, iterations):
+    """
+    Request ``path`` ``iterations`` times and return its latency
+    percentiles, queries per request and bytes rendered.
+    """
+    latencies, queries = [], []
+    statuses = set()
+    size = 0
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = client.get(path, secure=True)
+            latencies.append(time.perf_counter() - started)
+        queries.append(len(captured))
+        statuses.add(response.status_code)
+        size = len(response.content)
+    latencies.sort()
+    return {
+        'path': path,
+        'status': sorted(statuses),
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'mean_ms': statistics.fmean(latencies) * 1000,
+        'queries': max(queries),
+        'bytes': size,
+    }
+
+
+def git_revision():
+    try:
+        process = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+        )
+    except OSError:
+        return None
+    return process.stdout.strip() or None
+
+
+class Command(BaseCommand):
+    help = (
+        'Request every page of the portfolio app and report p50/p95/p99 '
+        'latency, queries per request and bytes rendered, optionally saving '
+        'the results as JSON and comparing them with an earlier run. Run '
+        'generate_sample_data first to measure at scale.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help='Requests per route.')
+        parser.add_argument(
+            '--warm', action='store_true',
+            help='Serve from the page cache; by default it is bypassed, so every request queries and renders.',
+        )
+        parser.add_argument(
+            '--route', action='append', dest='routes',
+            help='URL name of a route to request (default: all).',
+        )
+        parser.add_argument('--output', help='Write the results to this JSON file.')
+        parser.add_argument('--compare', help='JSON file of an earlier run to compare with.')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1.')
+        previous = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as handle:
+                    previous = json.load(handle)['routes']
+            except (OSError, ValueError, KeyError) as e:
+                raise CommandError(f'Cannot read {options["compare"]}: {e}')
+
+        selected = list(routes())
+        if options['routes']:
+            unknown = set(options['routes']) - {name for name, _ in selected}
+            if unknown:
+                raise CommandError(f'Unknown or empty routes: {", ".join(sorted(unknown))}')
+            selected = [(name, path) for name, path in selected if name in options['routes']]
+
+        host = next((host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')), 'localhost')
+        client = Client(HTTP_HOST=host)
+        cold = not options['warm']
+        caches = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}} if cold else settings.CACHES
+        results = {}
+        with override_settings(CACHES=caches):
+            for name, path in selected:
+                # One unmeasured request compiles the templates and, when
+                # warm, fills the page cache.
+                client.get(path, secure=True)
+                results[name] = measure(client, path, options['iterations'])
+                self.write_result(name, results[name], previous and previous.get(name))
+
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump({
+                    'created': datetime.now(timezone.utc).isoformat(),
+                    'revision': git_revision(),
+                    'database': connection.vendor,
+                    'cache': 'cold' if cold else 'warm',
+                    'iterations': options['iterations'],
+                    'rows': {model._meta.label: model.objects.count() for model in CACHED_MODELS},
+                    'routes': results,
+                }, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}.'))
+
+    def write_result(self, name, result, previous=None):
+        line = (
+            f'{name:<15} p50 {result["p50_ms"]:7.2f}ms  p95 {result["p95_ms"]:7.2f}ms  '
+            f'p99 {result["p99_ms"]:7.2f}ms  {result["queries"]:3} queries  {result["bytes"]:8} bytes'
+        )
+        if result['status'] != [200]:
+            line += '  status ' + ','.join(map(str, result['status']))
+        if previous:
+            change = (result['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100 if previous['p95_ms'] else 0
+            line += f'  (p95 {change:+.0f}%, queries {result["queries"] - previous["queries"]:+d})'
+            if change > 10 or result['queries'] > previous['queries']:
+                line = self.style.ERROR(line)
+        self.stdout.write(line)
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from portfolio.assets import build, manifest_path, static_root
+
+
+class Command(BaseCommand):
+    help = (
+        'Bundle, minify and purge the site CSS/JS into content-hashed files '
+        'and extract critical CSS. Run before collectstatic.'
+    )
+
+    def handle(self, *args, **options):
+        manifest = build()
+        js_size = (static_root() / manifest['js']).stat().st_size
+        self.stdout.write(f"{manifest['js']}: {js_size / 1024:.0f} KB")
+        for name, entry in manifest['pages'].items():
+            critical = entry['critical']
+            line = f"{name}: {manifest['sizes'][entry['css']] / 1024:.0f} KB"
+            if critical:
+                line += f", {len(critical.encode()) / 1024:.0f} KB critical inlined"
+            self.stdout.write(line)
+        self.stdout.write(self.style.SUCCESS(f'Manifest: {manifest_path()}'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from portfolio.reservations import expire_reservations, publish_availability
+
+
+class Command(BaseCommand):
+    help = (
+        'Release the shares of held reservations whose hold has expired, and '
+        'refresh the pages showing the availability of opportunities whose '
+        'reservations changed. Run it from cron every few minutes.'
+    )
+
+    def handle(self, *args, **options):
+        released = expire_reservations()
+        self.stdout.write(self.style.SUCCESS(f'{released} expired reservation(s) released.'))
+        published = publish_availability()
+        self.stdout.write(f'Availability of {published} opportunity(ies) published.')
@@ -0,0 +1,134 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from portfolio.models import (
+    Project, BlogPost, TeamMember, MediaAppearance,
+    InvestmentOpportunity, GalleryImage
+)
+from portfolio.pagination import KeysetPaginator
+from portfolio.sample_data import generate_sample_data
+from portfolio.views import BlogListView, GalleryListView, ProjectListView, TeamListView
+
+SEQUENTIAL_SCAN = {
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    'sqlite': re.compile(r'\bSCAN (?:TABLE )?(\w+)\s*$', re.MULTILINE),
+}
+
+
+def keyset_pages(view_class):
+    """
+    Return the first page and a page three pages deep of a keyset-paginated
+    list view.
+    """
+    paginator = KeysetPaginator(view_class().get_queryset(), view_class.paginate_by)
+    page = paginator.page()
+    first, _ = paginator.page_queryset()
+    for _ in range(2):
+        if page.has_next():
+            page = paginator.page(page.next_token)
+    deep = first
+    if page.has_next():
+        deep, _ = paginator.page_queryset(page.next_token)
+    return first, deep
+
+
+def view_querysets():
+    """
+    Return ``(label, queryset, whole_table)`` for every query the public
+    views run. ``whole_table`` marks listings that read every matching row
+    by design, where a sequential scan is a reasonable plan.
+    """
+    project = Project.objects.values_list('pk', 'slug').first() or (0, '')
+    post_slug = BlogPost.objects.filter(status='published').values_list('slug', flat=True).first() or ''
+    blog_first, blog_deep = keyset_pages(BlogListView)
+    gallery_first, gallery_deep = keyset_pages(GalleryListView)
+    return [
+        ('home: featured projects', Project.objects.filter(is_featured=True)[:3], False),
+        ('home: latest posts', BlogPost.objects.filter(status='published')[:3], False),
+        ('home: featured team', TeamMember.objects.filter(is_featured=True)[:3], False),
+        ('home: media appearances', MediaAppearance.objects.filter(is_featured=True)[:6], False),
+        ('home: featured images', GalleryImage.objects.filter(is_featured=True)[:6], False),
+        ('home: opportunities', InvestmentOpportunity.objects.filter(is_active=True, featured=True)[:2], False),
+        ('project_list', ProjectListView().get_queryset()[:ProjectListView.paginate_by], False),
+        ('project_detail', Project.objects.filter(slug=project[1]), False),
+        ('project_detail: opportunities', InvestmentOpportunity.objects.filter(project__in=[project[0]]), False),
+        ('blog_list: first page', blog_first, False),
+        ('blog_list: deep page', blog_deep, False),
+        ('blog_detail', BlogPost.objects.filter(slug=post_slug), False),
+        ('team', TeamListView().get_queryset(), True),
+        ('gallery: first page', gallery_first, False),
+        ('gallery: deep page', gallery_deep, False),
+        ('about', TeamMember.objects.all(), True),
+        ('investment', InvestmentOpportunity.objects.filter(is_active=True), True),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Run EXPLAIN on the query of every public view against a seeded '
+        'dataset and flag sequential scans.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--no-seed', action='store_true',
+            help='Explain against the existing rows instead of a synthetic dataset.',
+        )
+        parser.add_argument(
+            '--scale', type=int, default=1,
+            help='Multiply the size of the synthetic dataset.',
+        )
+        parser.add_argument(
+            '--fail-on-seq-scan', action='store_true',
+            help='Exit with an error if a bounded query scans a whole table.',
+        )
+
+    def handle(self, *args, **options):
+        pattern = SEQUENTIAL_SCAN.get(connection.vendor)
+        if pattern is None:
+            self.stdout.write(self.style.WARNING(
+                f'Sequential scans are not detected on {connection.vendor}; printing plans only.'
+            ))
+
+        with transaction.atomic():
+            if not options['no_seed']:
+                scale = options['scale']
+                counts = generate_sample_data(
+                    projects=200 * scale, posts=2000 * scale, team_members=200 * scale,
+                    media_appearances=500 * scale, images=2000 * scale,
+                )
+                self.stdout.write('Seeded ' + ', '.join(
+                    f'{count} {model._meta.verbose_name_plural}' for model, count in counts.items()
+                ))
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE')
+            flagged = self.explain(pattern)
+            # The synthetic rows never outlive the command.
+            transaction.set_rollback(True)
+
+        if flagged and options['fail_on_seq_scan']:
+            raise CommandError(f'Sequential scans in: {", ".join(flagged)}')
+
+    def explain(self, pattern):
+        flagged = []
+        scans = 0
+        for label, queryset, whole_table in view_querysets():
+            plan = queryset.explain()
+            tables = pattern.findall(plan) if pattern else []
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            for line in plan.splitlines():
+                self.stdout.write(f'    {line}')
+            if not tables:
+                continue
+            scans += 1
+            if whole_table:
+                self.stdout.write(f'    sequential scan on {", ".join(tables)} (reads every matching row)')
+            else:
+                flagged.append(label)
+                self.stdout.write(self.style.WARNING(f'    SEQUENTIAL SCAN on {", ".join(tables)}'))
+
+        summary = f'{scans} sequential scans, {len(flagged)} on bounded queries.'
+        self.stdout.write(self.style.WARNING(summary) if flagged else self.style.SUCCESS(summary))
+        return flagged
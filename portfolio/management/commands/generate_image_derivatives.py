@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from portfolio.images import generate_derivatives, image_fields
+from portfolio.signals import CACHED_MODELS
+
+
+class Command(BaseCommand):
+    help = 'Backfill responsive WebP/JPEG derivatives for uploaded images.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Regenerate derivatives that already exist.',
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        for model in CACHED_MODELS:
+            fields = image_fields(model)
+            if not fields:
+                continue
+            written = 0
+            for instance in model.objects.only('pk', *fields).iterator():
+                for name in fields:
+                    written += generate_derivatives(getattr(instance, name), force=options['force'])
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {written} files written')
+            total += written
+        self.stdout.write(self.style.SUCCESS(f'Done: {total} derivative files written'))
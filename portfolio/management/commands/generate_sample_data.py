@@ -0,0 +1,80 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import NotSupportedError, transaction
+
+from portfolio import edge, prerender
+from portfolio.cache import bump_version
+from portfolio.sample_data import SAMPLE_ROWS, delete_sample_data, generate_sample_data
+from portfolio.search import SEARCH_FIELDS, rebuild_index
+from portfolio.signals import CACHED_MODELS
+
+
+class Command(BaseCommand):
+    help = (
+        'Insert a synthetic dataset for benchmarks, e.g. 10k posts and 50k '
+        'gallery images with --posts 10000 --images 50000. The rows are '
+        'inserted with bulk_create() and are the same on every run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--projects', type=int, default=200)
+        parser.add_argument('--opportunities-per-project', type=int, default=5)
+        parser.add_argument('--posts', type=int, default=2000)
+        parser.add_argument('--team-members', type=int, default=200)
+        parser.add_argument('--media-appearances', type=int, default=500)
+        parser.add_argument('--images', type=int, default=2000)
+        parser.add_argument(
+            '--scale', type=int, default=1,
+            help='Multiply every count except the opportunities per project.',
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Random seed.')
+        parser.add_argument(
+            '--replace', action='store_true',
+            help='Delete a previously generated dataset first.',
+        )
+        parser.add_argument(
+            '--delete', action='store_true',
+            help='Only delete a previously generated dataset.',
+        )
+
+    def handle(self, *args, **options):
+        exists = any(model.objects.filter(**lookup).exists() for model, lookup in SAMPLE_ROWS.items())
+        if options['delete'] or (exists and options['replace']):
+            deleted = delete_sample_data()
+            self.stdout.write('Deleted ' + ', '.join(f'{count} {label}' for label, count in deleted.items() if count))
+            self.refresh_derived_data()
+            if options['delete']:
+                return
+        elif exists:
+            raise CommandError('A synthetic dataset already exists; pass --replace to regenerate it.')
+
+        scale = options['scale']
+        counts = generate_sample_data(
+            projects=options['projects'] * scale,
+            opportunities_per_project=options['opportunities_per_project'],
+            posts=options['posts'] * scale,
+            team_members=options['team_members'] * scale,
+            media_appearances=options['media_appearances'] * scale,
+            images=options['images'] * scale,
+            seed=options['seed'],
+        )
+        self.stdout.write('Created ' + ', '.join(
+            f'{count} {model._meta.verbose_name_plural}' for model, count in counts.items()
+        ))
+        self.refresh_derived_data()
+        self.stdout.write(self.style.SUCCESS('Synthetic dataset ready.'))
+
+    def refresh_derived_data(self):
+        # bulk_create() and queryset deletes skip the signals that keep the
+        # search index, the page cache, the static export and the edge cache
+        # current.
+        for label in SEARCH_FIELDS:
+            try:
+                with transaction.atomic():
+                    rebuild_index(apps.get_model(label))
+            except NotSupportedError:
+                break
+        for model in CACHED_MODELS:
+            bump_version(model)
+            prerender.schedule_model_refresh(model)
+            edge.schedule_model_purge(model)
@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio.content_import import CHUNK_SIZE, IMPORTABLE, ContentImporter, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Import projects, investment opportunities, blog posts or gallery '
+        'images from a JSON (array or JSON Lines) or CSV file, in chunks '
+        'inserted with bulk_create(). Slugs are made unique, and Bengali '
+        'titles are transliterated for them.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=IMPORTABLE, help='What the file contains.')
+        parser.add_argument('path', help="File to import, or '-' for standard input.")
+        parser.add_argument(
+            '--format', choices=('json', 'csv'),
+            help='Input format (default: from the file extension).',
+        )
+        parser.add_argument('--images', help='Directory the image columns are relative to.')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Rows inserted per transaction.')
+        parser.add_argument(
+            '--skip-derivatives', action='store_true',
+            help='Do not generate responsive image sizes (run generate_image_derivatives later).',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Validate the rows without saving them.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = options['format'] or ('csv' if path.lower().endswith('.csv') else 'json')
+        if options['images'] and not Path(options['images']).is_dir():
+            raise CommandError(f'{options["images"]} is not a directory.')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1.')
+
+        importer = ContentImporter(
+            IMPORTABLE[options['kind']], images_dir=options['images'], chunk_size=options['chunk_size'],
+            derivatives=not options['skip_derivatives'], dry_run=options['dry_run'],
+        )
+        try:
+            handle = sys.stdin if path == '-' else open(path, encoding='utf-8-sig', newline='')
+        except OSError as e:
+            raise CommandError(str(e))
+        try:
+            result = importer.run(read_rows(handle, format))
+        except (ValueError, UnicodeDecodeError) as e:
+            raise CommandError(f'Cannot read {path}: {e}')
+        finally:
+            if handle is not sys.stdin:
+                handle.close()
+
+        for number, message in result.errors:
+            self.stderr.write(f'Row {number}: {message}')
+        verb = 'Would import' if options['dry_run'] else 'Imported'
+        summary = f'{verb} {result.created} {importer.model._meta.verbose_name_plural}'
+        if result.errors:
+            self.stdout.write(self.style.WARNING(f'{summary}; {len(result.errors)} rows skipped.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{summary}.'))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from portfolio.static_images import build_manifest, manifest_path
+
+
+class Command(BaseCommand):
+    help = (
+        'Losslessly recompress the shipped static images, emit WebP width '
+        'variants and record them in the picture manifest. Run before '
+        'collectstatic.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Re-encode every image even if its content hash is unchanged.',
+        )
+
+    def handle(self, *args, **options):
+        manifest, changed = build_manifest(force=options['force'])
+        original = optimized = 0
+        for path, entry in manifest.items():
+            smallest = min([entry['fallback']['bytes']] + [v['bytes'] for v in entry['webp']])
+            original += entry['original_bytes']
+            optimized += smallest
+            marker = '*' if path in changed else ' '
+            self.stdout.write(
+                f"{marker} {path}: {entry['original_bytes'] / 1024:.0f} KB -> "
+                f"{entry['fallback']['bytes'] / 1024:.0f} KB fallback, "
+                f"{smallest / 1024:.0f} KB smallest"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(changed)} of {len(manifest)} images re-encoded; '
+            f'{original / 1024:.0f} KB -> {optimized / 1024:.0f} KB smallest variants. '
+            f'Manifest: {manifest_path()}'
+        ))
@@ -0,0 +1,65 @@
+import shutil
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio.prerender import PAGES, Renderer, get_root, install_htaccess, render_pending
+
+
+class Command(BaseCommand):
+    help = (
+        'Render every public page, in every language and including all '
+        'pages of the paginated lists, to static HTML that Apache serves '
+        'without starting Django. With --pending, only render the pages '
+        'queued by content changes; run that from cron every minute.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            help='Directory to write to (default: PRERENDER_ROOT).',
+        )
+        parser.add_argument(
+            '--page', action='append', choices=sorted(PAGES), dest='pages',
+            help='Only render this page (repeatable).',
+        )
+        parser.add_argument(
+            '--pending', action='store_true',
+            help='Only render the pages queued by saves since the last run.',
+        )
+        parser.add_argument(
+            '--clear', action='store_true',
+            help='Delete the output directory before rendering.',
+        )
+        parser.add_argument(
+            '--htaccess',
+            help='Install the rewrite rules into this .htaccess, which must sit '
+                 'in the document root that contains the output directory.',
+        )
+
+    def handle(self, *args, **options):
+        root = options['output'] or get_root()
+        if not root:
+            raise CommandError('Set PRERENDER_ROOT or pass --output.')
+        root = Path(root)
+        if options['clear'] and root.exists():
+            shutil.rmtree(root)
+
+        renderer = Renderer(root)
+        if options['pending']:
+            render_pending(renderer)
+        else:
+            renderer.export(options['pages'])
+        for url, status in renderer.skipped:
+            self.stdout.write(self.style.WARNING(f'{url}: left to Django (status {status})'))
+
+        if options['htaccess']:
+            htaccess = Path(options['htaccess']).resolve()
+            try:
+                directory = root.resolve().relative_to(htaccess.parent)
+            except ValueError:
+                raise CommandError(f'{root} is not inside {htaccess.parent}.')
+            install_htaccess(htaccess, directory.as_posix())
+            self.stdout.write(f'Rewrite rules installed in {htaccess}')
+
+        self.stdout.write(self.style.SUCCESS(f'{renderer.written} pages written to {root}'))
@@ -0,0 +1,29 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, NotSupportedError, transaction
+
+from portfolio.search import SEARCH_FIELDS, rebuild_index
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the full-text search index, e.g. after rows were written '
+        'with bulk_create() or update(), which bypass the save signals.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Database to rebuild the index of.',
+        )
+
+    def handle(self, *args, **options):
+        for label in SEARCH_FIELDS:
+            model = apps.get_model(label)
+            try:
+                with transaction.atomic(using=options['database']):
+                    count = rebuild_index(model, using=options['database'])
+            except NotSupportedError as e:
+                raise CommandError(str(e))
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {count} indexed')
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt.'))
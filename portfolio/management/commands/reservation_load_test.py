@@ -0,0 +1,129 @@
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, transaction
+from django.db.models import Sum
+
+from portfolio.models import InvestmentOpportunity, Project, ShareReservation
+from portfolio.reservations import SharesUnavailable, reserve_shares
+
+# SQLite serializes writers and reports a busy database instead of waiting
+# for the row lock the way PostgreSQL does.
+LOCK_RETRIES = 50
+
+
+class Command(BaseCommand):
+    help = (
+        'Reserve shares of one opportunity from many threads at once and '
+        'check that no share was sold twice.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Reservations to attempt.')
+        parser.add_argument('--threads', type=int, default=16, help='Concurrent clients.')
+        parser.add_argument('--shares', type=int, default=3, help='Shares per reservation.')
+        parser.add_argument(
+            '--available', type=int, default=100,
+            help='Shares on offer in the temporary opportunity.',
+        )
+        parser.add_argument(
+            '--opportunity',
+            help='Slug of an existing opportunity to use instead of a temporary one. '
+                 'Its reservations are left in place.',
+        )
+
+    def handle(self, *args, **options):
+        if options['opportunity']:
+            opportunity = InvestmentOpportunity.objects.filter(slug=options['opportunity']).first()
+            if opportunity is None:
+                raise CommandError(f'No opportunity with slug {options["opportunity"]!r}.')
+            project = None
+        else:
+            project, opportunity = self.create_opportunity(options['available'])
+        try:
+            self.run(opportunity, options)
+        finally:
+            if project is not None:
+                project.delete()
+
+    def create_opportunity(self, available):
+        name = f'load-test-{uuid.uuid4().hex[:8]}'
+        project = Project.objects.create(
+            name=name, slug=name, location='-', acreage=1, description='-',
+            total_shares=available, share_price=1,
+        )
+        opportunity = InvestmentOpportunity.objects.create(
+            project=project, title=name, slug=name, description='-',
+            total_shares=available, available_shares=available,
+            price_per_share=1, minimum_investment=1, expected_return='-',
+            investment_duration='-',
+        )
+        return project, opportunity
+
+    def run(self, opportunity, options):
+        before = self.ledger(opportunity)
+        outcomes = {'reserved': 0, 'rejected': 0, 'failed': 0}
+        latencies = []
+        lock = threading.Lock()
+
+        def attempt(number):
+            started = time.perf_counter()
+            outcome = 'failed'
+            try:
+                for _ in range(LOCK_RETRIES):
+                    try:
+                        reserve_shares(
+                            opportunity, options['shares'],
+                            name=f'Load test {number}', email=f'load-{number}@example.com',
+                        )
+                        outcome = 'reserved'
+                        break
+                    except SharesUnavailable:
+                        outcome = 'rejected'
+                        break
+                    except OperationalError:
+                        time.sleep(0.01)
+            finally:
+                connection.close()
+            with lock:
+                outcomes[outcome] += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['threads']) as executor:
+            list(executor.map(attempt, range(options['requests'])))
+        elapsed = time.perf_counter() - started
+
+        after = self.ledger(opportunity)
+        latencies.sort()
+        self.stdout.write(
+            f'{options["requests"]} requests from {options["threads"]} threads in {elapsed:.2f}s '
+            f'({options["requests"] / elapsed:.0f}/s)'
+        )
+        self.stdout.write(
+            f'reserved {outcomes["reserved"]}, rejected {outcomes["rejected"]}, failed {outcomes["failed"]}'
+        )
+        self.stdout.write(
+            f'latency p50 {statistics.median(latencies) * 1000:.1f}ms, '
+            f'p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f}ms'
+        )
+        self.stdout.write(f'available {after["available"]}, held {after["held"]}')
+
+        sold = outcomes['reserved'] * options['shares']
+        if after['available'] < 0 or after['available'] + after['held'] != before['available'] + before['held']:
+            raise CommandError('Shares were oversold: availability and reservations disagree.')
+        if after['held'] - before['held'] != sold:
+            raise CommandError(f'{sold} shares were reserved but {after["held"] - before["held"]} are held.')
+        self.stdout.write(self.style.SUCCESS('No shares were oversold.'))
+
+    def ledger(self, opportunity):
+        with transaction.atomic():
+            available = InvestmentOpportunity.objects.values_list('available_shares', flat=True).get(pk=opportunity.pk)
+            held = ShareReservation.objects.filter(opportunity=opportunity, status='held').aggregate(
+                shares=Sum('shares'),
+            )['shares'] or 0
+        return {'available': available, 'held': held}
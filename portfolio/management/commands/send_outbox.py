@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from portfolio.outbox import BATCH_SIZE, drain
+
+
+class Command(BaseCommand):
+    help = (
+        'Deliver the queued outbox emails, each batch over one connection to '
+        'the mail server. Run it from cron, or with --loop as a worker.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Messages sent per connection.',
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling for new messages instead of exiting once the outbox is empty.',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=10,
+            help='Seconds between polls with --loop.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = drain(options['batch_size'])
+            if sent or failed or not options['loop']:
+                self.stdout.write(f'{sent} sent, {failed} failed')
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
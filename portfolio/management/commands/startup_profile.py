@@ -0,0 +1,88 @@
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# "import time: self [us] | cumulative | imported package", from -X importtime
+IMPORT_TIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def parse_import_times(output):
+    """
+    Return ``{module: (self_us, cumulative_us)}`` from ``-X importtime``
+    output.
+    """
+    times = {}
+    for line in output.splitlines():
+        match = IMPORT_TIME.match(line)
+        if match:
+            times[match[4]] = (int(match[1]), int(match[2]))
+    return times
+
+
+def by_package(times):
+    """
+    Sum the self time of every module into its top-level package.
+    """
+    totals = defaultdict(int)
+    for module, (self_us, _) in times.items():
+        totals[module.split('.')[0]] += self_us
+    return totals
+
+
+class Command(BaseCommand):
+    help = (
+        'Start the application in a fresh interpreter, as a Passenger worker '
+        'does, and report the time spent per step and per imported package.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--warm-up', action='store_true',
+            help='Also time priming the page caches.',
+        )
+        parser.add_argument(
+            '--top', type=int, default=15,
+            help='Number of packages and modules to list.',
+        )
+        parser.add_argument('--json', help='Also write the results to this file.')
+
+    def handle(self, *args, **options):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'hawladar_agro.settings')}
+        code = f'from portfolio.startup import probe; probe(warm_up={options["warm_up"]!r})'
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if process.returncode:
+            raise CommandError(f'Start-up failed:\n{process.stderr[-2000:]}')
+        steps = json.loads(process.stdout)
+        times = parse_import_times(process.stderr)
+
+        total = sum(step['seconds'] for step in steps)
+        self.stdout.write(self.style.MIGRATE_HEADING(f'Start-up steps ({total * 1000:.0f} ms)'))
+        for step in steps:
+            self.stdout.write(f'  {step["seconds"] * 1000:8.1f} ms  {step["step"]}')
+
+        packages = sorted(by_package(times).items(), key=lambda item: -item[1])
+        self.stdout.write(self.style.MIGRATE_HEADING(f'Imports by package ({len(times)} modules)'))
+        for package, self_us in packages[:options['top']]:
+            self.stdout.write(f'  {self_us / 1000:8.1f} ms  {package}')
+
+        modules = sorted(times.items(), key=lambda item: -item[1][1])
+        self.stdout.write(self.style.MIGRATE_HEADING('Slowest imports, including their own imports'))
+        for module, (_, cumulative_us) in modules[:options['top']]:
+            self.stdout.write(f'  {cumulative_us / 1000:8.1f} ms  {module}')
+
+        if options['json']:
+            with open(options['json'], 'w') as handle:
+                json.dump({
+                    'steps': steps,
+                    'packages': dict(packages),
+                    'modules': {module: {'self_us': s, 'cumulative_us': c} for module, (s, c) in times.items()},
+                }, handle, indent=2)
@@ -0,0 +1,70 @@
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand, CommandError
+
+COMPRESSED_SUFFIXES = ('.gz', '.br')
+
+
+class Command(BaseCommand):
+    help = (
+        'Report the uncompressed, gzip and Brotli size of every collected '
+        'static asset and flag assets that are not served under a hashed name.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-size', type=int, default=0,
+            help='Only list assets of at least this many bytes.',
+        )
+
+    def handle(self, *args, **options):
+        root = Path(settings.STATIC_ROOT)
+        if not root.is_dir():
+            raise CommandError(f'{root} does not exist; run collectstatic first.')
+
+        hashed = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+        totals = {'raw': 0, 'gz': 0, 'br': 0}
+        unhashed = 0
+
+        self.stdout.write(f"{'asset':<60} {'raw':>10} {'gzip':>10} {'brotli':>10}")
+        for path in sorted(root.rglob('*')):
+            if not path.is_file() or path.suffix in COMPRESSED_SUFFIXES:
+                continue
+            name = path.relative_to(root).as_posix()
+            if hashed and name not in hashed and name != 'staticfiles.json':
+                # The unhashed original of a hashed file; it is never linked.
+                unhashed += 1
+                continue
+
+            raw = path.stat().st_size
+            sizes = {
+                suffix: os.path.getsize(f'{path}{suffix}') if os.path.exists(f'{path}{suffix}') else None
+                for suffix in COMPRESSED_SUFFIXES
+            }
+            totals['raw'] += raw
+            totals['gz'] += sizes['.gz'] or raw
+            totals['br'] += sizes['.br'] or sizes['.gz'] or raw
+            if raw >= options['min_size']:
+                self.stdout.write(
+                    f'{name:<60} {raw:>10} {self._size(sizes[".gz"]):>10} {self._size(sizes[".br"]):>10}'
+                )
+
+        self.stdout.write(
+            f"{'total (best encoding served)':<60} {totals['raw']:>10} {totals['gz']:>10} {totals['br']:>10}"
+        )
+        if not hashed:
+            self.stdout.write(self.style.WARNING(
+                'No staticfiles manifest found: assets are not content-hashed '
+                'and cannot be cached as immutable.'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'{len(hashed)} hashed assets; {unhashed} unhashed originals skipped.'
+            ))
+
+    @staticmethod
+    def _size(size):
+        return '-' if size is None else size
@@ -0,0 +1,241 @@
+import logging
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.middleware.locale import LocaleMiddleware as BaseLocaleMiddleware
+from django.urls import translate_url
+from django.utils import translation
+from django.utils.cache import cc_delim_re, patch_vary_headers
+from django.utils.module_loading import import_string
+
+from .instrumentation import recording
+from .stateless import is_stateless
+
+access_logger = logging.getLogger('portfolio.access')
+performance_logger = logging.getLogger('portfolio.performance')
+
+
+class LocaleMiddleware(BaseLocaleMiddleware):
+    """
+    Django's ``LocaleMiddleware`` plus the language cookie.
+
+    The portfolio URLs use ``i18n_patterns`` without a prefix for the
+    default language, so the URL alone decides the language: unprefixed
+    URLs render in Bengali and ``/en/`` URLs in English, and every page
+    (and every cached copy of it) holds a single language.
+
+    The language switcher also stores the visitor's choice in the language
+    cookie. A GET for an unprefixed page from a visitor who chose another
+    language is redirected to that language's URL rather than rendered in
+    Bengali, so only the redirect depends on the cookie.
+
+    Django still adds ``Vary: Accept-Language`` to unprefixed pages; it is
+    dropped from the public pages, which a shared cache would otherwise
+    store once per browser language.
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        if translation.get_language_from_path(request.path_info):
+            return None
+
+        try:
+            language = translation.get_supported_language_variant(
+                request.COOKIES.get(settings.LANGUAGE_COOKIE_NAME, '')
+            )
+        except LookupError:
+            return None
+        if language == settings.LANGUAGE_CODE:
+            return None
+
+        path = request.get_full_path()
+        url = translate_url(path, language)
+        if url == path:
+            # Not a translatable page, e.g. the admin.
+            return None
+        redirect = self.response_redirect_class(url)
+        patch_vary_headers(redirect, ('Cookie',))
+        return redirect
+
+    def process_response(self, request, response):
+        response = super().process_response(request, response)
+        if getattr(request, 'stateless', False) and response.has_header('Vary'):
+            vary = [
+                header for header in cc_delim_re.split(response['Vary'])
+                if header.lower() != 'accept-language'
+            ]
+            if vary:
+                response['Vary'] = ', '.join(vary)
+            else:
+                del response['Vary']
+        return response
+
+
+class StatefulMiddleware:
+    """
+    Run the middleware listed in ``STATEFUL_MIDDLEWARE`` (sessions, CSRF,
+    authentication and messages) only for requests that need it.
+
+    A GET for a public portfolio page (``portfolio.stateless``) goes
+    straight to the view, leaving ``request.user`` and the messages unset;
+    the ``auth`` and ``messages`` context processors then give an anonymous
+    user and no messages without touching the session. Every other request
+    runs the listed middleware in order, as if it were in ``MIDDLEWARE``.
+
+    Django only calls the ``process_view()`` hook of the middleware in
+    ``MIDDLEWARE``, so this one calls those of the listed middleware,
+    which is where ``CsrfViewMiddleware`` checks the token.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.view_middleware = []
+        handler = get_response
+        for path in reversed(settings.STATEFUL_MIDDLEWARE):
+            middleware = import_string(path)(handler)
+            if hasattr(middleware, 'process_view'):
+                self.view_middleware.insert(0, middleware.process_view)
+            handler = middleware
+        self.stateful_response = handler
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request.stateless = is_stateless(request)
+        if request.stateless:
+            return self.get_response(request)
+        return self.stateful_response(request)
+
+    async def __acall__(self, request):
+        request.stateless = is_stateless(request)
+        if request.stateless:
+            return await self.get_response(request)
+        return await self.stateful_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.stateless:
+            return None
+        for process_view in self.view_middleware:
+            response = process_view(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
+        return None
+
+
+class ServerTimingMiddleware:
+    """
+    Time a sample of requests (``SERVER_TIMING_SAMPLE_RATE``, 0 to 1) and
+    report where the time went.
+
+    A sampled response gets a ``Server-Timing`` header with the time spent
+    in the database, rendering templates, the cache and in total, which the
+    browser's developer tools show next to the request. The same timings
+    are logged to ``portfolio.performance`` with the URL name, the query
+    count and the slowest statement, as ``fields`` for
+    ``portfolio.log.JsonFormatter``.
+
+    Requests that are not sampled pay for one random number.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'SERVER_TIMING_SAMPLE_RATE', 1.0)
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def sampled(self):
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        started = time.perf_counter()
+        with recording() as timings:
+            response = self.get_response(request)
+        return self.report(request, response, timings, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        started = time.perf_counter()
+        with recording() as timings:
+            response = await self.get_response(request)
+        return self.report(request, response, timings, time.perf_counter() - started)
+
+    def report(self, request, response, timings, total):
+        response['Server-Timing'] = timings.server_timing(total)
+        if not performance_logger.isEnabledFor(logging.INFO):
+            return response
+        match = request.resolver_match
+        performance_logger.info('%s %s', request.method, request.path, extra={'fields': {
+            'method': request.method,
+            'path': request.path,
+            'url_name': match.view_name if match else None,
+            'status': response.status_code,
+            'total': round(total * 1000, 2),
+            **timings.as_dict(),
+        }})
+        return response
+
+
+class AccessLogMiddleware:
+    """
+    Log every request to ``portfolio.access``: method, path, status, time
+    taken, bytes sent and URL name, as ``fields`` for
+    ``portfolio.log.JsonFormatter``.
+
+    The record is only queued here (see ``portfolio.log``); when the logger
+    is not enabled, as in development, nothing is built at all.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self.log(request, response, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self.log(request, response, time.perf_counter() - started)
+        return response
+
+    def log(self, request, response, elapsed):
+        if not access_logger.isEnabledFor(logging.INFO):
+            return
+        match = request.resolver_match
+        access_logger.info('%s %s %s', request.method, request.path, response.status_code, extra={'fields': {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'ms': round(elapsed * 1000, 2),
+            'bytes': None if response.streaming else len(response.content),
+            'view': match.view_name if match else None,
+        }})
@@ -0,0 +1,41 @@
+# Generated by Django 5.0.1 on 2026-10-18 12:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(condition=models.Q(('status', 'published')), fields=['-published_at', '-created_at', '-id'], name='blogpost_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='galleryimage',
+            index=models.Index(fields=['-is_featured', 'order', '-created_at', '-id'], name='galleryimage_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='investmentopportunity',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-featured', 'order', '-created_at'], name='opportunity_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediaappearance',
+            index=models.Index(condition=models.Q(('is_featured', True)), fields=['order', '-coverage_date'], name='media_featured_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['-is_featured', 'order', '-created_at'], name='project_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('is_featured', True)), fields=['order', '-created_at'], name='project_featured_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teammember',
+            index=models.Index(fields=['-is_featured', 'order', 'name'], name='teammember_order_idx'),
+        ),
+    ]
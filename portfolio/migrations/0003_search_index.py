@@ -0,0 +1,32 @@
+from django.db import migrations
+
+from portfolio import search
+
+
+def create_search_index(apps, schema_editor):
+    backend = search.BACKENDS.get(schema_editor.connection.vendor)
+    if backend is None:
+        return
+    for label in search.SEARCH_FIELDS:
+        model = apps.get_model(label)
+        backend.create_index(schema_editor, model)
+        search.rebuild_index(model, using=schema_editor.connection.alias)
+
+
+def drop_search_index(apps, schema_editor):
+    backend = search.BACKENDS.get(schema_editor.connection.vendor)
+    if backend is None:
+        return
+    for label in search.SEARCH_FIELDS:
+        backend.drop_index(schema_editor, apps.get_model(label))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0002_view_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
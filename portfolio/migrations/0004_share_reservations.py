@@ -0,0 +1,48 @@
+# Generated by Django 5.0.1 on 2026-10-18 12:33
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0003_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShareReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('reference', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('shares', models.PositiveIntegerField()),
+                ('name', models.CharField(max_length=100)),
+                ('email', models.EmailField(max_length=254)),
+                ('phone', models.CharField(blank=True, max_length=30)),
+                ('status', models.CharField(choices=[('held', 'Held'), ('confirmed', 'Confirmed'), ('expired', 'Expired'), ('cancelled', 'Cancelled')], default='held', max_length=20)),
+                ('expires_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Share Reservation',
+                'verbose_name_plural': 'Share Reservations',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='investmentopportunity',
+            constraint=models.CheckConstraint(check=models.Q(('available_shares__gte', 0)), name='opportunity_available_shares_non_negative'),
+        ),
+        migrations.AddField(
+            model_name='sharereservation',
+            name='opportunity',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='portfolio.investmentopportunity'),
+        ),
+        migrations.AddIndex(
+            model_name='sharereservation',
+            index=models.Index(condition=models.Q(('status', 'held')), fields=['expires_at'], name='reservation_held_expiry_idx'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.0.1 on 2026-10-18 12:37
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def summarize_funding(apps, schema_editor):
+    Project = apps.get_model('portfolio', 'Project')
+    InvestmentOpportunity = apps.get_model('portfolio', 'InvestmentOpportunity')
+    ProjectFunding = apps.get_model('portfolio', 'ProjectFunding')
+    summaries = {pk: ProjectFunding(project_id=pk) for pk in Project.objects.values_list('pk', flat=True)}
+    opportunities = InvestmentOpportunity.objects.values_list(
+        'project_id', 'total_shares', 'available_shares', 'price_per_share',
+    )
+    for project_id, total_shares, available_shares, price_per_share in opportunities.iterator():
+        summary = summaries[project_id]
+        summary.opportunities += 1
+        summary.total_shares += total_shares
+        summary.shares_sold += total_shares - available_shares
+        summary.capital_raised += (total_shares - available_shares) * price_per_share
+    for summary in summaries.values():
+        summary.shares_sold = max(summary.shares_sold, 0)
+        if summary.total_shares:
+            summary.funded_percent = (Decimal(summary.shares_sold) * 100 / summary.total_shares).quantize(Decimal('0.01'))
+    ProjectFunding.objects.bulk_create(summaries.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0004_share_reservations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectFunding',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='funding', serialize=False, to='portfolio.project')),
+                ('opportunities', models.PositiveIntegerField(default=0)),
+                ('total_shares', models.PositiveIntegerField(default=0)),
+                ('shares_sold', models.PositiveIntegerField(default=0)),
+                ('capital_raised', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('funded_percent', models.DecimalField(decimal_places=2, default=0, max_digits=5)),
+            ],
+            options={
+                'verbose_name': 'Project Funding',
+                'verbose_name_plural': 'Project Funding',
+                'indexes': [models.Index(fields=['funded_percent'], name='projectfunding_percent_idx')],
+            },
+        ),
+        migrations.RunPython(summarize_funding, migrations.RunPython.noop),
+    ]
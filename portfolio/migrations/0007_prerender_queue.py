@@ -0,0 +1,26 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0006_contact_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingPrerender',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('page', models.CharField(max_length=50)),
+                ('object_id', models.PositiveBigIntegerField(blank=True, help_text='Detail page of this object; all if empty', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Pending Prerender',
+                'verbose_name_plural': 'Pending Prerenders',
+            },
+        ),
+    ]
@@ -1,5 +1,8 @@
+import uuid
+
 from django.db import models
-from django.utils.text import slugify
+
+from .slugs import unique_slug
 
 
 class TimeStampedModel(models.Model):
@@ -49,6 +52,20 @@ class Project(TimeStampedModel):
 
     class Meta:
         ordering = ['-is_featured', 'order', '-created_at']
+        indexes = [
+            # Project list
+            models.Index(
+                fields=['-is_featured', 'order', '-created_at'],
+                condition=models.Q(status='active'),
+                name='project_active_order_idx',
+            ),
+            # Homepage
+            models.Index(
+                fields=['order', '-created_at'],
+                condition=models.Q(is_featured=True),
+                name='project_featured_order_idx',
+            ),
+        ]
         verbose_name = "Project"
         verbose_name_plural = "Projects"
 
@@ -57,7 +74,7 @@ class Project(TimeStampedModel):
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = slugify(self.name)
+            self.slug = unique_slug(self, self.name)
         super().save(*args, **kwargs)
 
 
@@ -86,6 +103,14 @@ class BlogPost(TimeStampedModel):
 
     class Meta:
         ordering = ['-published_at', '-created_at']
+        indexes = [
+            # Homepage and the keyset-paginated blog list
+            models.Index(
+                fields=['-published_at', '-created_at', '-id'],
+                condition=models.Q(status='published'),
+                name='blogpost_published_idx',
+            ),
+        ]
         verbose_name = "Blog Post"
         verbose_name_plural = "Blog Posts"
 
@@ -94,7 +119,7 @@ class BlogPost(TimeStampedModel):
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = slugify(self.title)
+            self.slug = unique_slug(self, self.title)
         if self.status == 'published' and not self.published_at:
             from django.utils import timezone
             self.published_at = timezone.now()
@@ -123,6 +148,10 @@ class TeamMember(TimeStampedModel):
 
     class Meta:
         ordering = ['-is_featured', 'order', 'name']
+        indexes = [
+            # About, team list and (featured prefix) homepage
+            models.Index(fields=['-is_featured', 'order', 'name'], name='teammember_order_idx'),
+        ]
         verbose_name = "Team Member"
         verbose_name_plural = "Team Members"
 
@@ -152,6 +181,14 @@ class MediaAppearance(TimeStampedModel):
 
     class Meta:
         ordering = ['-is_featured', 'order', '-coverage_date']
+        indexes = [
+            # Homepage
+            models.Index(
+                fields=['order', '-coverage_date'],
+                condition=models.Q(is_featured=True),
+                name='media_featured_order_idx',
+            ),
+        ]
         verbose_name = "Media Appearance"
         verbose_name_plural = "Media Appearances"
 
@@ -159,6 +196,34 @@ class MediaAppearance(TimeStampedModel):
         return self.outlet_name
 
 
+class InvestmentOpportunityQuerySet(models.QuerySet):
+    def with_funding(self):
+        """
+        Annotate each opportunity with ``shares_sold``, ``capital_raised``
+        and ``funded_percent``, computed by the database so they can be
+        filtered and sorted on.
+        """
+        return self.annotate(
+            shares_sold=models.ExpressionWrapper(
+                models.F('total_shares') - models.F('available_shares'),
+                output_field=models.IntegerField(),
+            ),
+        ).annotate(
+            capital_raised=models.ExpressionWrapper(
+                models.F('shares_sold') * models.F('price_per_share'),
+                output_field=models.DecimalField(max_digits=16, decimal_places=2),
+            ),
+            funded_percent=models.Case(
+                models.When(
+                    total_shares__gt=0,
+                    then=models.F('shares_sold') * models.Value(100.0) / models.F('total_shares'),
+                ),
+                default=models.Value(0.0),
+                output_field=models.FloatField(),
+            ),
+        )
+
+
 class InvestmentOpportunity(TimeStampedModel):
     """
     Investment opportunity model for crowdfunding and investment details.
@@ -185,8 +250,26 @@ class InvestmentOpportunity(TimeStampedModel):
     
     order = models.IntegerField(default=0)
 
+    objects = InvestmentOpportunityQuerySet.as_manager()
+
     class Meta:
         ordering = ['-featured', 'order', '-created_at']
+        indexes = [
+            # Investment page and (featured prefix) homepage
+            models.Index(
+                fields=['-featured', 'order', '-created_at'],
+                condition=models.Q(is_active=True),
+                name='opportunity_active_order_idx',
+            ),
+        ]
+        constraints = [
+            # Reservations claim shares with a conditional UPDATE; this is
+            # the database's own guarantee that none is ever oversold.
+            models.CheckConstraint(
+                check=models.Q(available_shares__gte=0),
+                name='opportunity_available_shares_non_negative',
+            ),
+        ]
         verbose_name = "Investment Opportunity"
         verbose_name_plural = "Investment Opportunities"
 
@@ -195,7 +278,7 @@ class InvestmentOpportunity(TimeStampedModel):
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = slugify(self.title)
+            self.slug = unique_slug(self, self.title)
         super().save(*args, **kwargs)
 
     @property
@@ -205,6 +288,33 @@ class InvestmentOpportunity(TimeStampedModel):
         return 0
 
 
+class ProjectFunding(TimeStampedModel):
+    """
+    Funding of a project summed over all of its investment opportunities.
+
+    Denormalized so that pages and the admin read a project's funding from
+    one row, and can sort and filter on it in SQL. Rewritten in the same
+    transaction as every change to the opportunities (see
+    ``portfolio.funding``).
+    """
+    project = models.OneToOneField(Project, on_delete=models.CASCADE, primary_key=True, related_name='funding')
+    opportunities = models.PositiveIntegerField(default=0)
+    total_shares = models.PositiveIntegerField(default=0)
+    shares_sold = models.PositiveIntegerField(default=0)
+    capital_raised = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    funded_percent = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['funded_percent'], name='projectfunding_percent_idx'),
+        ]
+        verbose_name = "Project Funding"
+        verbose_name_plural = "Project Funding"
+
+    def __str__(self):
+        return f"{self.funded_percent}% funded"
+
+
 class GalleryImage(TimeStampedModel):
     """
     Gallery image model for showcasing farm photos.
@@ -227,8 +337,128 @@ class GalleryImage(TimeStampedModel):
 
     class Meta:
         ordering = ['-is_featured', 'order', '-created_at']
+        indexes = [
+            # Keyset-paginated gallery and (featured prefix) homepage
+            models.Index(fields=['-is_featured', 'order', '-created_at', '-id'], name='galleryimage_order_idx'),
+        ]
         verbose_name = "Gallery Image"
         verbose_name_plural = "Gallery Images"
 
     def __str__(self):
         return self.title
+
+
+class ShareReservation(TimeStampedModel):
+    """
+    Shares of an investment opportunity held for an investor until they
+    are confirmed or the hold expires (see ``portfolio.reservations``).
+    """
+    STATUS_CHOICES = [
+        ('held', 'Held'),
+        ('confirmed', 'Confirmed'),
+        ('expired', 'Expired'),
+        ('cancelled', 'Cancelled'),
+    ]
+
+    reference = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    opportunity = models.ForeignKey(
+        InvestmentOpportunity, on_delete=models.CASCADE, related_name='reservations'
+    )
+    shares = models.PositiveIntegerField()
+    name = models.CharField(max_length=100)
+    email = models.EmailField()
+    phone = models.CharField(max_length=30, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='held')
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Expiry sweeper
+            models.Index(
+                fields=['expires_at'],
+                condition=models.Q(status='held'),
+                name='reservation_held_expiry_idx',
+            ),
+        ]
+        verbose_name = "Share Reservation"
+        verbose_name_plural = "Share Reservations"
+
+    def __str__(self):
+        return f"{self.name} ({self.shares} shares)"
+
+
+class ContactSubmission(TimeStampedModel):
+    """
+    A message sent through the contact form.
+    """
+    name = models.CharField(max_length=100)
+    email = models.EmailField()
+    phone = models.CharField(max_length=30, blank=True)
+    subject = models.CharField(max_length=200)
+    message = models.TextField()
+    is_read = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Contact Submission"
+        verbose_name_plural = "Contact Submissions"
+
+    def __str__(self):
+        return f"{self.name}: {self.subject}"
+
+
+class OutboxEmail(TimeStampedModel):
+    """
+    An email waiting to be delivered by the ``send_outbox`` worker (see
+    ``portfolio.outbox``), so requests never wait on the mail server.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254, blank=True)
+    to = models.TextField(help_text="Comma-separated recipients")
+    reply_to = models.CharField(max_length=254, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField()
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Delivery worker
+            models.Index(
+                fields=['next_attempt_at'],
+                condition=models.Q(status='pending'),
+                name='outbox_pending_due_idx',
+            ),
+        ]
+        verbose_name = "Outbox Email"
+        verbose_name_plural = "Outbox Emails"
+
+    def __str__(self):
+        return self.subject
+
+
+class PendingPrerender(models.Model):
+    """
+    A prerendered page to export again, queued by a save and rendered by
+    ``manage.py prerender_site --pending`` (see ``portfolio.prerender``).
+    """
+    page = models.CharField(max_length=50)
+    object_id = models.PositiveBigIntegerField(blank=True, null=True, help_text="Detail page of this object; all if empty")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Pending Prerender"
+        verbose_name_plural = "Pending Prerenders"
+
+    def __str__(self):
+        return f'{self.page} {self.object_id or "(all)"}'
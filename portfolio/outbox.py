@@ -0,0 +1,129 @@
+"""
+Database-backed outbox for outgoing email.
+
+Requests only insert an ``OutboxEmail`` row, in their own transaction, and
+return at once; the ``send_outbox`` management command delivers the rows
+later. Each batch is sent over a single connection to the mail server, and
+a message that fails is retried with exponential backoff until it has
+been tried ``OUTBOX_MAX_ATTEMPTS`` times.
+
+Rows are claimed by pushing ``next_attempt_at`` one lease into the future,
+under ``SELECT ... FOR UPDATE SKIP LOCKED``, before anything is sent. Two
+workers therefore never send the same message, and the messages of a
+worker that dies mid-batch are picked up again once the lease runs out.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+BATCH_SIZE = 50
+LEASE = timedelta(minutes=10)
+
+
+def enqueue(subject, body, to, reply_to='', from_email=''):
+    """
+    Queue an email for delivery and return the outbox row.
+    """
+    # A line break in a header is rejected by send_mail() on every attempt.
+    subject = ' '.join(subject.splitlines())
+    return OutboxEmail.objects.create(
+        subject=subject, body=body, to=','.join(to), reply_to=reply_to,
+        from_email=from_email, next_attempt_at=timezone.now(),
+    )
+
+
+def retry_delay(attempts):
+    """
+    Return how long to wait before the next attempt after ``attempts``
+    failed ones: one minute, doubling each time, at most a day.
+    """
+    base = getattr(settings, 'OUTBOX_RETRY_DELAY', 60)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), 60 * 60 * 24))
+
+
+def claim(batch_size=BATCH_SIZE, now=None):
+    """
+    Lease up to ``batch_size`` due messages to the caller and return them.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        emails = list(
+            OutboxEmail.objects.filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at')
+            .select_for_update(skip_locked=True)[:batch_size]
+        )
+        OutboxEmail.objects.filter(pk__in=[email.pk for email in emails]).update(next_attempt_at=now + LEASE)
+    return emails
+
+
+def to_message(email, connection):
+    return EmailMessage(
+        subject=email.subject, body=email.body,
+        from_email=email.from_email or None,
+        to=[address for address in email.to.split(',') if address],
+        reply_to=[email.reply_to] if email.reply_to else None,
+        connection=connection,
+    )
+
+
+def record_failure(email, error, now):
+    email.attempts += 1
+    email.last_error = f'{type(error).__name__}: {error}'
+    if email.attempts >= getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 6):
+        email.status = 'failed'
+    else:
+        email.next_attempt_at = now + retry_delay(email.attempts)
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at', 'updated_at'])
+
+
+def deliver(emails, connection=None):
+    """
+    Send ``emails`` over one connection and record each outcome. Returns
+    ``(sent, failed)``.
+    """
+    connection = connection or get_connection()
+    sent = failed = 0
+    try:
+        connection.open()
+    except Exception as error:
+        # The mail server is unreachable: the whole batch waits its turn.
+        now = timezone.now()
+        for email in emails:
+            record_failure(email, error, now)
+        return 0, len(emails)
+    try:
+        for email in emails:
+            try:
+                to_message(email, connection).send()
+            except Exception as error:
+                record_failure(email, error, timezone.now())
+                failed += 1
+            else:
+                email.status = 'sent'
+                email.attempts += 1
+                email.sent_at = timezone.now()
+                email.last_error = ''
+                email.save(update_fields=['status', 'attempts', 'sent_at', 'last_error', 'updated_at'])
+                sent += 1
+    finally:
+        connection.close()
+    return sent, failed
+
+
+def drain(batch_size=BATCH_SIZE, connection=None):
+    """
+    Deliver every due message, a batch at a time. Returns ``(sent, failed)``.
+    """
+    sent = failed = 0
+    while True:
+        emails = claim(batch_size)
+        if not emails:
+            return sent, failed
+        batch_sent, batch_failed = deliver(emails, connection)
+        sent += batch_sent
+        failed += batch_failed
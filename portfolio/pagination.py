@@ -0,0 +1,215 @@
+"""
+Keyset (cursor) pagination for the public list views.
+
+Django's ``Paginator`` slices with ``OFFSET`` and counts the whole result
+set for every page, so both the ``COUNT(*)`` and the rows skipped by the
+offset grow with the archive. ``KeysetPaginator`` instead remembers the
+ordering key of the last (or first) row shown and asks for the rows after
+(or before) it, which the database answers from an index in constant time
+at any depth. Pages are linked by opaque, signed cursor tokens rather than
+page numbers, and no count query is issued.
+"""
+import datetime
+from collections.abc import Sequence
+
+from django.core import signing
+from django.db import connections
+from django.db.models import Q
+from django.http import Http404
+
+# Tokens are signed without a timestamp so each page has a single URL.
+signer = signing.Signer(salt='portfolio.pagination')
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class KeysetPaginator:
+    """
+    Paginate ``queryset`` by its ordering, ``per_page`` rows at a time.
+
+    The ordering is the queryset's ``order_by()`` or the model's
+    ``Meta.ordering``, and must name concrete fields of the model. The
+    primary key is appended as a tie-breaker so the order is total.
+    """
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.model = queryset.model
+        self.ordering = self._ordering(queryset)
+        # Whether the database sorts NULL above every value (PostgreSQL) or
+        # below it (SQLite); the ordering keeps each backend's native NULL
+        # placement so it matches a plain index on the same columns.
+        self.nulls_largest = connections[queryset.db].features.nulls_order_largest
+
+    def _ordering(self, queryset):
+        opts = self.model._meta
+        names = list(queryset.query.order_by or opts.ordering)
+        ordering = []
+        for name in names:
+            if not isinstance(name, str):
+                raise ValueError(f'Keyset pagination cannot order by expression {name!r}.')
+            descending = name.startswith('-')
+            field = opts.get_field(name.lstrip('-'))
+            if field.is_relation or not field.concrete:
+                raise ValueError(f'Keyset pagination cannot order by {name!r}.')
+            ordering.append((field, descending))
+        if not any(field.primary_key or field.unique for field, _ in ordering):
+            ordering.append((opts.pk, bool(ordering) and ordering[-1][1]))
+        return ordering
+
+    def _order_by(self, reverse):
+        return [
+            f'-{field.attname}' if descending != reverse else field.attname
+            for field, descending in self.ordering
+        ]
+
+    def _after(self, key, reverse):
+        """
+        Return a Q matching the rows that come after ``key`` in the
+        ordering, or before it when ``reverse`` is true.
+        """
+        nothing = Q(pk__in=[])
+        condition = nothing
+        equal = Q()
+        bound = None
+        for (field, descending), value in zip(self.ordering, key):
+            name = field.attname
+            descending = descending != reverse
+            nulls_last = field.null and descending != self.nulls_largest
+            if value is None:
+                beyond = nothing if nulls_last else Q(**{f'{name}__isnull': False})
+                at_or_beyond = Q(**{f'{name}__isnull': True}) if nulls_last else Q()
+            else:
+                beyond = Q(**{f'{name}__{"lt" if descending else "gt"}': value})
+                at_or_beyond = Q(**{f'{name}__{"lte" if descending else "gte"}': value})
+                if nulls_last:
+                    beyond |= Q(**{f'{name}__isnull': True})
+                    at_or_beyond |= Q(**{f'{name}__isnull': True})
+            if bound is None:
+                # Redundant with the expansion below, but a plain range on
+                # the leading column lets the database seek the index
+                # instead of filtering it from the start.
+                bound = at_or_beyond
+            condition |= equal & beyond
+            equal &= Q(**{f'{name}__isnull': True}) if value is None else Q(**{name: value})
+        return bound & condition
+
+    def _key(self, obj):
+        return [getattr(obj, field.attname) for field, _ in self.ordering]
+
+    def encode(self, obj, direction):
+        values = [
+            value.isoformat() if isinstance(value, (datetime.date, datetime.time)) else value
+            for value in self._key(obj)
+        ]
+        return signer.sign_object([direction, values])
+
+    def decode(self, token):
+        try:
+            direction, values = signer.unsign_object(token)
+            if direction not in (NEXT, PREVIOUS) or len(values) != len(self.ordering):
+                raise ValueError
+            key = [
+                None if value is None else field.to_python(value)
+                for (field, _), value in zip(self.ordering, values)
+            ]
+        except (signing.BadSignature, ValueError, TypeError):
+            raise InvalidCursor(token)
+        return direction, key
+
+    def page_queryset(self, token=None):
+        """
+        Return the unevaluated query for the page identified by ``token``
+        and whether it walks backwards. It fetches one row more than a
+        page to tell whether another page follows.
+        """
+        if not token:
+            return self.queryset.order_by(*self._order_by(False))[:self.per_page + 1], False
+        direction, key = self.decode(token)
+        reverse = direction == PREVIOUS
+        queryset = self.queryset.filter(self._after(key, reverse)).order_by(*self._order_by(reverse))
+        return queryset[:self.per_page + 1], reverse
+
+    def page(self, token=None):
+        """
+        Return the page identified by ``token``, or the first page.
+        """
+        queryset, reverse = self.page_queryset(token)
+        rows = list(queryset)
+        more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not token:
+            return KeysetPage(rows, self, False, more)
+        if not reverse:
+            return KeysetPage(rows, self, True, more)
+        rows.reverse()
+        if not more:
+            # Walked back to the start: serve a full first page.
+            return self.page()
+        return KeysetPage(rows, self, True, True)
+
+
+class KeysetPage(Sequence):
+    """
+    One page of a ``KeysetPaginator``, with tokens for its neighbours.
+    """
+
+    def __init__(self, object_list, paginator, has_previous, has_next):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_previous = has_previous and bool(object_list)
+        self._has_next = has_next
+
+    def __repr__(self):
+        return f'<Keyset page of {len(self)} {self.paginator.model._meta.verbose_name_plural}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_token(self):
+        if self._has_next:
+            return self.paginator.encode(self.object_list[-1], NEXT)
+        return None
+
+    @property
+    def previous_token(self):
+        if self._has_previous:
+            return self.paginator.encode(self.object_list[0], PREVIOUS)
+        return None
+
+
+class KeysetPaginationMixin:
+    """
+    Paginate a ``ListView`` with ``KeysetPaginator``.
+
+    The page is selected by the ``cursor`` query parameter; templates link
+    to ``?cursor={{ page_obj.next_token }}`` and ``page_obj.previous_token``.
+    """
+    cursor_kwarg = 'cursor'
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor:
+            raise Http404('Invalid page cursor.')
+        return paginator, page, page.object_list, page.has_other_pages()
@@ -0,0 +1,309 @@
+"""
+Static export of the public portfolio pages.
+
+Every public page is rendered through the full Django stack and written to
+``PRERENDER_ROOT`` as ``<path>/index.html``, in every language. The rewrite
+rules from ``htaccess_rules()`` let Apache serve those files directly, so
+anonymous GETs never wake a Passenger process. Paginated pages are stored
+as ``<path>/__<param>/<value>/index.html`` and matched on the query string.
+Requests with any other query string, POSTs such as the contact form, the
+search page and the admin still go through Django, and so does any URL
+whose file is missing.
+
+Saving or deleting content deletes the files of the pages that show it
+once the transaction commits, so Django serves those pages until they are
+exported again, and queues them for ``manage.py prerender_site --pending``,
+run from cron (see ``portfolio.signals``). Saves never wait on a render.
+"""
+import os
+import re
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.test import Client
+from django.urls import reverse
+from django.utils import translation
+
+from .models import (
+    Project, BlogPost, TeamMember, MediaAppearance,
+    InvestmentOpportunity, GalleryImage, PendingPrerender
+)
+from .pagination import KeysetPaginator
+from .views import BlogListView, GalleryListView, ProjectListView
+
+# URL name -> models whose changes show on the page, as in its page cache.
+PAGES = {
+    'home': (Project, BlogPost, TeamMember, MediaAppearance, InvestmentOpportunity, GalleryImage),
+    'project_list': (Project,),
+    'project_detail': (Project, InvestmentOpportunity),
+    'blog_list': (BlogPost,),
+    'blog_detail': (BlogPost,),
+    'team_list': (TeamMember,),
+    'gallery': (GalleryImage,),
+    'about': (TeamMember,),
+    'investment': (InvestmentOpportunity, Project),
+}
+KEYSET_VIEWS = {'blog_list': BlogListView, 'gallery': GalleryListView}
+# Query strings Apache can map onto a file; cursor tokens are URL-safe.
+PAGINATION_QUERY = re.compile(r'^(cursor|page)=([\w:-]+)$')
+
+HTACCESS_BEGIN = '# BEGIN portfolio prerendered pages'
+HTACCESS_END = '# END portfolio prerendered pages'
+
+
+def get_root():
+    return getattr(settings, 'PRERENDER_ROOT', None)
+
+
+def page_urls(name, pk=None):
+    """
+    Return the URLs of page ``name`` in the active language: every page of
+    a list, or the detail page of object ``pk`` (all objects if None).
+    """
+    if name == 'project_list':
+        url = reverse('portfolio:project_list')
+        paginator = Paginator(ProjectListView().get_queryset(), ProjectListView.paginate_by)
+        return [url] + [f'{url}?page={number}' for number in paginator.page_range]
+    if name in KEYSET_VIEWS:
+        view_class = KEYSET_VIEWS[name]
+        url = reverse(f'portfolio:{name}')
+        paginator = KeysetPaginator(view_class().get_queryset(), view_class.paginate_by)
+        urls = [url]
+        page = paginator.page()
+        while page.has_next():
+            token = page.next_token
+            page = paginator.page(token)
+            # Each page is linked forwards from its predecessor and
+            # backwards from its successor, under different tokens.
+            urls += [f'{url}?cursor={token}', f'{url}?cursor={page.previous_token}']
+        return urls
+    if name in ('project_detail', 'blog_detail'):
+        queryset = detail_queryset(name)
+        if pk is not None:
+            queryset = queryset.filter(pk=pk)
+        return [reverse(f'portfolio:{name}', kwargs={'slug': slug}) for slug in queryset.values_list('slug', flat=True)]
+    return [reverse(f'portfolio:{name}')]
+
+
+def detail_queryset(name):
+    if name == 'project_detail':
+        return Project.objects.all()
+    return BlogPost.objects.filter(status='published')
+
+
+def output_path(root, url):
+    """
+    Return the file ``url`` is exported to, or None if Apache could not
+    map the URL onto it.
+    """
+    path, _, query = url.partition('?')
+    target = Path(root, *[part for part in path.split('/') if part])
+    if query:
+        match = PAGINATION_QUERY.match(query)
+        if match is None:
+            return None
+        target = target / f'__{match[1]}' / match[2]
+    return target / 'index.html'
+
+
+def write_file(target, content):
+    """
+    Replace ``target`` atomically, so Apache never serves a partial page.
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, temporary = tempfile.mkstemp(dir=target.parent, prefix='.index-')
+    with os.fdopen(fd, 'wb') as handle:
+        handle.write(content)
+    os.chmod(temporary, 0o644)
+    os.replace(temporary, target)
+
+
+class Renderer:
+    """
+    Render pages through the full middleware stack and write them under
+    ``root``.
+    """
+
+    def __init__(self, root=None, host=None):
+        self.root = Path(root or get_root())
+        self.client = Client(HTTP_HOST=host or getattr(settings, 'PRERENDER_HOST', 'testserver'))
+        self.written = 0
+        self.skipped = []
+
+    def render(self, url):
+        target = output_path(self.root, url)
+        response = self.client.get(url, secure=True)
+        if target is None or response.status_code != 200 or response.cookies or response.streaming:
+            # Left to Django, which serves it with the right status and cookies.
+            self.skipped.append((url, response.status_code))
+            if target is not None and target.exists():
+                target.unlink()
+            return
+        write_file(target, response.content)
+        self.written += 1
+
+    def refresh(self, name, pk=None):
+        """
+        Re-render page ``name`` in every language and drop the files of
+        pages that no longer exist.
+        """
+        for language, _ in settings.LANGUAGES:
+            with translation.override(language):
+                urls = page_urls(name, pk)
+                self.prune(name)
+                for url in urls:
+                    self.render(url)
+
+    def invalidate(self, name, pk=None):
+        """
+        Delete the files of page ``name`` (of object ``pk``) in every
+        language, so that Django serves it until it is rendered again.
+        """
+        for language, _ in settings.LANGUAGES:
+            with translation.override(language):
+                self.prune(name)
+                if name in ('project_detail', 'blog_detail'):
+                    urls = page_urls(name, pk)
+                else:
+                    urls = [reverse(f'portfolio:{name}')]
+                for url in urls:
+                    target = output_path(self.root, url)
+                    if target is not None:
+                        target.unlink(missing_ok=True)
+
+    def prune(self, name):
+        if name in KEYSET_VIEWS or name == 'project_list':
+            # Page boundaries move with every change; the set is re-rendered.
+            directory = output_path(self.root, reverse(f'portfolio:{name}')).parent
+            for child in directory.glob('__*'):
+                shutil.rmtree(child)
+        elif name in ('project_detail', 'blog_detail'):
+            directory = output_path(self.root, reverse(f'portfolio:{name}', kwargs={'slug': 'x'})).parent.parent
+            slugs = set(detail_queryset(name).values_list('slug', flat=True))
+            if directory.is_dir():
+                for child in directory.iterdir():
+                    if child.is_dir() and not child.name.startswith('__') and child.name not in slugs:
+                        shutil.rmtree(child)
+
+    def export(self, names=None):
+        for name in names or PAGES:
+            self.refresh(name)
+
+
+def htaccess_rules(directory='prerendered'):
+    """
+    Return the Apache rewrite rules serving the files exported to
+    ``DOCUMENT_ROOT/<directory>``.
+    """
+    return f"""{HTACCESS_BEGIN}
+<IfModule mod_rewrite.c>
+    RewriteEngine On
+    RewriteRule ^ - [E=PRERENDERED_PAGE:]
+    RewriteCond %{{QUERY_STRING}} ^(cursor|page)=([\\w:-]+)$
+    RewriteRule ^ - [E=PRERENDERED_PAGE:__%1/%2/]
+    # Visitors who chose English on an unprefixed URL are redirected by Django.
+    RewriteCond %{{REQUEST_METHOD}} ^(GET|HEAD)$
+    RewriteCond %{{HTTP_COOKIE}} !(^|;\\s*)django_language=en
+    RewriteCond %{{QUERY_STRING}} ^$ [OR]
+    RewriteCond %{{ENV:PRERENDERED_PAGE}} .
+    RewriteCond %{{DOCUMENT_ROOT}}/{directory}%{{REQUEST_URI}}%{{ENV:PRERENDERED_PAGE}}index.html -f
+    RewriteRule ^ /{directory}%{{REQUEST_URI}}%{{ENV:PRERENDERED_PAGE}}index.html [L]
+</IfModule>
+{HTACCESS_END}
+"""
+
+
+def install_htaccess(path, directory='prerendered'):
+    """
+    Write the rewrite rules into the ``.htaccess`` at ``path``, replacing a
+    previous copy and keeping everything else (such as cPanel's Passenger
+    directives) in place.
+    """
+    path = Path(path)
+    existing = path.read_text() if path.exists() else ''
+    pattern = re.compile(rf'{re.escape(HTACCESS_BEGIN)}.*?{re.escape(HTACCESS_END)}\n?', re.DOTALL)
+    existing = pattern.sub('', existing)
+    # The rules must run before Passenger hands the request to Django.
+    path.write_text(htaccess_rules(directory) + existing)
+
+
+_pending = threading.local()
+
+
+def affected_pages(model, instance):
+    """
+    Return the pages showing ``instance``, as ``(name, pk)`` pairs: the
+    detail page of its object, or the whole page.
+    """
+    if model is InvestmentOpportunity:
+        detail = ('project_detail', instance.project_id)
+    elif model is Project:
+        detail = ('project_detail', instance.pk)
+    elif model is BlogPost:
+        detail = ('blog_detail', instance.pk)
+    else:
+        detail = None
+    return {
+        detail if detail and detail[0] == name else (name, None)
+        for name, models in PAGES.items() if model in models
+    }
+
+
+def schedule_refresh(model, instance):
+    """
+    Queue the pages showing ``instance`` to be exported again, and delete
+    their files once the current transaction commits.
+    """
+    if get_root():
+        schedule_pages(affected_pages(model, instance))
+
+
+def schedule_model_refresh(model):
+    """
+    Queue every page showing ``model``, e.g. after a bulk change that
+    bypassed the save signals.
+    """
+    if get_root():
+        schedule_pages({(name, None) for name, models in PAGES.items() if model in models})
+
+
+def schedule_pages(pages):
+    # Queued in the same transaction as the change, so neither is lost alone.
+    PendingPrerender.objects.bulk_create([PendingPrerender(page=name, object_id=pk) for name, pk in pages])
+    if not hasattr(_pending, 'pages'):
+        _pending.pages = set()
+    _pending.pages.update(pages)
+    transaction.on_commit(flush)
+
+
+def flush():
+    """
+    Delete the files of the pages changed by the committed transaction.
+    Pages affected by several changes are deleted once.
+    """
+    pages = getattr(_pending, 'pages', None)
+    if not pages:
+        return
+    _pending.pages = set()
+    renderer = Renderer()
+    for name, pk in sorted(pages, key=lambda page: (page[0], page[1] or 0)):
+        renderer.invalidate(name, pk)
+
+
+def render_pending(renderer):
+    """
+    Export the queued pages again with ``renderer`` and return how many
+    were rendered. Pages queued while rendering stay queued.
+    """
+    queued = list(PendingPrerender.objects.values_list('pk', 'page', 'object_id'))
+    whole = {name for _, name, pk in queued if pk is None}
+    pages = {(name, pk) for _, name, pk in queued if pk is None or name not in whole}
+    for name, pk in sorted(pages, key=lambda page: (page[0], page[1] or 0)):
+        renderer.refresh(name, pk)
+    PendingPrerender.objects.filter(pk__in=[pk for pk, _, _ in queued]).delete()
+    return len(pages)
@@ -0,0 +1,164 @@
+"""
+Share reservations for investment opportunities.
+
+Shares are claimed with a single conditional statement,
+
+    UPDATE ... SET available_shares = available_shares - n
+    WHERE id = ... AND is_active AND available_shares >= n
+
+so the check and the decrement cannot be separated by a concurrent
+request, and no row is read and locked up front. The row lock the UPDATE
+takes is held only for the rest of a two-statement transaction (the
+claim and the reservation insert), which keeps contention low during a
+burst. A ``CHECK (available_shares >= 0)`` constraint backs this up in the
+database.
+
+Held reservations expire after ``RESERVATION_HOLD_MINUTES``; the
+``expire_reservations`` command returns their shares. Every transition out
+of ``held`` is itself a conditional UPDATE, so a reservation confirmed by
+an admin can never also be expired by the sweeper, or the reverse.
+
+A reservation adds its shares to the project's funding summary with one
+more UPDATE, and does nothing else. The pages showing availability (the
+page cache, the static export and the edge cache) are refreshed by the
+sweeper, ``publish_availability()``, for every opportunity whose
+reservations changed since its last run.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import edge, prerender
+from .cache import bump_version, get_cache
+from .funding import adjust_project_funding
+from .models import InvestmentOpportunity, ShareReservation
+
+SWEEP_BATCH_SIZE = 500
+PUBLISHED_KEY = 'portfolio:availability_published'
+# Reservations commit a moment after they are stamped; look back this far.
+PUBLISH_OVERLAP = timedelta(minutes=1)
+
+
+class SharesUnavailable(Exception):
+    pass
+
+
+def hold_duration():
+    return timedelta(minutes=getattr(settings, 'RESERVATION_HOLD_MINUTES', 30))
+
+
+def availability_changed(opportunity, shares_sold):
+    """
+    Add ``shares_sold`` shares of ``opportunity`` to its project's funding
+    summary, which ``update()`` bypasses the save signals to refresh.
+    """
+    adjust_project_funding(opportunity.project_id, shares_sold, opportunity.price_per_share)
+
+
+def reserve_shares(opportunity, shares, name, email, phone=''):
+    """
+    Hold ``shares`` shares of ``opportunity`` and return the reservation.
+
+    Raises ``SharesUnavailable`` if fewer shares are left or the
+    opportunity is no longer active.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        claimed = InvestmentOpportunity.objects.filter(
+            pk=opportunity.pk, is_active=True, available_shares__gte=shares,
+        ).update(available_shares=F('available_shares') - shares, updated_at=now)
+        if not claimed:
+            raise SharesUnavailable(f'{shares} shares of {opportunity} are not available.')
+        reservation = ShareReservation.objects.create(
+            opportunity=opportunity, shares=shares, name=name, email=email, phone=phone,
+            expires_at=now + hold_duration(),
+        )
+        availability_changed(opportunity, shares)
+    return reservation
+
+
+def confirm_reservations(queryset):
+    """
+    Confirm the held reservations of ``queryset``; their shares stay sold.
+    Returns the number confirmed.
+    """
+    return queryset.filter(status='held').update(status='confirmed', updated_at=timezone.now())
+
+
+def release_reservations(queryset, status):
+    """
+    Move the held reservations of ``queryset`` to ``status`` ('expired' or
+    'cancelled') and return their shares. Returns the number released.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        # Concurrent sweepers skip each other's rows instead of waiting.
+        held = list(
+            queryset.filter(status='held')
+            .select_for_update(skip_locked=True)
+            .values_list('pk', 'opportunity_id', 'shares')
+        )
+        released = 0
+        returned = Counter()
+        for pk, opportunity_id, shares in held:
+            # Row by row, so shares only come back for reservations this
+            # call actually moved out of 'held'.
+            if ShareReservation.objects.filter(pk=pk, status='held').update(status=status, updated_at=now):
+                released += 1
+                returned[opportunity_id] += shares
+
+        # Every opportunity before any summary, summaries in project order,
+        # the order reserve_shares() and the save signals lock them in.
+        for opportunity_id, shares in sorted(returned.items()):
+            InvestmentOpportunity.objects.filter(pk=opportunity_id).update(
+                available_shares=F('available_shares') + shares, updated_at=now,
+            )
+        opportunities = InvestmentOpportunity.objects.only('pk', 'project_id', 'price_per_share').in_bulk(returned)
+        for opportunity in sorted(opportunities.values(), key=lambda item: (item.project_id, item.pk)):
+            availability_changed(opportunity, -returned[opportunity.pk])
+    return released
+
+
+def expire_reservations(now=None, batch_size=SWEEP_BATCH_SIZE):
+    """
+    Release every held reservation that expired by ``now``, in batches,
+    and return the number released.
+    """
+    now = now or timezone.now()
+    total = 0
+    while True:
+        batch = ShareReservation.objects.filter(status='held', expires_at__lte=now).order_by('expires_at')
+        released = release_reservations(
+            ShareReservation.objects.filter(pk__in=list(batch.values_list('pk', flat=True)[:batch_size])),
+            'expired',
+        )
+        total += released
+        if released < batch_size:
+            return total
+
+
+def publish_availability(now=None):
+    """
+    Refresh the cached, exported and edge-cached pages showing the
+    availability of every opportunity whose reservations changed since the
+    last call, and return how many there were.
+    """
+    now = now or timezone.now()
+    cache = get_cache()
+    reservations = ShareReservation.objects.all()
+    since = cache.get(PUBLISHED_KEY)
+    if since is not None:
+        reservations = reservations.filter(updated_at__gt=since)
+    changed = set(reservations.values_list('opportunity_id', flat=True).distinct())
+    if changed:
+        bump_version(InvestmentOpportunity)
+        with transaction.atomic():
+            for opportunity in InvestmentOpportunity.objects.only('pk', 'project_id').filter(pk__in=changed):
+                prerender.schedule_refresh(InvestmentOpportunity, opportunity)
+                edge.schedule_instance_purge(InvestmentOpportunity, opportunity)
+    cache.set(PUBLISHED_KEY, now - PUBLISH_OVERLAP, timeout=None)
+    return len(changed)
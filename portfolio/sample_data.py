@@ -0,0 +1,141 @@
+"""
+Synthetic portfolio content for query-plan checks and benchmarks.
+
+Rows are inserted with ``bulk_create`` so that tens of thousands of rows
+take seconds, and are generated from a seeded ``random.Random`` so every
+run produces the same dataset.
+"""
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from .funding import refresh_all_funding
+from .models import (
+    Project, BlogPost, TeamMember, MediaAppearance,
+    InvestmentOpportunity, GalleryImage
+)
+
+BATCH_SIZE = 500
+
+# How the synthetic rows of each model are told apart from real content.
+SAMPLE_ROWS = {
+    Project: {'slug__startswith': 'sample-project-'},
+    BlogPost: {'slug__startswith': 'sample-post-'},
+    TeamMember: {'name__startswith': 'Sample member '},
+    MediaAppearance: {'outlet_name__startswith': 'Sample outlet '},
+    GalleryImage: {'title__startswith': 'Sample image '},
+}
+
+
+def generate_sample_data(projects=200, opportunities_per_project=5, posts=2000,
+                         team_members=200, media_appearances=500, images=2000, seed=0):
+    """
+    Insert a synthetic dataset and return the number of rows per model.
+
+    Roughly one row in twenty is featured and most posts are published,
+    as on the live site, so the public filters stay selective.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    counts = {}
+
+    with transaction.atomic():
+        created = Project.objects.bulk_create(
+            (
+                Project(
+                    name=f'Sample project {i}', slug=f'sample-project-{i}',
+                    location='Patuakhali', acreage=Decimal(rng.randint(1, 500)),
+                    status=rng.choice(['active', 'active', 'planning', 'completed']),
+                    description='Sample project', order=rng.randint(0, 50),
+                    is_featured=rng.random() < 0.05,
+                )
+                for i in range(projects)
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        counts[Project] = len(created)
+
+        counts[InvestmentOpportunity] = len(InvestmentOpportunity.objects.bulk_create(
+            (
+                InvestmentOpportunity(
+                    title=f'Sample opportunity {project.pk}-{j}',
+                    slug=f'sample-opportunity-{project.pk}-{j}',
+                    description='Sample opportunity', total_shares=100,
+                    available_shares=rng.randint(0, 100),
+                    price_per_share=Decimal(rng.randint(1, 50) * 1000),
+                    project=project, is_active=rng.random() < 0.6,
+                    featured=rng.random() < 0.05, order=j,
+                )
+                for project in created
+                for j in range(opportunities_per_project)
+            ),
+            batch_size=BATCH_SIZE,
+        ))
+        # bulk_create() skips the signals that keep the summaries current.
+        refresh_all_funding()
+
+        post_rows = []
+        for i in range(posts):
+            published = rng.random() < 0.8
+            post_rows.append(BlogPost(
+                title=f'Sample post {i}', slug=f'sample-post-{i}',
+                excerpt='Sample excerpt', content='Sample content',
+                status='published' if published else 'draft',
+                published_at=now - timedelta(hours=rng.randint(0, 24 * 365 * 3)) if published else None,
+            ))
+        counts[BlogPost] = len(BlogPost.objects.bulk_create(post_rows, batch_size=BATCH_SIZE))
+
+        counts[TeamMember] = len(TeamMember.objects.bulk_create(
+            (
+                TeamMember(
+                    name=f'Sample member {i}', role=rng.choice(['expert', 'manager', 'other']),
+                    is_featured=rng.random() < 0.05, order=rng.randint(0, 50),
+                )
+                for i in range(team_members)
+            ),
+            batch_size=BATCH_SIZE,
+        ))
+
+        counts[MediaAppearance] = len(MediaAppearance.objects.bulk_create(
+            (
+                MediaAppearance(
+                    outlet_name=f'Sample outlet {i}', media_type=rng.choice(['newspaper', 'tv', 'online']),
+                    coverage_date=date.today() - timedelta(days=rng.randint(0, 1000)),
+                    is_featured=rng.random() < 0.05, order=rng.randint(0, 50),
+                )
+                for i in range(media_appearances)
+            ),
+            batch_size=BATCH_SIZE,
+        ))
+
+        counts[GalleryImage] = len(GalleryImage.objects.bulk_create(
+            (
+                GalleryImage(
+                    title=f'Sample image {i}', image=f'gallery/sample-{i}.jpg',
+                    category=rng.choice([choice for choice, _ in GalleryImage.CATEGORY_CHOICES]),
+                    is_featured=rng.random() < 0.05, order=rng.randint(0, 50),
+                )
+                for i in range(images)
+            ),
+            batch_size=BATCH_SIZE,
+        ))
+
+    return counts
+
+
+def delete_sample_data():
+    """
+    Delete the synthetic rows, opportunities included through their
+    projects, and return the number of rows deleted per model.
+    """
+    deleted = {}
+    with transaction.atomic():
+        for model, lookup in SAMPLE_ROWS.items():
+            _, counts = model.objects.filter(**lookup).delete()
+            for label, count in counts.items():
+                deleted[label] = deleted.get(label, 0) + count
+    return deleted
+
@@ -0,0 +1,248 @@
+"""
+Ranked full-text search over projects, blog posts and gallery images.
+
+Each searchable model has a companion index table holding one document per
+row, split into weighted sections (A: titles, B: summaries, C: body text):
+
+* on PostgreSQL a ``tsvector`` column with a GIN index, built from both the
+  ``english`` configuration (so "farming" finds "farm") and ``simple`` (so
+  Bengali words, which no configuration stems, are indexed verbatim) and
+  ranked with ``ts_rank_cd``;
+* on SQLite an FTS5 virtual table keyed by the row's primary key, tokenized
+  with ``unicode61`` and ranked with ``bm25``.
+
+The tables are created by migration ``0003_search_index``. Documents are
+rewritten on every save and removed on delete (see ``portfolio.signals``),
+so the index stays current one row at a time; rows written with
+``bulk_create`` or ``update()`` are picked up by the ``rebuild_search_index``
+management command.
+
+Text is normalised in Python before it reaches either backend: HTML is
+stripped, Unicode is composed (NFC), zero-width joiners are dropped and
+Bengali digits are mapped to ASCII, so "২০২৪" and "2024" match each other.
+"""
+import re
+import unicodedata
+
+from django.db import NotSupportedError, connections
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+from django.utils.html import strip_tags
+
+# Fields of each searchable model, by weight: (A, B, C). Models are keyed by
+# label so that migrations can index their historical models too.
+SEARCH_FIELDS = {
+    'portfolio.project': (('name',), ('location', 'crops', 'livestock'), ('description', 'details')),
+    'portfolio.blogpost': (('title',), ('excerpt', 'meta_description'), ('content',)),
+    'portfolio.galleryimage': (('title',), ('description',), ()),
+}
+WEIGHTS = ('A', 'B', 'C')
+
+# Python's \w stops at Bengali vowel signs and viramas, which are combining
+# marks, so the Bengali block is matched explicitly.
+TOKEN = re.compile(r'[\w\u0980-\u09ff]+')
+ZERO_WIDTH = dict.fromkeys(map(ord, '\u200b\u200c\u200d\ufeff'))
+BENGALI_DIGITS = str.maketrans('০১২৩৪৫৬৭৮৯', '0123456789')
+
+
+def tokenize(text):
+    """
+    Split ``text`` into normalised search tokens.
+    """
+    text = unicodedata.normalize('NFC', strip_tags(text or ''))
+    text = text.translate(ZERO_WIDTH).translate(BENGALI_DIGITS).lower()
+    return TOKEN.findall(text)
+
+
+def index_table(model):
+    return f'{model._meta.db_table}_search'
+
+
+def documents(instance):
+    """
+    Return the normalised text of each weighted section of ``instance``.
+    """
+    return [
+        ' '.join(
+            token
+            for name in names
+            for token in tokenize(str(getattr(instance, name) or ''))
+        )
+        for names in SEARCH_FIELDS[instance._meta.label_lower]
+    ]
+
+
+class PostgreSQLSearchBackend:
+    configs = ('english', 'simple')
+
+    def create_index(self, schema_editor, model):
+        table = schema_editor.quote_name(index_table(model))
+        schema_editor.execute(
+            f'CREATE TABLE {table} ('
+            f'object_id bigint PRIMARY KEY REFERENCES {schema_editor.quote_name(model._meta.db_table)} '
+            f'ON DELETE CASCADE, document tsvector NOT NULL)'
+        )
+        schema_editor.execute(
+            f'CREATE INDEX {schema_editor.quote_name(index_table(model) + "_gin")} '
+            f'ON {table} USING gin (document)'
+        )
+
+    def drop_index(self, schema_editor, model):
+        schema_editor.execute(f'DROP TABLE IF EXISTS {schema_editor.quote_name(index_table(model))}')
+
+    def _vector(self):
+        return ' || '.join(
+            f"setweight({' || '.join(f'to_tsvector({config!r}, %s)' for config in self.configs)}, {weight!r})"
+            for weight in WEIGHTS
+        )
+
+    def index(self, cursor, model, pk, sections):
+        params = [pk]
+        for text in sections:
+            params += [text] * len(self.configs)
+        cursor.execute(
+            f'INSERT INTO {index_table(model)} (object_id, document) VALUES (%s, {self._vector()}) '
+            f'ON CONFLICT (object_id) DO UPDATE SET document = EXCLUDED.document',
+            params,
+        )
+
+    def remove(self, cursor, model, pk):
+        cursor.execute(f'DELETE FROM {index_table(model)} WHERE object_id = %s', [pk])
+
+    def clear(self, cursor, model):
+        cursor.execute(f'DELETE FROM {index_table(model)}')
+
+    def _query(self):
+        return ' || '.join(f'to_tsquery({config!r}, %s)' for config in self.configs)
+
+    def match(self, model, tokens):
+        # Every token must match; the last may be a prefix of a longer word.
+        expression = ' & '.join(tokens[:-1] + [f'{tokens[-1]}:*'])
+        params = [expression] * len(self.configs)
+        table = index_table(model)
+        matching = RawSQL(f'SELECT object_id FROM {table} WHERE document @@ ({self._query()})', params)
+        rank = RawSQL(
+            f'SELECT ts_rank_cd(document, {self._query()}) FROM {table} '
+            f'WHERE object_id = {model._meta.db_table}.{model._meta.pk.column}',
+            params, output_field=FloatField(),
+        )
+        return matching, rank
+
+
+class SQLiteSearchBackend:
+    # bm25() weight of each column, matching ts_rank_cd's defaults for A, B, C.
+    column_weights = (1.0, 0.4, 0.2)
+
+    def create_index(self, schema_editor, model):
+        columns = ', '.join(f'weight_{weight.lower()}' for weight in WEIGHTS)
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE {schema_editor.quote_name(index_table(model))} USING fts5('
+            f"{columns}, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+
+    def drop_index(self, schema_editor, model):
+        schema_editor.execute(f'DROP TABLE IF EXISTS {schema_editor.quote_name(index_table(model))}')
+
+    def index(self, cursor, model, pk, sections):
+        columns = ', '.join(f'weight_{weight.lower()}' for weight in WEIGHTS)
+        cursor.execute(
+            f'INSERT OR REPLACE INTO {index_table(model)} (rowid, {columns}) VALUES (%s, %s, %s, %s)',
+            [pk, *sections],
+        )
+
+    def remove(self, cursor, model, pk):
+        cursor.execute(f'DELETE FROM {index_table(model)} WHERE rowid = %s', [pk])
+
+    def clear(self, cursor, model):
+        cursor.execute(f'DELETE FROM {index_table(model)}')
+
+    def match(self, model, tokens):
+        # FTS5 phrases are quoted, so tokens never read as query syntax.
+        expression = ' '.join(f'"{token}"' for token in tokens[:-1]) + f' "{tokens[-1]}"*'
+        table = index_table(model)
+        weights = ', '.join(map(str, self.column_weights))
+        matching = RawSQL(f'SELECT rowid FROM {table} WHERE {table} MATCH %s', [expression])
+        # bm25() is lower for better matches; negate it so higher ranks first
+        # on both backends.
+        rank = RawSQL(
+            f'SELECT -bm25({table}, {weights}) FROM {table} WHERE {table} MATCH %s '
+            f'AND rowid = {model._meta.db_table}.{model._meta.pk.column}',
+            [expression], output_field=FloatField(),
+        )
+        return matching, rank
+
+
+BACKENDS = {
+    'postgresql': PostgreSQLSearchBackend(),
+    'sqlite': SQLiteSearchBackend(),
+}
+
+
+def get_backend(using='default'):
+    """
+    Return the search backend of database ``using``, or None if full-text
+    search is not supported on it.
+    """
+    return BACKENDS.get(connections[using].vendor)
+
+
+def is_searchable(model):
+    return model._meta.label_lower in SEARCH_FIELDS
+
+
+def index_instance(instance, using='default'):
+    """
+    Write the search document of ``instance``.
+    """
+    backend = get_backend(using)
+    if backend is None:
+        return
+    model = type(instance)
+    with connections[using].cursor() as cursor:
+        backend.index(cursor, model, instance.pk, documents(instance))
+
+
+def remove_instance(instance, using='default'):
+    """
+    Drop the search document of ``instance``.
+    """
+    backend = get_backend(using)
+    if backend is None:
+        return
+    with connections[using].cursor() as cursor:
+        backend.remove(cursor, type(instance), instance.pk)
+
+
+def rebuild_index(model, using='default', chunk_size=500):
+    """
+    Re-index every row of ``model`` and return the number of rows indexed.
+    """
+    backend = get_backend(using)
+    if backend is None:
+        raise NotSupportedError(f'Full-text search is not supported on {connections[using].vendor}.')
+    fields = ['pk', *(name for names in SEARCH_FIELDS[model._meta.label_lower] for name in names)]
+    count = 0
+    with connections[using].cursor() as cursor:
+        backend.clear(cursor, model)
+        for instance in model.objects.using(using).only(*fields).iterator(chunk_size=chunk_size):
+            backend.index(cursor, model, instance.pk, documents(instance))
+            count += 1
+    return count
+
+
+def search(queryset, query):
+    """
+    Narrow ``queryset`` to the rows matching ``query`` and annotate each
+    with ``search_rank``, higher for better matches.
+
+    Every word of ``query`` must appear in the row; the last word also
+    matches as a prefix, so partially typed words still find results.
+    """
+    backend = get_backend(queryset.db)
+    if backend is None:
+        raise NotSupportedError(f'Full-text search is not supported on {connections[queryset.db].vendor}.')
+    tokens = tokenize(query)
+    if not tokens:
+        return queryset.none()
+    matching, rank = backend.match(queryset.model, tokens)
+    return queryset.filter(pk__in=matching).annotate(search_rank=rank)
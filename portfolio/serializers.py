@@ -0,0 +1,108 @@
+"""
+Serializers of the read-only JSON API (see ``portfolio.api``).
+"""
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+
+from .models import Project, BlogPost, InvestmentOpportunity, GalleryImage, ShareReservation
+
+
+class SparseFieldsetMixin:
+    """
+    Limit the serialized fields to the comma-separated ``?fields=`` of the
+    request, e.g. ``?fields=slug,name``.
+
+    ``Meta.field_sources`` names the model fields a computed field reads,
+    so the view can load only the columns the response needs.
+    """
+    fields_query_param = 'fields'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        requested = request.query_params.get(self.fields_query_param) if request else None
+        if not requested:
+            return
+        names = {name.strip() for name in requested.split(',') if name.strip()}
+        unknown = names - set(self.fields)
+        if unknown:
+            raise ParseError(f'Unknown fields: {", ".join(sorted(unknown))}.')
+        for name in set(self.fields) - names:
+            self.fields.pop(name)
+
+    def model_fields(self):
+        """
+        Return the names of the model fields read by the selected fields.
+        """
+        sources = getattr(self.Meta, 'field_sources', {})
+        concrete = {field.name for field in self.Meta.model._meta.concrete_fields}
+        names = set()
+        for name, field in self.fields.items():
+            names.update(sources.get(name, (field.source,)))
+        return names & concrete
+
+
+class ProjectSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Project
+        fields = [
+            'id', 'slug', 'name', 'location', 'acreage', 'status', 'description', 'details',
+            'crops', 'livestock', 'total_shares', 'share_price', 'lease_years',
+            'hero_image', 'overview_image', 'is_featured', 'order', 'created_at', 'updated_at',
+        ]
+
+
+class BlogPostSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    class Meta:
+        model = BlogPost
+        fields = [
+            'id', 'slug', 'title', 'excerpt', 'content', 'featured_image',
+            'published_at', 'meta_title', 'meta_description', 'created_at', 'updated_at',
+        ]
+
+
+class InvestmentOpportunitySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    percentage_sold = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = InvestmentOpportunity
+        fields = [
+            'id', 'slug', 'title', 'description', 'project', 'total_shares', 'available_shares',
+            'percentage_sold', 'price_per_share', 'minimum_investment', 'expected_return',
+            'investment_duration', 'terms_document', 'featured', 'order', 'created_at', 'updated_at',
+        ]
+        field_sources = {'percentage_sold': ('total_shares', 'available_shares')}
+
+
+class GalleryImageSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    class Meta:
+        model = GalleryImage
+        fields = [
+            'id', 'title', 'description', 'image', 'category', 'is_featured', 'order',
+            'created_at', 'updated_at',
+        ]
+
+
+class ShareReservationSerializer(serializers.ModelSerializer):
+    opportunity = serializers.SlugRelatedField(slug_field='slug', read_only=True)
+    shares = serializers.IntegerField(min_value=1)
+
+    class Meta:
+        model = ShareReservation
+        fields = ['reference', 'opportunity', 'shares', 'name', 'email', 'phone', 'status', 'expires_at']
+        read_only_fields = ['reference', 'status', 'expires_at']
+
+    def validate_shares(self, value):
+        limit = getattr(settings, 'RESERVATION_MAX_SHARES', 20)
+        if value > limit:
+            raise serializers.ValidationError(f'At most {limit} shares can be reserved at once.')
+        return value
+
+    def validate_email(self, value):
+        limit = getattr(settings, 'RESERVATION_MAX_HOLDS_PER_EMAIL', 2)
+        if ShareReservation.objects.filter(email__iexact=value, status='held').count() >= limit:
+            raise serializers.ValidationError(
+                f'This email already holds {limit} reservations; confirm or cancel one first.'
+            )
+        return value
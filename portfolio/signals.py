@@ -0,0 +1,125 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from . import edge, prerender, search
+from .cache import bump_version
+from .funding import refresh_project_funding
+from .images import generate_instance_derivatives, image_fields
+from .instrumentation import time_query
+from .models import (
+    Project, BlogPost, TeamMember, MediaAppearance,
+    InvestmentOpportunity, GalleryImage
+)
+
+CACHED_MODELS = (
+    Project, BlogPost, TeamMember, MediaAppearance,
+    InvestmentOpportunity, GalleryImage,
+)
+
+
+def invalidate_page_cache(sender, **kwargs):
+    """
+    Bump the content version of a public model after a save or delete.
+    """
+    bump_version(sender)
+    # A request running before the commit can still read the old rows and
+    # cache them under the new version; bump again once they are visible.
+    transaction.on_commit(lambda: bump_version(sender))
+
+
+def purge_edge_cache(sender, instance, **kwargs):
+    """
+    Purge the pages showing a saved or deleted instance from the reverse
+    proxy.
+    """
+    edge.schedule_instance_purge(sender, instance)
+
+
+def refresh_prerendered_pages(sender, instance, **kwargs):
+    """
+    Queue the static pages showing a saved or deleted instance for export.
+    """
+    prerender.schedule_refresh(sender, instance)
+
+
+def generate_image_derivatives(sender, instance, **kwargs):
+    """
+    Build responsive derivatives for newly uploaded images.
+    """
+    generate_instance_derivatives(instance)
+
+
+def update_search_index(sender, instance, using, **kwargs):
+    """
+    Rewrite the search document of a saved instance.
+    """
+    search.index_instance(instance, using=using)
+
+
+def remove_from_search_index(sender, instance, using, **kwargs):
+    """
+    Drop the search document of a deleted instance.
+    """
+    search.remove_instance(instance, using=using)
+
+
+def remember_funded_project(sender, instance, raw, **kwargs):
+    """
+    Note the project an existing opportunity belonged to, whose funding
+    must also be refreshed if the opportunity moves to another project.
+    """
+    if instance.pk is not None and not raw:
+        instance._funded_project_id = (
+            sender.objects.filter(pk=instance.pk).values_list('project_id', flat=True).first()
+        )
+
+
+def update_project_funding(sender, instance, raw=False, **kwargs):
+    """
+    Recompute the funding of the projects of a saved or deleted opportunity,
+    in the same transaction.
+    """
+    # Deleting a project deletes its summary along with its opportunities.
+    origin = kwargs.get('origin')
+    if raw or isinstance(origin, Project) or getattr(origin, 'model', None) is Project:
+        return
+    for project_id in {instance.project_id, getattr(instance, '_funded_project_id', None)} - {None}:
+        refresh_project_funding(project_id)
+
+
+def create_project_funding(sender, instance, created, raw, **kwargs):
+    """
+    Give a new project an empty funding summary.
+    """
+    if created and not raw:
+        refresh_project_funding(instance.pk)
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """
+    Let ``ServerTimingMiddleware`` time the queries of a new connection.
+    """
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+connection_created.connect(install_query_timer, dispatch_uid='instrumentation_query_timer')
+pre_save.connect(remember_funded_project, sender=InvestmentOpportunity, dispatch_uid='funding_remember_project')
+post_save.connect(update_project_funding, sender=InvestmentOpportunity, dispatch_uid='funding_opportunity_save')
+post_delete.connect(update_project_funding, sender=InvestmentOpportunity, dispatch_uid='funding_opportunity_delete')
+post_save.connect(create_project_funding, sender=Project, dispatch_uid='funding_project_create')
+
+for model in CACHED_MODELS:
+    # Derivatives first, so pages re-rendered after the version bump see them
+    if image_fields(model):
+        post_save.connect(generate_image_derivatives, sender=model, dispatch_uid=f'image_derivatives_{model.__name__}')
+    if search.is_searchable(model):
+        post_save.connect(update_search_index, sender=model, dispatch_uid=f'search_index_save_{model.__name__}')
+        post_delete.connect(remove_from_search_index, sender=model, dispatch_uid=f'search_index_delete_{model.__name__}')
+    post_save.connect(invalidate_page_cache, sender=model, dispatch_uid=f'page_cache_save_{model.__name__}')
+    post_delete.connect(invalidate_page_cache, sender=model, dispatch_uid=f'page_cache_delete_{model.__name__}')
+    post_save.connect(purge_edge_cache, sender=model, dispatch_uid=f'edge_purge_save_{model.__name__}')
+    post_delete.connect(purge_edge_cache, sender=model, dispatch_uid=f'edge_purge_delete_{model.__name__}')
+    post_save.connect(refresh_prerendered_pages, sender=model, dispatch_uid=f'prerender_save_{model.__name__}')
+    post_delete.connect(refresh_prerendered_pages, sender=model, dispatch_uid=f'prerender_delete_{model.__name__}')
@@ -0,0 +1,142 @@
+"""
+Unique, readable slugs for titles in English and Bengali.
+
+``slugify()`` drops every non-ASCII character, so a Bengali title such as
+"গরু মোটাতাজাকরণ" slugifies to an empty string and every such row collides
+on the unique ``slug`` column. Titles are therefore transliterated to Latin
+letters first ("goru-motatajakoron"); a title left with nothing usable
+falls back to the model's name. Collisions get a numeric suffix: "eid",
+"eid-2", "eid-3".
+
+``unique_slug()`` serves one row being saved; ``SlugAllocator`` serves a
+bulk import, looking up the taken slugs of a whole batch at once.
+"""
+import itertools
+import unicodedata
+
+from django.db.models import Q
+from django.utils.text import slugify
+
+from .search import BENGALI_DIGITS, ZERO_WIDTH
+
+# A common romanisation of Bengali, as used for place and personal names.
+CONSONANTS = {
+    'ক': 'k', 'খ': 'kh', 'গ': 'g', 'ঘ': 'gh', 'ঙ': 'ng',
+    'চ': 'ch', 'ছ': 'chh', 'জ': 'j', 'ঝ': 'jh', 'ঞ': 'n',
+    'ট': 't', 'ঠ': 'th', 'ড': 'd', 'ঢ': 'dh', 'ণ': 'n',
+    'ত': 't', 'থ': 'th', 'দ': 'd', 'ধ': 'dh', 'ন': 'n',
+    'প': 'p', 'ফ': 'ph', 'ব': 'b', 'ভ': 'bh', 'ম': 'm',
+    'য': 'j', 'র': 'r', 'ল': 'l', 'শ': 'sh', 'ষ': 'sh', 'স': 's', 'হ': 'h',
+    '\u09dc': 'r', '\u09dd': 'rh', '\u09df': 'y',  # ড়, ঢ়, য়
+}
+VOWELS = {
+    'অ': 'o', 'আ': 'a', 'ই': 'i', 'ঈ': 'i', 'উ': 'u', 'ঊ': 'u', 'ঋ': 'ri',
+    'এ': 'e', 'ঐ': 'oi', 'ও': 'o', 'ঔ': 'ou',
+}
+VOWEL_SIGNS = {
+    'া': 'a', 'ি': 'i', 'ী': 'i', 'ু': 'u', 'ূ': 'u', 'ৃ': 'ri',
+    'ে': 'e', 'ৈ': 'oi', 'ো': 'o', 'ৌ': 'ou',
+}
+OTHER = {'ৎ': 't', 'ং': 'ng', 'ঃ': 'h', 'ঁ': '', 'ৗ': 'ou', '।': ' '}
+VIRAMA = '্'
+INHERENT_VOWEL = 'o'
+# Unicode keeps these three decomposed even in NFC.
+NUKTA_FORMS = {'\u09a1\u09bc': '\u09dc', '\u09a2\u09bc': '\u09dd', '\u09af\u09bc': '\u09df'}
+
+
+def transliterate(text):
+    """
+    Spell the Bengali in ``text`` with Latin letters, leaving everything
+    else alone.
+    """
+    text = unicodedata.normalize('NFC', text).translate(ZERO_WIDTH).translate(BENGALI_DIGITS)
+    for decomposed, composed in NUKTA_FORMS.items():
+        text = text.replace(decomposed, composed)
+    out = []
+    for i, char in enumerate(text):
+        if char in CONSONANTS:
+            out.append(CONSONANTS[char])
+            following = text[i + 1] if i + 1 < len(text) else ''
+            # A consonant carries an inherent vowel unless a vowel sign or
+            # virama follows; at the end of a word it is not pronounced.
+            if following in CONSONANTS:
+                out.append(INHERENT_VOWEL)
+        elif char in VOWELS:
+            out.append(VOWELS[char])
+        elif char in VOWEL_SIGNS:
+            out.append(VOWEL_SIGNS[char])
+        elif char in OTHER:
+            out.append(OTHER[char])
+        elif char != VIRAMA:
+            out.append(char)
+    return ''.join(out)
+
+
+def base_slug(text, model, max_length=None):
+    """
+    Return the slug of ``text`` before any collision suffix, falling back
+    to the name of ``model`` when nothing usable is left.
+    """
+    slug = slugify(transliterate(text or '')) or slugify(model._meta.model_name)
+    max_length = max_length or model._meta.get_field('slug').max_length
+    return slug[:max_length].rstrip('-')
+
+
+def candidates(base, max_length):
+    """
+    Yield ``base``, then ``base-2``, ``base-3``... each within
+    ``max_length``.
+    """
+    yield base
+    for n in itertools.count(2):
+        suffix = f'-{n}'
+        yield base[:max_length - len(suffix)].rstrip('-') + suffix
+
+
+def unique_slug(instance, text):
+    """
+    Return a slug for ``text`` not yet used by another row of the
+    instance's model.
+    """
+    model = type(instance)
+    max_length = model._meta.get_field('slug').max_length
+    base = base_slug(text, model, max_length)
+    taken = set(
+        model._default_manager.filter(slug__startswith=base[:max_length - 8])
+        .exclude(pk=instance.pk).values_list('slug', flat=True)
+    )
+    return next(slug for slug in candidates(base, max_length) if slug not in taken)
+
+
+class SlugAllocator:
+    """
+    Allocate unique slugs for many new rows of ``model``.
+
+    ``allocate()`` takes the titles of a batch and looks up the slugs
+    already taken by all of their bases together; slugs handed out earlier in
+    the same import are remembered, so rows of one batch never collide
+    with each other either.
+    """
+    # Each base is a LIKE term; SQLite limits how deep an expression nests.
+    QUERY_TERMS = 200
+
+    def __init__(self, model):
+        self.model = model
+        self.max_length = model._meta.get_field('slug').max_length
+        self.taken = set()
+
+    def allocate(self, texts):
+        bases = [base_slug(text, self.model, self.max_length) for text in texts]
+        # Suffixes shorten long bases, so match on a prefix that survives.
+        prefixes = sorted({base[:self.max_length - 8] for base in bases})
+        for start in range(0, len(prefixes), self.QUERY_TERMS):
+            query = Q()
+            for prefix in prefixes[start:start + self.QUERY_TERMS]:
+                query |= Q(slug__startswith=prefix)
+            self.taken.update(self.model._default_manager.filter(query).values_list('slug', flat=True))
+        slugs = []
+        for base in bases:
+            slug = next(slug for slug in candidates(base, self.max_length) if slug not in self.taken)
+            self.taken.add(slug)
+            slugs.append(slug)
+        return slugs
@@ -0,0 +1,64 @@
+"""
+Timed start-up of the application, run in a fresh interpreter by the
+``startup_profile`` command.
+
+``probe()`` loads the application the way ``passenger_wsgi.py`` does, one
+step at a time, and prints the duration of each step as JSON. The app
+registry is populated by hand so that importing, importing the models of,
+and running ``ready()`` for each installed app are timed separately.
+
+Nothing is imported at module level: the interpreter must be cold when the
+timing starts.
+"""
+
+
+def probe(warm_up=False):
+    import json
+    import sys
+    import time
+
+    steps = []
+
+    def timed(name, func, *args):
+        started = time.perf_counter()
+        result = func(*args)
+        steps.append({'step': name, 'seconds': time.perf_counter() - started})
+        return result
+
+    started = time.perf_counter()
+    from django.apps import apps
+    from django.apps.config import AppConfig
+    steps.append({'step': 'import django', 'seconds': time.perf_counter() - started})
+
+    from django.conf import settings
+    timed('settings', lambda: settings.INSTALLED_APPS)
+
+    from django.utils.log import configure_logging
+    timed('logging', configure_logging, settings.LOGGING_CONFIG, settings.LOGGING)
+
+    # What apps.populate() does, with each phase timed per app.
+    configs = [timed(f'app {entry}: import', AppConfig.create, entry) for entry in settings.INSTALLED_APPS]
+    apps.app_configs = {}
+    for config in configs:
+        config.apps = apps
+        apps.app_configs[config.label] = config
+    apps.apps_ready = True
+    for config in configs:
+        timed(f'app {config.name}: models', config.import_models)
+    apps.clear_cache()
+    apps.models_ready = True
+    for config in configs:
+        timed(f'app {config.name}: ready', config.ready)
+    apps.ready = True
+    apps.ready_event.set()
+
+    from django.core.handlers.wsgi import WSGIHandler
+    timed('wsgi handler (middleware)', WSGIHandler)
+
+    from .warmup import compile_templates, prime_caches, resolve_urls
+    timed('url resolver', resolve_urls)
+    timed('templates', compile_templates)
+    if warm_up:
+        timed('page caches', prime_caches)
+
+    json.dump(steps, sys.stdout)
@@ -0,0 +1,49 @@
+"""
+Public pages without sessions.
+
+The public portfolio pages are the same for every visitor, so a GET for
+one of them skips the session, CSRF, authentication and messages
+middleware (see ``portfolio.middleware.StatefulMiddleware``): no session
+is loaded, no cookie is set and nothing adds ``Vary: Cookie``, so the
+response can be shared by any cache. A signed-in editor browsing the site
+gets the same public page.
+
+A portfolio view that needs any of them, because it shows a form or
+messages, is marked with ``@stateful`` and keeps the full chain, as do
+POSTs, the admin and the API.
+"""
+from django.urls import Resolver404, resolve
+
+STATELESS_NAMESPACE = 'portfolio'
+
+
+def stateful(view_func):
+    """
+    Mark a portfolio view as needing the session, CSRF, authentication and
+    messages middleware.
+
+    Class-based views set a ``stateful`` class attribute instead.
+    """
+    view_func.stateful = True
+    return view_func
+
+
+def is_stateful_view(view):
+    """
+    Return whether a resolved view callable is marked ``@stateful``.
+    """
+    view_class = getattr(view, 'view_class', None)
+    return getattr(view_class or view, 'stateful', False)
+
+
+def is_stateless(request):
+    """
+    Return whether ``request`` is a GET for a public portfolio page.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    try:
+        match = resolve(request.path_info, getattr(request, 'urlconf', None))
+    except Resolver404:
+        return False
+    return match.namespaces == [STATELESS_NAMESPACE] and not is_stateful_view(match.func)
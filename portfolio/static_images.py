@@ -0,0 +1,185 @@
+"""
+Build-time optimizer for the images shipped in ``static/``.
+
+``optimize_static_images`` writes recompressed PNG/JPEG copies and WebP
+width variants of every image under ``static/images`` into
+``static/optimized`` and records them in ``static/optimized/manifest.json``.
+``collectstatic`` then ships them with the rest of the static files, and the
+``{% picture %}`` tag reads the manifest to pick the smallest format.
+
+Only images whose content hash changed since the last run are re-encoded.
+"""
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from PIL import Image
+
+SOURCE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+WEBP_WIDTHS = (480, 960, 1600)
+
+WEBP_OPTIONS = {'format': 'WEBP', 'quality': 82, 'method': 6}
+
+
+def static_root():
+    return Path(getattr(settings, 'STATIC_IMAGES_ROOT', settings.BASE_DIR / 'static'))
+
+
+def source_dir():
+    return static_root() / 'images'
+
+
+def output_dir():
+    return static_root() / 'optimized'
+
+
+def manifest_path():
+    return output_dir() / 'manifest.json'
+
+
+def _static_path(path):
+    """
+    Return ``path`` relative to the static root it lives in, e.g.
+    ``images/map.png`` or ``optimized/images/map.w960.webp``.
+    """
+    return path.relative_to(static_root()).as_posix()
+
+
+def _content_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return len(data)
+
+
+def _recompress(source, image, target):
+    """
+    Losslessly recompress ``source`` into ``target``.
+
+    PNGs are re-deflated by Pillow. JPEGs can only be optimized without
+    re-encoding by ``jpegtran``; without it on PATH they are left as-is.
+    Returns the size of ``target``, or None when no smaller copy was made.
+    """
+    if image.format == 'PNG':
+        buffer = BytesIO()
+        image.save(buffer, format='PNG', optimize=True)
+        data = buffer.getvalue()
+    elif image.format == 'JPEG' and shutil.which('jpegtran'):
+        result = subprocess.run(
+            ['jpegtran', '-copy', 'none', '-optimize', '-progressive', str(source)],
+            capture_output=True, check=False,
+        )
+        if result.returncode != 0:
+            return None
+        data = result.stdout
+    else:
+        return None
+
+    if len(data) >= source.stat().st_size:
+        return None
+    return _write(target, data)
+
+
+def optimize_image(source, previous=None):
+    """
+    Optimize one source image and return its manifest entry.
+
+    ``previous`` is the entry from the last run; it is returned unchanged
+    when the source hash matches and every output still exists.
+    """
+    content_hash = _content_hash(source)
+    if previous and previous.get('hash') == content_hash:
+        outputs = [previous['fallback']['path']] + [variant['path'] for variant in previous['webp']]
+        if all((static_root() / output).exists() for output in outputs):
+            return previous
+
+    stem = output_dir() / source.relative_to(static_root()).with_suffix('')
+    with Image.open(source) as image:
+        image.load()
+        width, height = image.size
+
+        fallback = {'path': _static_path(source), 'bytes': source.stat().st_size}
+        optimized = stem.parent / f'{stem.name}.opt{source.suffix.lower()}'
+        size = _recompress(source, image, optimized)
+        if size is not None:
+            fallback = {'path': _static_path(optimized), 'bytes': size}
+
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA')
+        webp = []
+        for target_width in sorted({w for w in WEBP_WIDTHS if w < width} | {width}):
+            resized = image
+            if target_width < width:
+                resized = image.resize((target_width, round(height * target_width / width)), Image.LANCZOS)
+            buffer = BytesIO()
+            resized.save(buffer, **WEBP_OPTIONS)
+            target = stem.parent / f'{stem.name}.w{target_width}.webp'
+            webp.append({
+                'path': _static_path(target),
+                'width': target_width,
+                'bytes': _write(target, buffer.getvalue()),
+            })
+
+    return {
+        'hash': content_hash,
+        'width': width,
+        'height': height,
+        'original_bytes': source.stat().st_size,
+        'fallback': fallback,
+        'webp': webp,
+    }
+
+
+def build_manifest(force=False):
+    """
+    Optimize every source image and write the manifest.
+
+    Returns ``(manifest, changed)`` where ``changed`` lists the re-encoded
+    source paths.
+    """
+    previous = {} if force else read_manifest()
+    manifest = {}
+    changed = []
+    for source in sorted(source_dir().rglob('*')):
+        if source.suffix.lower() not in SOURCE_EXTENSIONS or not source.is_file():
+            continue
+        key = _static_path(source)
+        entry = optimize_image(source, previous.get(key))
+        if entry is not previous.get(key):
+            changed.append(key)
+        manifest[key] = entry
+
+    output_dir().mkdir(parents=True, exist_ok=True)
+    tmp = manifest_path().with_suffix('.tmp')
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(tmp, manifest_path())
+    _load_manifest.cache_clear()
+    return manifest, changed
+
+
+def read_manifest():
+    try:
+        mtime = manifest_path().stat().st_mtime
+    except FileNotFoundError:
+        return {}
+    return _load_manifest(str(manifest_path()), mtime)
+
+
+@lru_cache(maxsize=1)
+def _load_manifest(path, mtime):
+    with open(path) as handle:
+        return json.load(handle)
@@ -0,0 +1,68 @@
+import re
+
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from ..assets import CSS_SOURCES, JS_SOURCES, STATIC_URL_PLACEHOLDER, read_manifest
+
+register = template.Library()
+
+
+def _bundles():
+    if not getattr(settings, 'USE_ASSET_BUNDLES', False):
+        return {}
+    return read_manifest()
+
+
+def _inline_css(css):
+    # Relative url()s were rewritten to static paths at build time.
+    return re.sub(
+        re.escape(STATIC_URL_PLACEHOLDER) + r'''([^'")]+)''',
+        lambda match: static(match.group(1)),
+        css,
+    )
+
+
+@register.simple_tag(takes_context=True)
+def page_styles(context):
+    """
+    Render the stylesheets for the page being rendered.
+
+    With bundles built, this is the page's purged bundle; if the page has
+    critical CSS it is inlined and the bundle is loaded without blocking
+    render. Otherwise the individual source stylesheets are linked.
+    """
+    name = context.template.name if context.template else None
+    entry = _bundles().get('pages', {}).get(name)
+    if entry is None:
+        return format_html_join(
+            '\n    ', '<link rel="stylesheet" href="{}">',
+            ((static(source),) for source in CSS_SOURCES),
+        )
+
+    href = static(entry['css'])
+    if not entry['critical']:
+        return format_html('<link rel="stylesheet" href="{}">', href)
+    return format_html(
+        '<style>{}</style>\n'
+        '    <link rel="preload" href="{}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">\n'
+        '    <noscript><link rel="stylesheet" href="{}"></noscript>',
+        mark_safe(_inline_css(entry['critical'])), href, href,
+    )
+
+
+@register.simple_tag
+def page_scripts():
+    """
+    Render the site script bundle, or the source scripts if none is built.
+    """
+    bundle = _bundles().get('js')
+    if bundle is None:
+        return format_html_join(
+            '\n    ', '<script src="{}"></script>',
+            ((static(source),) for source in JS_SOURCES),
+        )
+    return format_html('<script src="{}" defer></script>', static(bundle))
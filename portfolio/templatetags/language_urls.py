@@ -0,0 +1,17 @@
+from django import template
+from django.urls import translate_url
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def translated_url(context, language):
+    """
+    Return the URL of the page being rendered in ``language``.
+
+    Bengali pages live at the unprefixed URLs and English ones under
+    ``/en/``, so the language switcher is a plain link::
+
+        <a href="{% translated_url 'en' %}">English</a>
+    """
+    return translate_url(context['request'].get_full_path(), language)
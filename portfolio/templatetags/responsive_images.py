@@ -0,0 +1,75 @@
+from django import template
+from django.forms.utils import flatatt
+from django.templatetags.static import static
+from django.utils.html import format_html
+
+from ..images import derivative_name, derivative_widths
+from ..static_images import read_manifest
+
+register = template.Library()
+
+# Widest copy used for the plain ``src`` fallback of browsers without
+# srcset support.
+FALLBACK_WIDTH = 1024
+
+
+def _srcset(field_file, widths, extension):
+    storage = field_file.storage
+    return ', '.join(
+        f'{storage.url(derivative_name(field_file.name, width, extension))} {width}w'
+        for width in widths
+    )
+
+
+@register.simple_tag
+def responsive_image(field_file, alt='', sizes='100vw', loading='lazy', **attrs):
+    """
+    Render an uploaded image as a ``<picture>`` with WebP and JPEG srcsets.
+
+    Falls back to a plain ``<img>`` of the original until the derivatives
+    exist. Extra keyword arguments become attributes of the ``<img>``::
+
+        {% responsive_image image.image alt=image.title sizes="(max-width: 768px) 100vw, 33vw" %}
+    """
+    attrs.update({'alt': alt, 'loading': loading, 'decoding': 'async'})
+    widths = derivative_widths(field_file)
+    if not widths:
+        return format_html('<img src="{}"{}>', field_file.url, flatatt(attrs))
+
+    fallback_width = max((width for width in widths if width <= FALLBACK_WIDTH), default=widths[0])
+    fallback = field_file.storage.url(derivative_name(field_file.name, fallback_width, 'jpg'))
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}"{}>'
+        '</picture>',
+        _srcset(field_file, widths, 'webp'), sizes,
+        fallback, _srcset(field_file, widths, 'jpg'), sizes, flatatt(attrs),
+    )
+
+
+@register.simple_tag
+def picture(path, alt='', sizes='100vw', loading='lazy', **attrs):
+    """
+    Render a shipped static image using the optimizer manifest.
+
+    Browsers with WebP support get the width variants; others get the
+    smallest lossless copy. Images missing from the manifest render as a
+    plain ``<img>``::
+
+        {% picture 'images/map.png' alt="Project map" class="floating" %}
+    """
+    attrs.update({'alt': alt, 'loading': loading, 'decoding': 'async'})
+    entry = read_manifest().get(path)
+    if entry is None:
+        return format_html('<img src="{}"{}>', static(path), flatatt(attrs))
+
+    attrs.update({'width': entry['width'], 'height': entry['height']})
+    srcset = ', '.join(f"{static(variant['path'])} {variant['width']}w" for variant in entry['webp'])
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}"{}>'
+        '</picture>',
+        srcset, sizes, static(entry['fallback']['path']), flatatt(attrs),
+    )
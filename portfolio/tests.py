@@ -1,3 +1,1529 @@
-from django.test import TestCase
+import json
+import logging
+import re
+import shutil
+import tempfile
+import threading
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.admin import site
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+from django.template import Context, Template
+from django.conf import settings
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils.module_loading import import_string
+from django.utils import timezone, translation
+from PIL import Image
+
+from . import urls as portfolio_urls
+from .api import ReservationRateThrottle
+from .assets import UsedNames, minify_css, minify_js, parse_css, purge_css, serialize_css, template_sources
+from .budgets import get_query_budget
+from .cache import bump_version
+from .checks import check_stateful_middleware
+from .content_import import ContentImporter, iter_json
+from .db.base import PooledConnectionMixin, close_pools
+from .db.pool import ConnectionPool, PoolTimeout
+from .edge import HttpPurger
+from .images import DERIVATIVE_WIDTHS, derivative_name
+from .log import JsonFormatter, configure_logging
+from .pagination import KeysetPaginator
+from .funding import refresh_all_funding
+from .instrumentation import recording
+from .outbox import deliver, drain, enqueue
+from .prerender import PAGES, install_htaccess
+from .reservations import expire_reservations, publish_availability, reserve_shares
+from .search import search
+from .slugs import transliterate
+from .static_images import build_manifest
+from .warmup import warm_up
+from .models import (
+    Project, BlogPost, TeamMember, MediaAppearance,
+    InvestmentOpportunity, GalleryImage, ShareReservation, ProjectFunding,
+    ContactSubmission, OutboxEmail, PendingPrerender
+)
+
+
+def seed_portfolio(projects=4, opportunities_per_project=3, posts=10, images=15):
+    """
+    Create a realistic spread of public content for view tests.
+    """
+    for i in range(projects):
+        project = Project.objects.create(
+            name=f'Project {i}', location='Patuakhali', acreage=10 + i,
+            description='Cattle and crops', is_featured=i < 3, order=i,
+        )
+        for j in range(opportunities_per_project):
+            InvestmentOpportunity.objects.create(
+                title=f'Opportunity {i}-{j}', description='Eid fattening',
+                total_shares=100, available_shares=40, price_per_share=5000,
+                project=project, featured=j == 0, order=j,
+            )
+    for i in range(posts):
+        BlogPost.objects.create(
+            title=f'Post {i}', excerpt='Excerpt', content='Content',
+            status='published' if i % 4 else 'draft',
+        )
+    for i in range(5):
+        TeamMember.objects.create(name=f'Member {i}', role='expert', is_featured=i < 3, order=i)
+        MediaAppearance.objects.create(outlet_name=f'Outlet {i}', media_type='tv', is_featured=True, order=i)
+    for i in range(images):
+        GalleryImage.objects.create(
+            title=f'Image {i}', image=f'gallery/image-{i}.jpg',
+            category='cattle', is_featured=i < 6, order=i,
+        )
+
+
+class VersionedPageCacheTests(TestCase):
+    """
+    Tests for the versioned full-response cache on public views.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.project = Project.objects.create(
+            name='Patuakhali Farm', location='Patuakhali', acreage=10,
+            description='Cattle farm', is_featured=True,
+        )
+
+    def test_repeat_request_skips_database(self):
+        url = reverse('portfolio:home')
+        first = self.client.get(url)
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(first.content, second.content)
+
+    def test_save_invalidates_dependent_pages(self):
+        url = reverse('portfolio:project_list')
+        self.assertContains(self.client.get(url), 'Patuakhali Farm')
+        self.project.name = 'Barishal Farm'
+        self.project.save()
+        self.assertContains(self.client.get(url), 'Barishal Farm')
+
+    def test_delete_invalidates_dependent_pages(self):
+        post = BlogPost.objects.create(
+            title='Eid cattle', excerpt='Eid', content='Body', status='published',
+        )
+        url = reverse('portfolio:blog_list')
+        self.assertContains(self.client.get(url), 'Eid cattle')
+        post.delete()
+        self.assertNotContains(self.client.get(url), 'Eid cattle')
+
+    def test_pages_cached_before_commit_are_dropped(self):
+        url = reverse('portfolio:project_list')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.save()
+            # Cached under the new version by a request that ran mid-transaction.
+            self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        self.assertGreater(len(queries), 0)
+
+    def test_unrelated_model_keeps_cache(self):
+        url = reverse('portfolio:blog_list')
+        self.client.get(url)
+        self.project.save()
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Every public URL must stay within the query budget its view declares.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_portfolio()
+        cls.url_kwargs = {
+            'project_detail': {'slug': Project.objects.first().slug},
+            'blog_detail': {'slug': BlogPost.objects.filter(status='published').first().slug},
+        }
+
+    def setUp(self):
+        cache.clear()
+
+    def test_every_view_declares_a_budget(self):
+        for pattern in portfolio_urls.urlpatterns:
+            with self.subTest(url=pattern.name):
+                self.assertIsNotNone(get_query_budget(pattern.callback))
+
+    def test_views_stay_within_budget(self):
+        for pattern in portfolio_urls.urlpatterns:
+            budget = get_query_budget(pattern.callback)
+            url = reverse(f'portfolio:{pattern.name}', kwargs=self.url_kwargs.get(pattern.name))
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertLessEqual(
+                    len(queries), budget,
+                    f'{url} ran {len(queries)} queries (budget {budget}):\n'
+                    + '\n'.join(query['sql'] for query in queries.captured_queries),
+                )
+
+
+class ImageDerivativeTests(TestCase):
+    """
+    Tests for upload-time responsive image derivatives.
+    """
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def upload(self, width, height):
+        buffer = BytesIO()
+        Image.new('RGB', (width, height), (40, 120, 60)).save(buffer, 'JPEG')
+        return SimpleUploadedFile('cow.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+    def test_upload_generates_bounded_derivatives(self):
+        image = GalleryImage.objects.create(title='Cow', image=self.upload(2000, 1000))
+        storage = image.image.storage
+        for width in DERIVATIVE_WIDTHS:
+            for extension in ('webp', 'jpg'):
+                name = derivative_name(image.image.name, width, extension)
+                with storage.open(name) as derivative:
+                    self.assertEqual(Image.open(derivative).width, width)
+
+    def test_small_originals_are_not_upscaled(self):
+        image = GalleryImage.objects.create(title='Logo', image=self.upload(200, 100))
+        storage = image.image.storage
+        with storage.open(derivative_name(image.image.name, 200, 'webp')) as derivative:
+            self.assertEqual(Image.open(derivative).width, 200)
+        for width in DERIVATIVE_WIDTHS:
+            self.assertFalse(storage.exists(derivative_name(image.image.name, width, 'webp')), width)
+
+    def test_template_tag_emits_srcset(self):
+        image = GalleryImage.objects.create(title='Cow', image=self.upload(800, 600))
+        html = Template(
+            '{% load responsive_images %}{% responsive_image image.image alt=image.title sizes="50vw" %}'
+        ).render(Context({'image': image}))
+        self.assertIn('type="image/webp"', html)
+        self.assertIn('.w640.webp 640w', html)
+        self.assertIn('.w800.webp 800w', html)
+        self.assertNotIn('1024w', html)
+        self.assertIn('.w800.jpg"', html)
+        self.assertIn('sizes="50vw"', html)
+        self.assertIn('alt="Cow"', html)
+
+
+class StaticImageOptimizerTests(TestCase):
+    """
+    Tests for the build-time static image optimizer and {% picture %} tag.
+    """
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        override = override_settings(STATIC_IMAGES_ROOT=self.root)
+        override.enable()
+        self.addCleanup(override.disable)
+        (self.root / 'images').mkdir()
+        self.source = self.root / 'images' / 'map.png'
+        Image.new('RGB', (1200, 800), (200, 180, 90)).save(self.source, 'PNG')
+
+    def test_builds_webp_variants(self):
+        manifest, changed = build_manifest()
+        entry = manifest['images/map.png']
+        self.assertEqual(changed, ['images/map.png'])
+        self.assertEqual([variant['width'] for variant in entry['webp']], [480, 960, 1200])
+        for variant in entry['webp']:
+            self.assertTrue((self.root / variant['path']).exists())
+
+    def test_unchanged_images_are_skipped(self):
+        build_manifest()
+        self.assertEqual(build_manifest()[1], [])
+        Image.new('RGB', (600, 400), (10, 20, 30)).save(self.source, 'PNG')
+        self.assertEqual(build_manifest()[1], ['images/map.png'])
+
+    def test_picture_tag_reads_manifest(self):
+        template = Template('{% load responsive_images %}{% picture "images/map.png" alt="Map" %}')
+        self.assertNotIn('<picture>', template.render(Context()))
+        build_manifest()
+        html = template.render(Context())
+        self.assertIn('type="image/webp"', html)
+        self.assertIn('map.w480.webp 480w', html)
+        self.assertIn('width="1200"', html)
+
+
+class AssetPipelineTests(TestCase):
+    """
+    Tests for CSS/JS bundling, minification and selector purging.
+    """
+
+    def test_minify_css_keeps_strings_and_media_queries(self):
+        css = """
+            /* header */
+            .hero   > .title , .hero-alt { content: "a  :  b"; margin : 0 auto ; }
+            @media (max-width: 768px) { .hero { padding: 0; } }
+        """
+        self.assertEqual(
+            minify_css(css),
+            '.hero>.title,.hero-alt{content:"a  :  b";margin:0 auto}'
+            '@media (max-width: 768px){.hero{padding:0}}',
+        )
+
+    def test_purge_drops_only_unmatchable_selectors(self):
+        nodes = parse_css(
+            'body{margin:0}.used,.unused{color:red}.gone{color:blue}'
+            '.badge-active{color:green}.btn:not(.missing){color:black}'
+            '@media print{.gone{display:none}}'
+        )
+        used = UsedNames(['<div class="used badge-{{ project.status }}"><a class="btn">'])
+        self.assertEqual(
+            serialize_css(purge_css(nodes, used)),
+            'body{margin:0}.used{color:red}.badge-active{color:green}.btn:not(.missing){color:black}',
+        )
+
+    def test_minify_js_preserves_literals(self):
+        js = (
+            "// comment\n"
+            "const re = /\\/\\/[a-z]+/g;  /* block */\n"
+            "const url = 'http://example.com';\n"
+            "let i = 0; i = i + +1;\n"
+        )
+        self.assertEqual(
+            minify_js(js),
+            "const re=/\\/\\/[a-z]+/g;\nconst url='http://example.com';\nlet i=0;i=i+ +1;\n",
+        )
+
+    def test_page_styles_falls_back_to_sources(self):
+        html = Template('{% load asset_bundles %}{% page_styles %}{% page_scripts %}').render(Context())
+        self.assertIn('css/styles.css', html)
+        self.assertIn('js/script.js', html)
+
+    def test_template_sources_read_through_the_configured_backend(self):
+        sources = template_sources('portfolio/home.html')
+        self.assertGreater(len(sources), 1)
+        self.assertTrue(all(isinstance(source, str) for source in sources))
+
+
+class VerifyStaticCommandTests(TestCase):
+    """
+    Tests for the verify_static size report.
+    """
+
+    def test_reports_compressed_sizes(self):
+        root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, root)
+        (root / 'site.css').write_bytes(b'x' * 1000)
+        (root / 'site.css.gz').write_bytes(b'x' * 100)
+        (root / 'site.css.br').write_bytes(b'x' * 80)
+        out = StringIO()
+        with override_settings(STATIC_ROOT=root):
+            call_command('verify_static', stdout=out)
+        self.assertRegex(out.getvalue(), r'site\.css\s+1000\s+100\s+80')
+        self.assertIn('not content-hashed', out.getvalue())
+
+
+class LanguageTests(TestCase):
+    """
+    Pages are rendered server-side in the language of their URL.
+    """
+
+    def setUp(self):
+        cache.clear()
+        with translation.override('bn-bd'):
+            self.bengali_url = reverse('portfolio:about')
+        with translation.override('en'):
+            self.english_url = reverse('portfolio:about')
+
+    def test_unprefixed_urls_render_bengali(self):
+        response = self.client.get(self.bengali_url)
+        self.assertEqual(response['Content-Language'], 'bn-bd')
+        self.assertContains(response, '<html lang="bn-bd" data-lang="bn">')
+        self.assertContains(response, 'আমাদের সম্পর্কে')
+        self.assertContains(response, f'href="{self.english_url}" hreflang="en"')
+
+    def test_english_prefix_renders_english(self):
+        self.assertEqual(self.english_url, '/en' + self.bengali_url)
+        response = self.client.get(self.english_url)
+        self.assertEqual(response['Content-Language'], 'en')
+        self.assertContains(response, '<html lang="en" data-lang="en">')
+        self.assertContains(response, 'About Us')
+        self.assertNotContains(response, 'আমাদের সম্পর্কে')
+
+    def test_each_language_is_cached_separately(self):
+        self.client.get(self.bengali_url)
+        self.client.get(self.english_url)
+        with self.assertNumQueries(0):
+            bengali = self.client.get(self.bengali_url)
+            english = self.client.get(self.english_url)
+        self.assertContains(bengali, 'আমাদের সম্পর্কে')
+        self.assertContains(english, 'About Us')
+        self.assertNotContains(english, 'আমাদের সম্পর্কে')
+
+    def test_language_cookie_redirects_unprefixed_urls(self):
+        self.client.cookies['django_language'] = 'en'
+        response = self.client.get(self.bengali_url + '?page=2')
+        self.assertRedirects(response, self.english_url + '?page=2', fetch_redirect_response=False)
+        self.assertIn('Cookie', response['Vary'])
+        self.assertEqual(self.client.get(self.english_url).status_code, 200)
+
+    def test_project_page_is_translated(self):
+        seed_portfolio(projects=1, opportunities_per_project=1, posts=0, images=0)
+        project = Project.objects.get()
+        project.crops, project.lease_years = 'Napier grass', 3
+        project.save()
+        with translation.override('en'):
+            english = self.client.get(reverse('portfolio:project_detail', kwargs={'slug': project.slug}))
+        self.assertContains(english, 'About the Project')
+        self.assertContains(english, '3 years')
+        self.assertContains(english, '60% sold')
+        # Bengali text anywhere in the page body, except the taka sign.
+        body = english.content.decode().split('<main', 1)[1].replace('৳', '')
+        self.assertIsNone(re.search('[\u0980-\u09ff]', body))
+        with translation.override('bn-bd'):
+            bengali = self.client.get(reverse('portfolio:project_detail', kwargs={'slug': project.slug}))
+        self.assertContains(bengali, 'প্রজেক্ট সম্পর্কে')
+        self.assertContains(bengali, '3 বছর')
+
+
+class KeysetPaginationTests(TestCase):
+    """
+    Tests for cursor pagination of the blog and gallery listings.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_portfolio(posts=40, images=30)
+        # Ties and NULLs in the leading ordering column.
+        posts = BlogPost.objects.filter(status='published')
+        published_at = posts.first().published_at
+        BlogPost.objects.filter(pk__in=list(posts.values_list('pk', flat=True)[:8])).update(published_at=published_at)
+        BlogPost.objects.filter(pk__in=list(posts.values_list('pk', flat=True)[10:13])).update(published_at=None)
+
+    def setUp(self):
+        cache.clear()
+
+    def walk(self, paginator):
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            pages.append(paginator.page(pages[-1].next_token))
+        return pages
+
+    def test_pages_follow_the_model_ordering(self):
+        for queryset in (BlogPost.objects.filter(status='published'), GalleryImage.objects.all()):
+            with self.subTest(model=queryset.model.__name__):
+                paginator = KeysetPaginator(queryset, 4)
+                pages = self.walk(paginator)
+                expected = list(queryset.order_by(*paginator._order_by(False)))
+                self.assertEqual([obj for page in pages for obj in page], expected)
+                self.assertFalse(pages[0].has_previous())
+
+                # Walking back yields the same pages in reverse.
+                previous = pages[-1]
+                for page in reversed(pages[:-1]):
+                    previous = paginator.page(previous.previous_token)
+                    self.assertEqual(list(previous), list(page))
+                self.assertFalse(previous.has_previous())
+
+    def test_deep_pages_cost_one_query_without_count(self):
+        url = reverse('portfolio:gallery')
+        response = self.client.get(url)
+        while response.context['page_obj'].has_next():
+            cache.clear()
+            next_url = f'{url}?cursor={response.context["page_obj"].next_token}'
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(next_url)
+            # The conditional-GET validator, then the page itself.
+            self.assertEqual(len(queries), 2)
+            self.assertNotIn('COUNT(', queries[1]['sql'].upper())
+            self.assertContains(response, 'rel="prev"')
+
+    def test_tampered_cursor_is_not_found(self):
+        response = self.client.get(reverse('portfolio:blog_list'), {'cursor': 'bogus'})
+        self.assertEqual(response.status_code, 404)
+
+
+class ExplainViewsCommandTests(TestCase):
+    """
+    Tests for the ``explain_views`` query-plan check.
+    """
+
+    def test_view_queries_use_indexes(self):
+        out = StringIO()
+        call_command('explain_views', '--fail-on-seq-scan', stdout=out)
+        self.assertIn('0 on bounded queries', out.getvalue())
+        # The synthetic dataset is rolled back.
+        self.assertFalse(BlogPost.objects.exists())
+
+    def test_flags_sequential_scans(self):
+        unindexed = [('gallery by title', GalleryImage.objects.order_by('title')[:5], False)]
+        with mock.patch('portfolio.management.commands.explain_views.view_querysets', return_value=unindexed):
+            with self.assertRaisesMessage(CommandError, 'gallery by title'):
+                call_command('explain_views', '--no-seed', '--fail-on-seq-scan', stdout=StringIO())
+
+
+class SearchTests(TestCase):
+    """
+    Tests for the full-text search index, page and admin search.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.title_match = BlogPost.objects.create(
+            title='Cattle fattening for Eid', excerpt='Seasonal programme', content='Details',
+            status='published',
+        )
+        cls.body_match = BlogPost.objects.create(
+            title='Monsoon notes', excerpt='Rain', content='<p>We moved the cattle to higher ground.</p>',
+            status='published',
+        )
+        cls.draft = BlogPost.objects.create(
+            title='Cattle draft', excerpt='Unfinished', content='Cattle', status='draft',
+        )
+        cls.project = Project.objects.create(
+            name='প্রজেক্ট আমার', location='পটুয়াখালী', acreage=20,
+            description='২০২৪ সালে শুরু হওয়া গরু মোটাতাজাকরণ প্রকল্প।',
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_title_matches_rank_first(self):
+        results = list(search(BlogPost.objects.all(), 'cattle').order_by('-search_rank'))
+        self.assertCountEqual(results[:2], [self.title_match, self.draft])
+        self.assertEqual(results[2], self.body_match)
+        self.assertEqual(search(BlogPost.objects.all(), '  ').count(), 0)
+
+    def test_bengali_words_prefixes_and_digits(self):
+        projects = Project.objects.all()
+        self.assertEqual(list(search(projects, 'মোটাতাজাকরণ')), [self.project])
+        self.assertEqual(list(search(projects, 'গরু মোটা')), [self.project])
+        self.assertEqual(list(search(projects, '2024')), [self.project])
+        self.assertEqual(list(search(projects, 'পটুয়াখালী')), [self.project])
+        self.assertFalse(search(projects, 'ছাগল').exists())
+
+    def test_index_follows_saves_and_deletes(self):
+        self.title_match.title = 'Dairy herd'
+        self.title_match.save()
+        self.assertNotIn(self.title_match, search(BlogPost.objects.all(), 'fattening'))
+        self.assertIn(self.title_match, search(BlogPost.objects.all(), 'dairy'))
+        self.body_match.delete()
+        self.assertFalse(search(BlogPost.objects.all(), 'monsoon').exists())
+
+    def test_rebuild_command_indexes_bulk_created_rows(self):
+        GalleryImage.objects.bulk_create([GalleryImage(title='Solar pump', image='gallery/pump.jpg')])
+        self.assertFalse(search(GalleryImage.objects.all(), 'solar').exists())
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertTrue(search(GalleryImage.objects.all(), 'solar').exists())
+
+    def test_search_page_lists_public_matches(self):
+        response = self.client.get(reverse('portfolio:search'), {'q': 'cattle'})
+        self.assertEqual(list(response.context['posts']), [self.title_match, self.body_match])
+        self.assertNotContains(response, 'Cattle draft')
+        self.client.get(reverse('portfolio:search'), {'q': 'anything'})
+        self.assertFalse([key for key in cache._cache if 'portfolio:page' in key])
+
+    def test_admin_search_uses_index(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin:portfolio_blogpost_changelist'), {'q': 'cattle'})
+        self.assertEqual(response.context['cl'].result_count, 3)
+        self.assertTrue(any('blogpost_search' in query['sql'] for query in queries.captured_queries))
+
+
+class ReadAPITests(TestCase):
+    """
+    Tests for the read-only JSON API.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_portfolio(posts=30)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_sparse_fieldsets(self):
+        response = self.client.get(reverse('api:project-list'), {'fields': 'slug,name'})
+        self.assertEqual(set(response.json()['results'][0]), {'slug', 'name'})
+        response = self.client.get(reverse('api:project-list'), {'fields': 'slug,secret'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_pagination_walks_published_posts(self):
+        url = reverse('api:post-list') + '?fields=slug'
+        slugs = []
+        while url:
+            payload = self.client.get(url).json()
+            slugs += [post['slug'] for post in payload['results']]
+            url = payload['next']
+        expected = BlogPost.objects.filter(status='published').values_list('slug', flat=True)
+        self.assertEqual(slugs, list(expected.order_by('-published_at', '-created_at', '-id')))
+
+    def test_conditional_get_and_cached_payload(self):
+        url = reverse('api:opportunity-list')
+        response = self.client.get(url)
+        etag = response['ETag']
+
+        with CaptureQueriesContext(connection) as queries:
+            cached = self.client.get(url)
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(cached.json(), response.json())
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], etag)
+
+        opportunity = InvestmentOpportunity.objects.first()
+        opportunity.available_shares = 10
+        opportunity.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_detail_validators(self):
+        post = BlogPost.objects.filter(status='published').first()
+        url = reverse('api:post-detail', kwargs={'slug': post.slug})
+        response = self.client.get(url)
+        self.assertEqual(response.json()['title'], post.title)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+        draft = BlogPost.objects.filter(status='draft').first()
+        response = self.client.get(reverse('api:post-detail', kwargs={'slug': draft.slug}))
+        self.assertEqual(response.status_code, 404)
+
+
+class ConditionalGetTests(TestCase):
+    """
+    Tests for ETag validation of the public pages.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_portfolio()
+        cls.project = Project.objects.first()
+        cls.url = reverse('portfolio:project_detail', kwargs={'slug': cls.project.slug})
+
+    def setUp(self):
+        cache.clear()
+
+    def test_unchanged_page_is_not_rendered(self):
+        etag = self.client.get(self.url)['ETag']
+        bump_version(Project)  # Drop the cached copy of the page.
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(len(queries), 1)
+        self.assertFalse(response.templates)
+
+    def test_cached_page_answers_without_queries(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_related_changes_invalidate_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        opportunity = self.project.investment_opportunities.first()
+        opportunity.available_shares = 1
+        opportunity.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        etag = self.client.get(self.url)['ETag']
+        opportunity.delete()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_each_language_has_its_own_etag(self):
+        with translation.override('en'):
+            english = reverse('portfolio:blog_list')
+        with translation.override('bn-bd'):
+            bengali = reverse('portfolio:blog_list')
+        self.assertNotEqual(self.client.get(english)['ETag'], self.client.get(bengali)['ETag'])
+
+
+class PrerenderTests(TestCase):
+    """
+    Tests for the static export of the public pages.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_portfolio(posts=20)
+
+    def setUp(self):
+        cache.clear()
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        override = override_settings(PRERENDER_ROOT=str(self.root))
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_exports_every_public_page(self):
+        call_command('prerender_site', stdout=StringIO())
+        for path in ('index.html', 'en/index.html', 'about/index.html', 'projects/__page/1/index.html'):
+            self.assertTrue((self.root / path).is_file(), path)
+        for post in BlogPost.objects.all():
+            self.assertEqual((self.root / 'blog' / post.slug).exists(), post.status == 'published')
+        self.assertFalse((self.root / 'contact').exists())
+        self.assertFalse((self.root / 'search').exists())
+
+        # Every pagination link of the exported pages has a file to serve.
+        pages = list(self.root.glob('blog/**/index.html'))
+        links = {token for page in pages for token in re.findall(r'\?cursor=([\w:-]+)', page.read_text())}
+        self.assertTrue(links)
+        for token in links:
+            self.assertTrue((self.root / 'blog' / '__cursor' / token / 'index.html').is_file())
+
+    def test_saves_queue_affected_pages(self):
+        call_command('prerender_site', stdout=StringIO())
+        post = BlogPost.objects.filter(status='published').first()
+        detail = self.root / 'blog' / post.slug / 'index.html'
+        with self.captureOnCommitCallbacks(execute=True):
+            post.title = 'Fresh title'
+            post.save()
+        # Left to Django until the queue is rendered.
+        self.assertFalse(detail.exists())
+        self.assertFalse((self.root / 'index.html').exists())
+        self.assertTrue((self.root / 'team' / 'index.html').is_file())
+
+        call_command('prerender_site', pending=True, stdout=StringIO())
+        self.assertIn('Fresh title', detail.read_text())
+        self.assertTrue((self.root / 'index.html').is_file())
+        self.assertFalse(PendingPrerender.objects.exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post.status = 'draft'
+            post.save()
+        self.assertFalse((self.root / 'blog' / post.slug).exists())
+
+    def test_htaccess_rules_are_replaced_in_place(self):
+        htaccess = self.root / '.htaccess'
+        htaccess.write_text('PassengerAppRoot "/home/site"\n')
+        install_htaccess(htaccess)
+        install_htaccess(htaccess)
+        content = htaccess.read_text()
+        self.assertEqual(content.count('BEGIN portfolio prerendered pages'), 1)
+        self.assertTrue(content.endswith('PassengerAppRoot "/home/site"\n'))
+
+
+class ShareReservationTests(TestCase):
+    """
+    Tests for reserving, expiring and confirming investment shares.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_portfolio(projects=1, opportunities_per_project=1, posts=0, images=0)
+
+    def setUp(self):
+        cache.clear()
+        self.opportunity = InvestmentOpportunity.objects.get()
+        self.opportunity.available_shares = 10
+        self.opportunity.save()
+        self.url = reverse('api:opportunity-reservations', kwargs={'slug': self.opportunity.slug})
+
+    def test_reserve_until_sold_out(self):
+        response = self.client.post(self.url, {'shares': 7, 'name': 'Rahim', 'email': 'rahim@example.com'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['status'], 'held')
+        self.opportunity.refresh_from_db()
+        self.assertEqual(self.opportunity.available_shares, 3)
+
+        response = self.client.post(self.url, {'shares': 4, 'name': 'Karim', 'email': 'karim@example.com'})
+        self.assertEqual(response.status_code, 409)
+        response = self.client.post(self.url, {'shares': 0, 'name': 'Karim', 'email': 'karim@example.com'})
+        self.assertEqual(response.status_code, 400)
+        self.opportunity.refresh_from_db()
+        self.assertEqual(self.opportunity.available_shares, 3)
+        self.assertEqual(ShareReservation.objects.count(), 1)
+
+    def test_anonymous_reservations_are_limited(self):
+        self.opportunity.available_shares = 100
+        self.opportunity.save()
+        data = {'shares': 21, 'name': 'Rahim', 'email': 'rahim@example.com'}
+        self.assertEqual(self.client.post(self.url, data).status_code, 400)
+        for _ in range(2):
+            self.assertEqual(self.client.post(self.url, {**data, 'shares': 20}).status_code, 201)
+        response = self.client.post(self.url, {**data, 'shares': 1, 'email': 'RAHIM@example.com'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('email', response.json())
+
+        with mock.patch.object(ReservationRateThrottle, 'THROTTLE_RATES', {'reservations': '4/hour'}):
+            response = self.client.post(self.url, {**data, 'shares': 1, 'email': 'karim@example.com'})
+        self.assertEqual(response.status_code, 429)
+
+    def test_sweeper_refreshes_cached_pages(self):
+        publish_availability()
+        self.client.get(reverse('portfolio:investment'))
+        reserve_shares(self.opportunity, 4, name='Rahim', email='rahim@example.com')
+        with self.assertNumQueries(0):
+            self.client.get(reverse('portfolio:investment'))
+
+        later = timezone.now() + timezone.timedelta(minutes=5)
+        self.assertEqual(publish_availability(now=later), 1)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('portfolio:investment'))
+        self.assertGreater(len(queries), 0)
+        self.assertEqual(publish_availability(now=later + timezone.timedelta(minutes=5)), 0)
+
+    def test_expired_holds_return_their_shares(self):
+        expired = reserve_shares(self.opportunity, 4, name='Rahim', email='rahim@example.com')
+        confirmed = reserve_shares(self.opportunity, 5, name='Karim', email='karim@example.com')
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        self.client.post(reverse('admin:portfolio_sharereservation_changelist'), {
+            'action': 'confirm', '_selected_action': [confirmed.pk],
+        })
+
+        later = timezone.now() + timezone.timedelta(days=1)
+        self.assertEqual(expire_reservations(now=later), 1)
+        self.assertEqual(expire_reservations(now=later), 0)
+        self.opportunity.refresh_from_db()
+        self.assertEqual(self.opportunity.available_shares, 5)
+        statuses = dict(ShareReservation.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses, {expired.pk: 'expired', confirmed.pk: 'confirmed'})
+
+    def test_admin_edits_keep_concurrent_reservations(self):
+        stale = InvestmentOpportunity.objects.get()
+        reserve_shares(self.opportunity, 4, name='Rahim', email='rahim@example.com')
+        stale.title = 'Renamed'
+        model_admin = site._registry[InvestmentOpportunity]
+        self.assertIn('available_shares', model_admin.get_readonly_fields(None, stale))
+        model_admin.save_model(None, stale, None, change=True)
+        self.opportunity.refresh_from_db()
+        self.assertEqual((self.opportunity.title, self.opportunity.available_shares), ('Renamed', 6))
+
+
+class ConcurrentReservationTests(TransactionTestCase):
+    """
+    Concurrent reservations never sell more shares than are available.
+    """
+
+    def test_load_test_finds_no_oversell(self):
+        out = StringIO()
+        call_command(
+            'reservation_load_test', requests=40, threads=8, shares=3, available=30, stdout=out,
+        )
+        self.assertIn('reserved 10, rejected 30, failed 0', out.getvalue())
+        self.assertFalse(Project.objects.exists())
+
+
+class FundingTests(TestCase):
+    """
+    Tests for the database-side funding figures and project summaries.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_portfolio(projects=2, posts=0, images=0)
+
+    def setUp(self):
+        cache.clear()
+        self.project, self.other = Project.objects.order_by('order')
+
+    def test_summary_follows_opportunity_changes(self):
+        funding = ProjectFunding.objects.get(project=self.project)
+        self.assertEqual((funding.opportunities, funding.total_shares, funding.shares_sold), (3, 300, 180))
+        self.assertEqual(funding.capital_raised, 180 * 5000)
+        self.assertEqual(funding.funded_percent, 60)
+
+        opportunity = self.project.investment_opportunities.first()
+        reserve_shares(opportunity, 40, name='Rahim', email='rahim@example.com')
+        funding = ProjectFunding.objects.get(project=self.project)
+        self.assertEqual((funding.shares_sold, funding.funded_percent), (220, Decimal('73.33')))
+        self.assertEqual(funding.capital_raised, 220 * 5000)
+        opportunity.refresh_from_db()
+        opportunity.project = self.other
+        opportunity.save()
+        self.assertEqual(ProjectFunding.objects.get(project=self.project).shares_sold, 120)
+        self.assertEqual(ProjectFunding.objects.get(project=self.other).shares_sold, 280)
+
+        opportunity.delete()
+        self.assertEqual(ProjectFunding.objects.get(project=self.other).opportunities, 3)
+        self.other.delete()
+        self.assertFalse(ProjectFunding.objects.filter(project_id=self.other.pk).exists())
+
+    def test_refresh_all_repairs_bulk_updates(self):
+        InvestmentOpportunity.objects.filter(project=self.project).update(available_shares=0)
+        self.assertEqual(refresh_all_funding(), 2)
+        self.assertEqual(ProjectFunding.objects.get(project=self.project).funded_percent, 100)
+
+    def test_sort_and_filter_in_sql(self):
+        InvestmentOpportunity.objects.filter(title='Opportunity 1-2').update(available_shares=100)
+        opportunities = InvestmentOpportunity.objects.with_funding()
+        self.assertEqual(opportunities.order_by('funded_percent').first().title, 'Opportunity 1-2')
+        self.assertEqual(opportunities.filter(funded_percent__gt=50).count(), 5)
+
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        response = self.client.get(reverse('admin:portfolio_investmentopportunity_changelist'), {'funding': 'none'})
+        self.assertEqual([o.title for o in response.context['cl'].result_list], ['Opportunity 1-2'])
+        response = self.client.get(reverse('admin:portfolio_project_changelist'), {'o': '5'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_investment_page_reads_funding_with_opportunities(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('portfolio:investment'))
+        self.assertEqual(len(queries), 2)
+        self.assertContains(response, 'Project 0 প্রজেক্টের 60% অর্থায়ন সম্পন্ন', count=3)
+
+    def test_investment_page_follows_project_changes(self):
+        url = reverse('portfolio:investment')
+        etag = self.client.get(url)['ETag']
+        self.project.name = 'Renamed farm'
+        self.project.save()
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Renamed farm')
+
+
+class CountingEmailBackend(EmailBackend):
+    opened = 0
+    fail_for = ()
+
+    def open(self):
+        CountingEmailBackend.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        if any(message.to[0] in self.fail_for for message in messages):
+            raise ConnectionResetError('Connection reset by peer')
+        return super().send_messages(messages)
+
+
+class ContactOutboxTests(TestCase):
+    """
+    Tests for the contact form and the email outbox.
+    """
+
+    def test_submission_is_queued_not_sent(self):
+        response = self.client.post(reverse('portfolio:contact'), {
+            'name': 'Rahim', 'email': 'rahim@example.com', 'subject': 'Eid fattening',
+            'message': 'How do I invest?',
+        })
+        self.assertRedirects(response, reverse('portfolio:contact'))
+        self.assertEqual(ContactSubmission.objects.get().subject, 'Eid fattening')
+        self.assertEqual(len(mail.outbox), 0)
+
+        call_command('send_outbox', stdout=StringIO())
+        message, = mail.outbox
+        self.assertEqual(message.reply_to, ['rahim@example.com'])
+        self.assertIn('How do I invest?', message.body)
+        self.assertEqual(OutboxEmail.objects.get().status, 'sent')
+
+    def test_line_breaks_in_the_subject_are_removed(self):
+        enqueue('Eid\r\nBcc: victim@example.com', 'Body', ['rahim@example.com'])
+        self.assertEqual(drain(), (1, 0))
+        self.assertEqual(mail.outbox[0].subject, 'Eid Bcc: victim@example.com')
+
+    def test_invalid_submission_is_shown_again(self):
+        response = self.client.post(reverse('portfolio:contact'), {'name': 'Rahim', 'email': 'not an email'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'value="Rahim"')
+        self.assertFalse(ContactSubmission.objects.exists())
+        self.assertFalse(OutboxEmail.objects.exists())
+
+    def test_batches_share_a_connection_and_failures_back_off(self):
+        for i in range(5):
+            enqueue(f'Message {i}', 'Body', [f'user{i}@example.com'])
+        CountingEmailBackend.opened = 0
+        backend = CountingEmailBackend()
+        backend.fail_for = {'user3@example.com'}
+        self.assertEqual(drain(batch_size=2, connection=backend), (4, 1))
+        self.assertEqual(CountingEmailBackend.opened, 3)
+
+        failed = OutboxEmail.objects.get(status='pending')
+        self.assertEqual(failed.attempts, 1)
+        self.assertIn('ConnectionResetError', failed.last_error)
+        self.assertGreater(failed.next_attempt_at, timezone.now())
+        self.assertEqual(drain(connection=backend), (0, 0))
+
+        with override_settings(OUTBOX_MAX_ATTEMPTS=2):
+            deliver([failed], connection=backend)
+        self.assertEqual(OutboxEmail.objects.get(pk=failed.pk).status, 'failed')
+
+
+@override_settings(ROOT_URLCONF='hawladar_agro.urls_asgi')
+class AsyncViewTests(TestCase):
+    """
+    Tests for the async views served over ASGI.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_portfolio()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_async_views_are_routed(self):
+        for name in ('home', 'about', 'investment'):
+            self.assertTrue(resolve(reverse(f'portfolio:{name}')).func.__module__.endswith('async_views'))
+        self.assertEqual(resolve(reverse('portfolio:team_list')).url_name, 'team_list')
+
+    def test_pages_match_the_sync_views_within_budget(self):
+        get = async_to_sync(self.async_client.get)
+        for name in ('home', 'about', 'investment'):
+            url = reverse(f'portfolio:{name}')
+            with CaptureQueriesContext(connection) as queries:
+                response = get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(queries), get_query_budget(resolve(url).func))
+
+            # Drop the cached page, keeping the release the ETag is built on.
+            bump_version(PAGES[name][0])
+            not_modified = get(url, headers={'If-None-Match': response['ETag']})
+            self.assertEqual(not_modified.status_code, 304)
+
+            bump_version(PAGES[name][0])
+            with override_settings(ROOT_URLCONF='hawladar_agro.urls'):
+                expected = self.client.get(url)
+            self.assertEqual(response.content, expected.content)
+            self.assertEqual(response['ETag'], expected['ETag'])
+
+    def test_middleware_is_async_capable(self):
+        for path in settings.MIDDLEWARE:
+            self.assertTrue(getattr(import_string(path), 'async_capable', False), path)
+
+
+class WarmupTests(TestCase):
+    """
+    Tests for the worker warm-up and the start-up profiler.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_portfolio()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_warm_up_fills_template_and_page_caches(self):
+        timings = {name: result for name, result, _ in warm_up()}
+        self.assertGreater(timings['urls'], 0)
+        self.assertGreaterEqual(timings['templates'], len(list(Path(__file__).parent.glob('templates/portfolio/*.html'))))
+        self.assertEqual(timings['caches'], 14)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('portfolio:home'), secure=True, HTTP_HOST='localhost')
+        self.assertEqual(len(queries), 0)
+
+    def test_failing_step_does_not_stop_start_up(self):
+        steps = [('broken', mock.Mock(side_effect=OSError)), ('urls', mock.Mock(return_value=1))]
+        with mock.patch('portfolio.warmup.STEPS', steps), self.assertLogs('portfolio.warmup', 'ERROR'):
+            self.assertEqual([(name, result) for name, result, _ in warm_up()], [('broken', None), ('urls', 1)])
+
+    def test_startup_profile(self):
+        out = StringIO()
+        call_command('startup_profile', top=3, stdout=out)
+        output = out.getvalue()
+        for step in ('app portfolio: ready', 'url resolver', 'templates', 'Imports by package'):
+            self.assertIn(step, output)
+
+
+
+class BenchmarkTests(TestCase):
+    """
+    Tests for the synthetic dataset and the per-route benchmark.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def test_generate_sample_data_refuses_to_duplicate_and_replaces(self):
+        options = {'projects': 3, 'posts': 5, 'images': 4, 'team_members': 2, 'media_appearances': 2, 'stdout': StringIO()}
+        call_command('generate_sample_data', **options)
+        self.assertEqual(Project.objects.count(), 3)
+        self.assertEqual(ProjectFunding.objects.count(), 3)
+        with self.assertRaises(CommandError):
+            call_command('generate_sample_data', **options)
+
+        Project.objects.create(name='Real project', location='Patuakhali', acreage=5, description='Cattle')
+        call_command('generate_sample_data', replace=True, **{**options, 'projects': 2})
+        self.assertEqual(Project.objects.count(), 3)
+        self.assertEqual(BlogPost.objects.count(), 5)
+
+        call_command('generate_sample_data', delete=True, stdout=StringIO())
+        self.assertEqual(list(Project.objects.values_list('name', flat=True)), ['Real project'])
+        self.assertFalse(GalleryImage.objects.exists())
+
+    def test_benchmark_urls_covers_every_route_and_compares(self):
+        seed_portfolio()
+        first = Path(tempfile.mkdtemp()) / 'first.json'
+        self.addCleanup(shutil.rmtree, first.parent)
+        call_command('benchmark_urls', iterations=2, output=str(first), stdout=StringIO())
+        results = json.loads(first.read_text())
+        self.assertEqual(results['cache'], 'cold')
+        self.assertEqual(set(results['routes']), {pattern.name for pattern in portfolio_urls.urlpatterns})
+        for name, result in results['routes'].items():
+            self.assertEqual(result['status'], [200], name)
+            self.assertLessEqual(result['queries'], get_query_budget(resolve(result['path'].split('?')[0]).func), name)
+            self.assertGreater(result['bytes'], 0)
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+
+        out = StringIO()
+        call_command('benchmark_urls', iterations=2, warm=True, route=['home'], compare=str(first), stdout=out)
+        self.assertIn('queries -7', out.getvalue())
+
+
+class ContentImportTests(TestCase):
+    """
+    Tests for unique slugs and the bulk content import.
+    """
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_bengali_titles_get_unique_transliterated_slugs(self):
+        self.assertEqual(transliterate('গরু মোটাতাজাকরণ'), 'goru motatajakoron')
+        self.assertEqual(transliterate('পটুয়াখালী ২০২৪'), 'potuyakhali 2024')
+        first = BlogPost.objects.create(title='গরু মোটাতাজাকরণ', excerpt='Excerpt', content='Content')
+        second = BlogPost.objects.create(title='গরু মোটাতাজাকরণ', excerpt='Excerpt', content='Content')
+        third = BlogPost.objects.create(title='!!!', excerpt='Excerpt', content='Content')
+        self.assertEqual([first.slug, second.slug, third.slug], ['goru-motatajakoron', 'goru-motatajakoron-2', 'blogpost'])
+
+    def test_json_is_streamed_from_arrays_and_json_lines(self):
+        rows = [{'title': f'Post {i}', 'content': '{"nested": [1, 2]}'} for i in range(5)]
+        self.assertEqual(list(iter_json(StringIO(json.dumps(rows)), read_size=7)), rows)
+        lines = '\n'.join(json.dumps(row) for row in rows)
+        self.assertEqual(list(iter_json(StringIO(lines), read_size=7)), rows)
+        with self.assertRaises(ValueError):
+            list(iter_json(StringIO(json.dumps(rows)[:-1]), read_size=7))
+
+    def test_import_inserts_chunks_in_bulk(self):
+        BlogPost.objects.create(title='Eid', excerpt='Excerpt', content='Content')
+        rows = [{'title': 'Eid', 'excerpt': 'Excerpt', 'content': 'Cattle', 'status': 'published'} for _ in range(10)]
+        rows.insert(3, {'title': 'Broken', 'excerpt': 'Excerpt', 'content': 'Content', 'status': 'lost'})
+        with CaptureQueriesContext(connection) as queries:
+            result = ContentImporter(BlogPost, chunk_size=5).run(rows)
+        self.assertEqual(result.created, 10)
+        self.assertEqual([number for number, _ in result.errors], [4])
+        # Per chunk: slugs, insert and search documents in a savepoint;
+        # then the cache version.
+        self.assertLess(len(queries), 3 * 5 + 10 + 2)
+        slugs = set(BlogPost.objects.values_list('slug', flat=True))
+        self.assertEqual(slugs, {'eid', *(f'eid-{n}' for n in range(2, 12))})
+        self.assertFalse(BlogPost.objects.filter(status='published', published_at=None).exists())
+        self.assertEqual(search(BlogPost.objects.all(), 'cattle').count(), 10)
+
+    def test_import_queues_the_static_export(self):
+        root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, root)
+        with override_settings(PRERENDER_ROOT=str(root)):
+            call_command('prerender_site', page=['blog_list'], stdout=StringIO())
+            with self.captureOnCommitCallbacks(execute=True):
+                ContentImporter(BlogPost).run([{'title': 'Eid', 'excerpt': 'Excerpt', 'content': 'Cattle', 'status': 'published'}])
+            self.assertFalse((root / 'blog' / 'index.html').exists())
+            self.assertEqual(
+                set(PendingPrerender.objects.values_list('page', 'object_id')),
+                {('home', None), ('blog_list', None), ('blog_detail', None)},
+            )
+
+    def test_import_csv_with_projects_and_images(self):
+        project = Project.objects.create(name='Patuakhali', location='Patuakhali', acreage=10, description='Cattle')
+        images = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, images)
+        Image.new('RGB', (800, 600), (40, 120, 60)).save(images / 'cow.jpg')
+
+        out = StringIO()
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as handle:
+            handle.write(
+                'title,description,total_shares,available_shares,price_per_share,project,minimum_investment\n'
+                f'ঈদ,Eid fattening,100,100,5000,{project.slug},\n'
+                'Lost,Nowhere,10,10,100,missing,\n'
+            )
+        self.addCleanup(Path(handle.name).unlink)
+        call_command('import_content', 'opportunities', handle.name, stdout=out, stderr=StringIO())
+        self.assertIn('Imported 1 Investment Opportunities; 1 rows skipped.', out.getvalue())
+        opportunity = InvestmentOpportunity.objects.get()
+        self.assertEqual((opportunity.slug, opportunity.project, opportunity.minimum_investment), ('id', project, None))
+        self.assertEqual(ProjectFunding.objects.get(project=project).opportunities, 1)
+
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as handle:
+            handle.write('title,image,category\nCow,cow.jpg,cattle\n')
+        self.addCleanup(Path(handle.name).unlink)
+        call_command('import_content', 'gallery', handle.name, images=str(images), stdout=StringIO())
+        image = GalleryImage.objects.get()
+        self.assertEqual(image.image.name, 'gallery/cow.jpg')
+        self.assertTrue(image.image.storage.exists(derivative_name(image.image.name, 640, 'webp')))
+
+
+
+class ServerTimingTests(TestCase):
+    """
+    Tests for the Server-Timing header and the per-request records.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_portfolio()
+
+    def setUp(self):
+        cache.clear()
+
+    def records(self, get, url):
+        with self.assertLogs('portfolio.performance', 'INFO') as logs, CaptureQueriesContext(connection) as queries:
+            response = get(url)
+        return response, [record.fields for record in logs.records], len(queries)
+
+    def test_header_and_record(self):
+        url = reverse('portfolio:blog_detail', args=[BlogPost.objects.filter(status='published').first().slug])
+        response, records, queries = self.records(self.client.get, url)
+        metrics = dict(re.findall(r'(\w+);dur=([\d.]+)', response['Server-Timing']))
+        self.assertEqual(set(metrics), {'db', 'checkout', 'render', 'cache', 'total'})
+        self.assertIn(f'desc="{queries} queries"', response['Server-Timing'])
+
+        [record] = records
+        self.assertEqual(record['url_name'], 'portfolio:blog_detail')
+        self.assertEqual((record['status'], record['queries']), (200, queries))
+        self.assertIn('SELECT', record['slowest_sql'])
+        self.assertGreater(record['render'], 0)
+        self.assertGreater(record['cache_calls'], 0)
+        self.assertGreaterEqual(record['total'], record['render'])
+
+        # Served from the page cache: no queries and nothing rendered.
+        _, [record], _ = self.records(self.client.get, url)
+        self.assertEqual((record['queries'], record['render'], record['slowest_sql']), (0, 0, ''))
+
+    @override_settings(ROOT_URLCONF='hawladar_agro.urls_asgi')
+    def test_async_views_are_timed(self):
+        _, [record], queries = self.records(async_to_sync(self.async_client.get), reverse('portfolio:home'))
+        self.assertEqual(record['url_name'], 'portfolio:home')
+        self.assertEqual(record['queries'], queries)
+        self.assertGreater(record['render'], 0)
+
+    def test_sampling(self):
+        with override_settings(SERVER_TIMING_SAMPLE_RATE=0):
+            self.assertNotIn('Server-Timing', self.client.get(reverse('portfolio:about')))
+        with override_settings(SERVER_TIMING_SAMPLE_RATE=0.5), mock.patch('random.random', side_effect=[0.7, 0.2]):
+            self.assertNotIn('Server-Timing', self.client_class().get(reverse('portfolio:about')))
+            self.assertIn('Server-Timing', self.client_class().get(reverse('portfolio:about')))
+
+
+class QueuedLoggingTests(TestCase):
+    """
+    Tests for logging through queues and the JSON access log.
+    """
+
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def configure(self):
+        configure_logging({
+            'version': 1,
+            'disable_existing_loggers': False,
+            'formatters': {'json': {'()': 'portfolio.log.JsonFormatter'}},
+            'handlers': {
+                'file': {
+                    'class': 'logging.handlers.RotatingFileHandler', 'formatter': 'json',
+                    'filename': self.directory / 'test.log', 'maxBytes': 300, 'backupCount': 2,
+                },
+                'queue': {'()': 'portfolio.log.QueueHandler', 'handlers': ['file']},
+            },
+            'loggers': {'portfolio.queued': {'handlers': ['queue'], 'level': 'INFO', 'propagate': False}},
+        })
+        logger = logging.getLogger('portfolio.queued')
+        [handler] = logger.handlers
+        self.addCleanup(setattr, logger, 'handlers', [])
+        self.addCleanup(handler.close)
+        return logger, handler
+
+    def test_records_are_written_by_the_listener_and_rotated(self):
+        logger, handler = self.configure()
+        self.assertTrue(handler.listener._thread.is_alive())
+        for i in range(10):
+            logger.info('Record %d', i, extra={'fields': {'n': i}} if i % 2 else {})
+        handler.close()
+
+        lines = [
+            json.loads(line)
+            for path in sorted(self.directory.iterdir(), reverse=True)
+            for line in path.read_text().splitlines()
+        ]
+        # Three files of at most 300 bytes hold the latest records, in order.
+        self.assertEqual(sorted(path.name for path in self.directory.iterdir()), ['test.log', 'test.log.1', 'test.log.2'])
+        numbers = [line['n'] if 'n' in line else int(line['message'].split()[1]) for line in lines]
+        self.assertEqual(numbers, list(range(10 - len(numbers), 10)))
+        self.assertEqual(lines[-2]['message'], 'Record 8')
+
+    def test_message_and_exception_are_formatted_before_queueing(self):
+        logger, handler = self.configure()
+        values = ['before']
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            logger.exception('Values: %s', values)
+        values.append('after')
+        handler.close()
+        [line] = (self.directory / 'test.log').read_text().splitlines()
+        record = json.loads(line)
+        self.assertEqual(record['message'], "Values: ['before']")
+        self.assertIn('ZeroDivisionError', record['exception'])
+
+    def test_access_log(self):
+        with self.assertLogs('portfolio.access', 'INFO') as logs:
+            self.client.get(reverse('portfolio:about'))
+        [record] = logs.records
+        self.assertEqual(
+            {key: record.fields[key] for key in ('method', 'path', 'status', 'view')},
+            {'method': 'GET', 'path': reverse('portfolio:about'), 'status': 200, 'view': 'portfolio:about'},
+        )
+        self.assertEqual(json.loads(JsonFormatter().format(record))['bytes'], record.fields['bytes'])
+
+    def test_benchmark_logging(self):
+        out = StringIO()
+        call_command('benchmark_logging', requests=5, burst=1, stdout=out)
+        self.assertEqual([line.split()[0] for line in out.getvalue().splitlines()], ['off', 'sync', 'queued'])
+
+
+class PooledSQLiteWrapper(PooledConnectionMixin, SQLiteDatabaseWrapper):
+    def close(self):
+        # SQLite ignores closing an in-memory database, as the test one is.
+        BaseDatabaseWrapper.close(self)
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTests(TestCase):
+    """
+    Tests for the connection pool and the connection-timing backend.
+    """
+
+    def test_pool_caps_and_reuses_connections(self):
+        pool = ConnectionPool(max_size=2, timeout=0.05)
+        first, second = pool.get(FakeConnection), pool.get(FakeConnection)
+        with self.assertRaises(PoolTimeout):
+            pool.get(FakeConnection)
+        pool.put(first)
+        self.assertIs(pool.get(FakeConnection), first)
+        self.assertEqual((pool.opened, pool.size), (2, 2))
+        pool.put(first)
+        pool.put(second)
+        pool.close()
+        self.assertTrue(first.closed and second.closed)
+
+    def test_pool_replaces_broken_and_old_connections(self):
+        pool = ConnectionPool(max_size=1, check_after=0, check=lambda connection: False)
+        broken = pool.get(FakeConnection)
+        pool.put(broken)
+        self.assertIsNot(pool.get(FakeConnection), broken)
+        self.assertTrue(broken.closed)
+
+        pool = ConnectionPool(max_size=1, max_lifetime=0)
+        old = pool.get(FakeConnection)
+        pool.put(old)
+        self.assertIsNot(pool.get(FakeConnection), old)
+
+        pool = ConnectionPool(max_size=1, reset=lambda connection: False)
+        dirty = pool.get(FakeConnection)
+        pool.put(dirty)
+        self.assertTrue(dirty.closed)
+        self.assertEqual(pool.idle, 0)
+
+    def test_backend_returns_connections_to_the_pool_and_times_checkouts(self):
+        self.addCleanup(close_pools)
+        settings_dict = {**connection.settings_dict, 'POOL': {'MAX_SIZE': 1, 'TIMEOUT': 0.05}}
+        first = PooledSQLiteWrapper(settings_dict, alias='pooled')
+        with recording() as timings:
+            first.ensure_connection()
+        self.assertEqual(timings.checkouts, 1)
+        raw = first.connection
+        first.close()
+
+        second = PooledSQLiteWrapper(settings_dict, alias='pooled')
+        second.ensure_connection()
+        self.assertIs(second.connection, raw)
+        with second.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        with self.assertRaises(OperationalError):
+            PooledSQLiteWrapper(settings_dict, alias='pooled').ensure_connection()
+        second.close()
+
+
+
+class StatelessPageTests(TestCase):
+    """
+    GETs for public pages skip the session, CSRF, auth and messages
+    middleware; forms, POSTs and the admin keep them.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_portfolio(projects=1, posts=2, images=1)
+        cls.editor = User.objects.create_superuser('editor', 'editor@example.com', 'password')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_public_pages_ignore_the_session(self):
+        self.client.force_login(self.editor)
+        self.client.cookies['messages'] = 'stale'
+        urls = [
+            reverse('portfolio:home'), reverse('portfolio:project_list'),
+            reverse('portfolio:project_detail', args=[Project.objects.get().slug]), reverse('portfolio:blog_list'),
+            reverse('portfolio:about'), reverse('portfolio:search') + '?q=cattle',
+        ]
+        for url in urls:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            self.assertFalse(response.cookies, url)
+            self.assertNotIn('Cookie', response.get('Vary', ''), url)
+            self.assertFalse([q for q in queries if 'django_session' in q['sql']], url)
+            self.assertFalse(hasattr(response.wsgi_request, 'session'), url)
+
+        response = async_to_sync(self.async_client.get)(reverse('portfolio:home'))
+        self.assertFalse(response.cookies)
+
+    def test_contact_keeps_csrf_and_messages(self):
+        client = self.client_class(enforce_csrf_checks=True)
+        url = reverse('portfolio:contact')
+        response = client.get(url)
+        self.assertIn('csrftoken', response.cookies)
+        self.assertIn('Cookie', response['Vary'])
+
+        data = {'name': 'Rahim', 'email': 'rahim@example.com', 'subject': 'Visit', 'message': 'When?'}
+        self.assertEqual(client.post(url, data).status_code, 403)
+        response = client.post(url, {**data, 'csrfmiddlewaretoken': client.cookies['csrftoken'].value}, follow=True)
+        self.assertContains(response, 'form-message-success')
+
+    def test_posts_and_the_admin_keep_the_full_chain(self):
+        client = self.client_class(enforce_csrf_checks=True)
+        self.assertEqual(client.post(reverse('portfolio:about')).status_code, 403)
+
+        self.client.force_login(self.editor)
+        response = self.client.get(reverse('admin:index'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['user'], self.editor)
+
+    def test_check_requires_the_stateful_middleware(self):
+        self.assertEqual(check_stateful_middleware(None), [])
+        stateful = [path for path in settings.STATEFUL_MIDDLEWARE if 'csrf' not in path]
+        with override_settings(STATEFUL_MIDDLEWARE=stateful):
+            self.assertEqual([error.id for error in check_stateful_middleware(None)], ['portfolio.E002'])
+
+
+class FakePurgeEndpoint(ThreadingHTTPServer):
+    """
+    A local stand-in for a proxy's purge API, recording the keys it is sent.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            self.server.purges.append((self.headers.get('Surrogate-Key'), body))
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), self.Handler)
+        self.purges = []
+        self.url = f'http://127.0.0.1:{self.server_address[1]}/purge'
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def keys(self):
+        return [set(header.split()) for header, _ in self.purges]
+
+
+class EdgeCacheTests(TestCase):
+    """
+    Public pages carry cache headers and surrogate keys, and saves purge
+    those keys from the reverse proxy.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_portfolio(projects=2, posts=2, images=1)
+
+    def setUp(self):
+        cache.clear()
+        self.endpoint = FakePurgeEndpoint()
+        self.addCleanup(self.endpoint.server_close)
+        self.addCleanup(self.endpoint.shutdown)
+        override = override_settings(EDGE_PURGER={
+            'BACKEND': 'portfolio.edge.HttpPurger', 'OPTIONS': {'url': self.endpoint.url},
+        })
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_pages_carry_cache_headers_and_keys(self):
+        project = Project.objects.first()
+        detail = reverse('portfolio:project_detail', args=[project.slug])
+        for _ in range(2):
+            # Rendered, then served from the page cache.
+            response = self.client.get(detail)
+            self.assertEqual(
+                set(response['Surrogate-Key'].split()),
+                {f'project-{project.pk}', 'project-all', 'opportunity-all'},
+            )
+            self.assertEqual(response['Cache-Control'], 'public, max-age=0')
+            self.assertEqual(response['Surrogate-Control'], f'max-age={settings.EDGE_CACHE_MAX_AGE}')
+            self.assertNotIn('Accept-Language', response.get('Vary', ''))
+
+        response = self.client.get(reverse('portfolio:blog_list'))
+        self.assertEqual(response['Cache-Tag'], 'blog-all,blog-list')
+        response = self.client.get(reverse('portfolio:contact'))
+        self.assertFalse(response.has_header('Surrogate-Key'))
+        self.assertFalse(response.has_header('Cache-Control'))
+
+    def test_saves_and_deletes_purge_their_keys(self):
+        opportunity = InvestmentOpportunity.objects.first()
+        with self.captureOnCommitCallbacks(execute=True):
+            opportunity.available_shares = 10
+            opportunity.save()
+            opportunity.save()
+        self.assertEqual(self.endpoint.keys(), [
+            {'opportunity-list', f'opportunity-{opportunity.pk}', f'project-{opportunity.project_id}'},
+        ])
+
+        post = BlogPost.objects.first()
+        keys = {'blog-list', f'blog-{post.pk}'}
+        with self.captureOnCommitCallbacks(execute=True):
+            post.delete()
+        self.assertEqual(self.endpoint.keys()[1], keys)
+
+        # Reservations are published by the sweeper, not the request.
+        with self.captureOnCommitCallbacks(execute=True):
+            reserve_shares(opportunity, 1, 'Rahim', 'rahim@example.com')
+        self.assertEqual(len(self.endpoint.purges), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            publish_availability()
+        self.assertIn(f'project-{opportunity.project_id}', self.endpoint.keys()[2])
+
+    def test_json_purges_are_batched(self):
+        HttpPurger(self.endpoint.url, json_field='tags', batch_size=2).purge({'a', 'b', 'c'})
+        self.assertEqual([json.loads(body) for _, body in self.endpoint.purges], [
+            {'tags': ['a', 'b']}, {'tags': ['c']},
+        ])
+
+    def test_failed_purge_keeps_the_save(self):
+        self.endpoint.shutdown()
+        self.endpoint.server_close()
+        with self.assertLogs('portfolio.edge', 'ERROR'), self.captureOnCommitCallbacks(execute=True):
+            TeamMember.objects.create(name='Karim', role='expert')
+        self.assertTrue(TeamMember.objects.filter(name='Karim').exists())
@@ -13,5 +13,6 @@ urlpatterns = [
     path('gallery/', views.GalleryListView.as_view(), name='gallery'),
     path('about/', views.about, name='about'),
     path('investment/', views.investment, name='investment'),
+    path('search/', views.search, name='search'),
     path('contact/', views.contact, name='contact'),
 ]
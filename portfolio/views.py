@@ -1,45 +1,72 @@
-from django.shortcuts import render, get_object_or_404
+from django.conf import settings
+from django.contrib import messages
+from django.db import transaction
+from django.db.models import Prefetch
+from django.shortcuts import redirect, render, get_object_or_404
+from django.template.loader import render_to_string
+from django.utils.translation import gettext as _
+from django.utils.decorators import method_decorator
 from django.views.generic import ListView, DetailView
+from .budgets import query_budget
+from .cache import versioned_cache_page
+from .conditional import conditional_page
+from .forms import ContactForm
+from .outbox import enqueue
+from .pagination import KeysetPaginationMixin
+from .search import search as full_text_search
+from .stateless import stateful
 from .models import (
     Project, BlogPost, TeamMember, MediaAppearance,
-    InvestmentOpportunity, GalleryImage
+    InvestmentOpportunity, GalleryImage, ProjectFunding
 )
 
 
+def home_sections():
+    """
+    The sections of the homepage, by context name: the rows each may show
+    and how many it shows.
+    """
+    return {
+        'featured_projects': (Project.objects.filter(is_featured=True), 3),
+        'latest_blogs': (BlogPost.objects.filter(status='published'), 3),
+        'featured_team': (TeamMember.objects.filter(is_featured=True), 3),
+        'media_appearances': (MediaAppearance.objects.filter(is_featured=True), 6),
+        'gallery_images': (GalleryImage.objects.filter(is_featured=True), 6),
+        'investment_opportunities': (InvestmentOpportunity.objects.filter(is_active=True, featured=True), 2),
+    }
+
+
+def home_content(request):
+    return [queryset for queryset, _ in home_sections().values()]
+
+
+def home_querysets():
+    """
+    The independent queries of the homepage, by context name.
+    """
+    querysets = {}
+    for name, (queryset, limit) in home_sections().items():
+        if queryset.model is InvestmentOpportunity:
+            queryset = queryset.with_funding()
+        querysets[name] = queryset[:limit]
+    return querysets
+
+
+@versioned_cache_page(
+    Project, BlogPost, TeamMember, MediaAppearance,
+    InvestmentOpportunity, GalleryImage,
+)
+@conditional_page(home_content)
+@query_budget(7)
 def home(request):
     """
     Homepage view displaying featured content.
     """
-    # Get featured projects
-    featured_projects = Project.objects.filter(is_featured=True)[:3]
-    
-    # Get latest blog posts
-    latest_blogs = BlogPost.objects.filter(status='published')[:3]
-    
-    # Get featured team members
-    featured_team = TeamMember.objects.filter(is_featured=True)[:3]
-    
-    # Get media appearances
-    media_appearances = MediaAppearance.objects.filter(is_featured=True)[:6]
-    
-    # Get gallery images
-    gallery_images = GalleryImage.objects.filter(is_featured=True)[:6]
-    
-    # Get investment opportunities
-    investment_opportunities = InvestmentOpportunity.objects.filter(is_active=True, featured=True)[:2]
-    
-    context = {
-        'featured_projects': featured_projects,
-        'latest_blogs': latest_blogs,
-        'featured_team': featured_team,
-        'media_appearances': media_appearances,
-        'gallery_images': gallery_images,
-        'investment_opportunities': investment_opportunities,
-    }
-    
-    return render(request, 'portfolio/home.html', context)
+    return render(request, 'portfolio/home.html', home_querysets())
 
 
+@method_decorator(versioned_cache_page(Project), name='dispatch')
+@method_decorator(conditional_page(lambda request: [Project.objects.filter(status='active')]), name='dispatch')
 class ProjectListView(ListView):
     """
     List view for all projects.
@@ -48,11 +75,22 @@ class ProjectListView(ListView):
     template_name = 'portfolio/project_list.html'
     context_object_name = 'projects'
     paginate_by = 9
+    query_budget = 3
     
     def get_queryset(self):
         return Project.objects.filter(status='active')
 
 
+def project_content(request, slug):
+    # The page lists the project's opportunities, so they validate it too.
+    return [
+        Project.objects.filter(slug=slug),
+        InvestmentOpportunity.objects.filter(project__slug=slug),
+    ]
+
+
+@method_decorator(versioned_cache_page(Project, InvestmentOpportunity), name='dispatch')
+@method_decorator(conditional_page(project_content), name='dispatch')
 class ProjectDetailView(DetailView):
     """
     Detail view for a single project.
@@ -61,9 +99,18 @@ class ProjectDetailView(DetailView):
     template_name = 'portfolio/project_detail.html'
     context_object_name = 'project'
     slug_url_kwarg = 'slug'
+    query_budget = 3
+
+    def get_queryset(self):
+        # The template walks the opportunities twice; prefetch them once.
+        return Project.objects.prefetch_related(
+            Prefetch('investment_opportunities', queryset=InvestmentOpportunity.objects.with_funding()),
+        )
 
 
-class BlogListView(ListView):
+@method_decorator(versioned_cache_page(BlogPost), name='dispatch')
+@method_decorator(conditional_page(lambda request: [BlogPost.objects.filter(status='published')]), name='dispatch')
+class BlogListView(KeysetPaginationMixin, ListView):
     """
     List view for all blog posts.
     """
@@ -71,11 +118,14 @@ class BlogListView(ListView):
     template_name = 'portfolio/blog_list.html'
     context_object_name = 'posts'
     paginate_by = 6
+    query_budget = 2
     
     def get_queryset(self):
         return BlogPost.objects.filter(status='published')
 
 
+@method_decorator(versioned_cache_page(BlogPost), name='dispatch')
+@method_decorator(conditional_page(lambda request, slug: [BlogPost.objects.filter(slug=slug)]), name='dispatch')
 class BlogDetailView(DetailView):
     """
     Detail view for a single blog post.
@@ -84,8 +134,11 @@ class BlogDetailView(DetailView):
     template_name = 'portfolio/blog_detail.html'
     context_object_name = 'post'
     slug_url_kwarg = 'slug'
+    query_budget = 2
 
 
+@method_decorator(versioned_cache_page(TeamMember), name='dispatch')
+@method_decorator(conditional_page(lambda request: [TeamMember.objects.all()]), name='dispatch')
 class TeamListView(ListView):
     """
     List view for all team members.
@@ -93,9 +146,12 @@ class TeamListView(ListView):
     model = TeamMember
     template_name = 'portfolio/team_list.html'
     context_object_name = 'team_members'
+    query_budget = 2
 
 
-class GalleryListView(ListView):
+@method_decorator(versioned_cache_page(GalleryImage), name='dispatch')
+@method_decorator(conditional_page(lambda request: [GalleryImage.objects.all()]), name='dispatch')
+class GalleryListView(KeysetPaginationMixin, ListView):
     """
     List view for gallery images.
     """
@@ -103,32 +159,99 @@ class GalleryListView(ListView):
     template_name = 'portfolio/gallery.html'
     context_object_name = 'images'
     paginate_by = 12
+    query_budget = 2
 
 
+@versioned_cache_page(TeamMember)
+@conditional_page(lambda request: [TeamMember.objects.all()])
+@query_budget(2)
 def about(request):
     """
     About page view.
     """
-    team_members = TeamMember.objects.all()
     context = {
-        'team_members': team_members,
+        'team_members': TeamMember.objects.all(),
     }
     return render(request, 'portfolio/about.html', context)
 
 
+def investment_content(request):
+    # Cards show the project and the funding of the whole project, inactive
+    # opportunities included.
+    return [
+        InvestmentOpportunity.objects.filter(is_active=True),
+        Project.objects.all(),
+        ProjectFunding.objects.all(),
+    ]
+
+
+def investment_queryset():
+    return (
+        InvestmentOpportunity.objects.filter(is_active=True).with_funding()
+        .select_related('project__funding')
+    )
+
+
+@versioned_cache_page(InvestmentOpportunity, Project)
+@conditional_page(investment_content)
+@query_budget(2)
 def investment(request):
     """
     Investment opportunities page.
     """
-    opportunities = InvestmentOpportunity.objects.filter(is_active=True)
     context = {
-        'opportunities': opportunities,
+        'opportunities': investment_queryset(),
     }
     return render(request, 'portfolio/investment.html', context)
 
 
+SEARCH_RESULTS_PER_SECTION = 10
+SEARCH_QUERY_MAX_LENGTH = 200
+
+
+@query_budget(3)
+def search(request):
+    """
+    Full-text search over projects, published posts and gallery images,
+    best matches first.
+
+    Not page-cached: every distinct query would take a cache entry, and
+    anyone could evict the real pages by searching.
+    """
+    query = request.GET.get('q', '').strip()[:SEARCH_QUERY_MAX_LENGTH]
+    sections = {
+        'projects': Project.objects.all(),
+        'posts': BlogPost.objects.filter(status='published'),
+        'images': GalleryImage.objects.all(),
+    }
+    context = {'query': query}
+    for name, queryset in sections.items():
+        if query:
+            results = full_text_search(queryset, query).order_by('-search_rank')[:SEARCH_RESULTS_PER_SECTION]
+        else:
+            results = queryset.none()
+        context[name] = results
+    return render(request, 'portfolio/search.html', context)
+
+
+@query_budget(0)
+@stateful
 def contact(request):
     """
-    Contact page view.
+    Contact page view. Submissions are stored and the notification email
+    is queued for the ``send_outbox`` worker, so the response never waits
+    on the mail server.
     """
-    return render(request, 'portfolio/contact.html')
+    form = ContactForm(request.POST or None)
+    if request.method == 'POST' and form.is_valid():
+        with transaction.atomic():
+            submission = form.save()
+            enqueue(
+                subject=f'[Contact] {submission.subject}',
+                body=render_to_string('portfolio/email/contact_submission.txt', {'submission': submission}),
+                to=settings.CONTACT_RECIPIENTS,
+                reply_to=submission.email,
+            )
+        messages.success(request, _('Thank you! Your message has been sent.'))
+        return redirect('portfolio:contact')
+    return render(request, 'portfolio/contact.html', {'form': form})
@@ -0,0 +1,123 @@
+"""
+Warm-up of a freshly started worker.
+
+Passenger stops idle workers, so the first visitor after a quiet spell
+pays for everything Django builds lazily: the URL resolver, every template
+it compiles and the page cache entries of the process. With
+``PORTFOLIO_WARMUP`` on, ``passenger_wsgi.py`` runs ``warm_up()`` once the
+application is loaded, before Passenger hands the worker a request.
+
+Each step is timed and logged. A failing step is logged and skipped, so
+warming up can never keep a worker from starting.
+"""
+import logging
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+from django.template.loaders.cached import Loader as CachedLoader
+from django.urls import get_resolver, reverse
+from django.utils import translation
+
+logger = logging.getLogger(__name__)
+
+# Pages rendered at boot; detail pages are too many to be worth it.
+WARM_PAGES = ['home', 'project_list', 'blog_list', 'team_list', 'gallery', 'about', 'investment']
+
+
+def resolve_urls():
+    """
+    Import the URLconfs and views and build the reverse lookup tables of
+    every language. Returns the number of URLs reversed.
+    """
+    resolver = get_resolver()
+    resolver.url_patterns
+    reversed_urls = 0
+    for language, _ in settings.LANGUAGES:
+        with translation.override(language):
+            for name in WARM_PAGES:
+                reverse(f'portfolio:{name}')
+                reversed_urls += 1
+    return reversed_urls
+
+
+def project_templates(engine):
+    """
+    Yield the names of the project's own templates, leaving out those of
+    installed packages.
+    """
+    for directory in engine.template_dirs:
+        directory = Path(directory)
+        if 'site-packages' in directory.parts or not directory.is_relative_to(settings.BASE_DIR):
+            continue
+        for path in sorted(directory.rglob('*')):
+            if path.is_file() and path.suffix in ('.html', '.txt'):
+                yield path.relative_to(directory).as_posix()
+
+
+def compile_templates():
+    """
+    Compile the project's templates into the cached loader of every Django
+    template engine. Without a cached loader the work would be thrown
+    away, so such engines are skipped.
+    """
+    compiled = 0
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        if not any(isinstance(loader, CachedLoader) for loader in engine.engine.template_loaders):
+            logger.warning('Templates of engine %r are not cached; not compiling them.', engine.name)
+            continue
+        for name in project_templates(engine):
+            engine.get_template(name)
+            compiled += 1
+    return compiled
+
+
+def prime_caches():
+    """
+    Render the main public pages in every language, filling the page cache
+    shared by the workers. Returns the number of pages rendered.
+    """
+    from django.test import Client
+
+    host = next((host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')), 'localhost')
+    client = Client(HTTP_HOST=host)
+    rendered = 0
+    for language, _ in settings.LANGUAGES:
+        with translation.override(language):
+            urls = [reverse(f'portfolio:{name}') for name in WARM_PAGES]
+        for url in urls:
+            if client.get(url, secure=True).status_code == 200:
+                rendered += 1
+    return rendered
+
+
+STEPS = [
+    ('urls', resolve_urls),
+    ('templates', compile_templates),
+    ('caches', prime_caches),
+]
+
+
+def warm_up(steps=None):
+    """
+    Run the warm-up ``steps`` (all by default) and return
+    ``[(name, result, seconds)]``; ``result`` is None for a failed step.
+    """
+    timings = []
+    for name, step in STEPS:
+        if steps is not None and name not in steps:
+            continue
+        started = time.perf_counter()
+        try:
+            result = step()
+        except Exception:
+            logger.exception('Warm-up step %r failed.', name)
+            result = None
+        elapsed = time.perf_counter() - started
+        logger.info('Warm-up step %r: %s in %.1f ms', name, result, elapsed * 1000)
+        timings.append((name, result, elapsed))
+    return timings
@@ -108,71 +108,11 @@ document.addEventListener('DOMContentLoaded', function() {
     // ===================================
     // Language Toggle System
     // ===================================
+    // Pages are rendered in one language by the server (Bengali at /...,
+    // English at /en/...); the options are links to the other language.
     const langToggle = document.getElementById('langToggle');
     const langDropdown = document.querySelector('.lang-dropdown');
     const langOptions = document.querySelectorAll('.lang-option');
-    const langCurrent = document.querySelector('.lang-current');
-    const htmlElement = document.documentElement;
-    
-    // Initialize language from localStorage or default to Bengali
-    let currentLang = localStorage.getItem('preferredLanguage') || 'bn';
-    
-    // Function to apply language to all elements
-    function applyLanguage(lang) {
-        // Update HTML lang attribute
-        htmlElement.setAttribute('lang', lang === 'bn' ? 'bn-BD' : 'en');
-        htmlElement.setAttribute('data-lang', lang);
-
-        // Update all elements with data-lang attributes
-        const elements = document.querySelectorAll('[data-lang-en], [data-lang-bn]');
-        elements.forEach(element => {
-            const text = element.getAttribute(`data-lang-${lang}`);
-            if (text) {
-                // Check if element has an img child (for badges with icons)
-                const img = element.querySelector('img');
-                if (img) {
-                    // Remove all existing text nodes
-                    const childNodes = Array.from(element.childNodes);
-                    childNodes.forEach(node => {
-                        if (node.nodeType === Node.TEXT_NODE) {
-                            node.remove();
-                        }
-                    });
-                    // Add a single text node after the img
-                    const textNode = document.createTextNode(text);
-                    element.appendChild(textNode);
-                }
-                // Check if element has a span child (for buttons with icons)
-                else if (element.querySelector('span')) {
-                    const span = element.querySelector('span');
-                    span.textContent = text;
-                } else {
-                    // Check if text contains HTML tags
-                    if (text.includes('<')) {
-                        element.innerHTML = text;
-                    } else {
-                        element.textContent = text;
-                    }
-                }
-            }
-        });
-        
-        // Update current language display
-        if (langCurrent) {
-            langCurrent.textContent = lang === 'bn' ? 'বাং' : 'Eng';
-        }
-        
-        // Save preference to localStorage
-        localStorage.setItem('preferredLanguage', lang);
-        
-        // Close dropdown
-        if (langDropdown) {
-            langDropdown.classList.remove('active');
-        }
-    }
-    
-    // Apply saved language on page load
-    applyLanguage(currentLang);
     
     // Toggle dropdown when clicking language button
     if (langToggle) {
@@ -184,15 +124,11 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
     
-    // Handle language option clicks
+    // Remember the choice so unprefixed URLs redirect to it
     langOptions.forEach(option => {
-        option.addEventListener('click', function(e) {
-            e.stopPropagation();
+        option.addEventListener('click', function() {
             const selectedLang = this.getAttribute('data-lang');
-            if (selectedLang && selectedLang !== currentLang) {
-                currentLang = selectedLang;
-                applyLanguage(currentLang);
-            }
+            document.cookie = `django_language=${selectedLang}; path=/; max-age=31536000; samesite=lax`;
         });
     });
     
@@ -662,9 +598,8 @@ document.addEventListener('DOMContentLoaded', function() {
     const titleTyping = document.querySelector('.title-typing');
     
     if (titleTyping && window.innerWidth > 768) {
-        // Get the text based on current language
-        const currentLang = document.documentElement.lang || 'bn';
-        const text = titleTyping.getAttribute(`data-lang-${currentLang}`) || titleTyping.textContent;
+        // The title is rendered in the page language
+        const text = titleTyping.textContent.trim();
         
         // Clear the typing span content
         titleTyping.textContent = '';